@@ -0,0 +1,102 @@
+"""Time DownloadJob on a local fragmented (HLS) stream at several latencies and fragment concurrencies.
+
+Run from the repository root:
+
+    python -m benchmarks.fragments 40 --latency 0,50,200
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import youtube_downloader
+
+
+FRAGMENT_STUB_SIZE = 256 * 1024  # Bytes per fragment served by FragmentStubHandler
+BENCHMARK_FRAGMENT_CONCURRENCY = (1, 4, 16)
+
+
+class FragmentStubHandler(BaseHTTPRequestHandler):
+    """Serves an HLS playlist of server.fragment_count fragments, delaying every response by server.latency"""
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        if self.path == '/index.m3u8':
+            lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:2', '#EXT-X-MEDIA-SEQUENCE:0']
+            for i in range(self.server.fragment_count):
+                lines += ['#EXTINF:2.0,', f'frag{i}.ts']
+            body = ('\n'.join(lines + ['#EXT-X-ENDLIST']) + '\n').encode('utf-8')
+            content_type = 'application/vnd.apple.mpegurl'
+        elif self.path.startswith('/frag'):
+            body = self.server.fragment
+            content_type = 'video/mp2t'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark_fragments(fragment_count=40, latencies_ms=(0, 50, 200)):
+    """Time DownloadJob on a local fragmented stream per latency and fragment concurrency"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FragmentStubHandler)
+    server.daemon_threads = True
+    server.fragment_count = fragment_count
+    server.fragment = b'\x47' + bytes(FRAGMENT_STUB_SIZE - 1)  # MPEG-TS sync byte, then padding
+    threading.Thread(target=server.serve_forever, name='fragment-stub', daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/index.m3u8'
+    results = []
+    try:
+        for latency in latencies_ms:
+            server.latency = latency / 1000
+            for concurrency in BENCHMARK_FRAGMENT_CONCURRENCY:
+                save_path = tempfile.mkdtemp(prefix='fragment-bench-')
+                try:
+                    job = youtube_downloader.DownloadJob(url, save_path, 'best', 1, fragment_concurrency=concurrency)
+                    errors = []
+                    job.download_error.connect(errors.append)
+                    started = time.perf_counter()
+                    job.run()
+                    elapsed = time.perf_counter() - started
+                    size = sum(os.path.getsize(os.path.join(save_path, name)) for name in os.listdir(save_path)
+                               if not name.startswith('.'))
+                finally:
+                    shutil.rmtree(save_path, ignore_errors=True)
+                results.append({
+                    'latency_ms': latency,
+                    'fragment_concurrency': concurrency,
+                    'seconds': round(elapsed, 3),
+                    'mb_per_s': round(size / elapsed / 1e6, 2) if job.outcome == 'finished' else None,
+                    'error': errors[-1] if job.outcome != 'finished' and errors else None,
+                })
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(json.dumps({'fragment_count': fragment_count, 'fragment_bytes': FRAGMENT_STUB_SIZE,
+                      'runs': results}, indent=2))
+    return 0 if all(run['mb_per_s'] for run in results) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('fragment_count', type=int, nargs='?', default=40,
+                        help='fragments in the stub stream (default: %(default)s)')
+    parser.add_argument('--latency', default='0,50,200', metavar='MS,...',
+                        help='per-request latencies in milliseconds (default: %(default)s)')
+    args = parser.parse_args(argv)
+    return benchmark_fragments(args.fragment_count, [float(ms) for ms in args.latency.split(',')])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Record the events of real GUI downloads and replay them into an offscreen window to time the UI.
+
+Run from the repository root:
+
+    python -m benchmarks.gui_replay record events.jsonl      # use the GUI as usual
+    python -m benchmarks.gui_replay replay events.jsonl --speed 4
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+
+from PyQt5.QtWidgets import QApplication
+
+import youtube_downloader
+
+
+class EventRecorder:
+    """Write a job's signal emissions to a JSONL file for replay_events().
+
+    Each line is {"t": seconds since recording started, "kind": ..., "data": ...}.
+    Events are stamped in the job thread, as they are emitted, so bursts are
+    kept exactly as the GUI received them.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def attach(self, job):
+        job.progress.connect(lambda value: self.record('progress', value))
+        job.detailed_progress.connect(
+            lambda event: self.record('detail', {name: getattr(event, name) for name in youtube_downloader.ProgressEvent.__slots__}))
+        job.status.connect(lambda msg: self.record('status', msg))
+        job.download_error.connect(lambda msg: self.record('error', msg))
+        job.finished.connect(lambda: self.record('finished', None))
+        job.cancelled.connect(lambda: self.record('cancelled', None))
+
+    def record(self, kind, data):
+        line = json.dumps({'t': time.perf_counter() - self.started, 'kind': kind, 'data': data},
+                          ensure_ascii=False)
+        with self.lock:
+            if self.file.closed:
+                return  # A stopped job can still emit while the window shuts down
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def timing_summary(values):
+    """Mean, 95th percentile and max of a list of seconds, in milliseconds"""
+    if not values:
+        return {'mean_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0}
+    ordered = sorted(values)
+    return {
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p95_ms': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def replay_events(path, speed=1.0, frame_rate=60):
+    """Feed recorded events into a MainWindow on the offscreen platform and report UI cost.
+
+    speed scales the recorded timing (0 replays as fast as possible). The
+    window is repainted once per frame; reported are GUI-thread time per
+    event by kind, paint time, frame latency (oldest unpainted event to end
+    of paint) and dropped updates (updates overwritten by a newer one of the
+    same kind before a frame showed them).
+    """
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    with open(path, encoding='utf-8') as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    window = youtube_downloader.MainWindow()
+    window.show()
+    window.stack.setCurrentIndex(2)
+    window.clear_ui_for_download()
+    window.progress_view.show()
+    window.options_container.hide()
+    app.processEvents()
+
+    handlers = {
+        'progress': window.update_progress,
+        'detail': lambda data: window.update_detailed_progress(youtube_downloader.ProgressEvent(**data)),
+        'status': window.update_status,
+    }
+    handler_times = defaultdict(list)
+    paint_times = []
+    frame_latencies = []
+    dropped = 0
+    pending = defaultdict(int)  # Updates per kind since the last painted frame
+    oldest_pending = None
+    frame_interval = 1.0 / frame_rate
+
+    def paint_frame():
+        nonlocal dropped, oldest_pending
+        painted = time.perf_counter()
+        window.repaint()
+        app.processEvents()
+        done = time.perf_counter()
+        paint_times.append(done - painted)
+        frame_latencies.append(done - oldest_pending)
+        dropped += sum(count - 1 for count in pending.values())
+        pending.clear()
+        oldest_pending = None
+        return done
+
+    started = time.perf_counter()
+    next_frame = started + frame_interval
+    for event in events:
+        handler = handlers.get(event['kind'])
+        if handler is None:
+            continue  # finished/error/cancelled would open dialogs
+        due = started + event['t'] / speed if speed else time.perf_counter()
+        now = time.perf_counter()
+        if pending and now >= next_frame:
+            next_frame = paint_frame() + frame_interval
+        if due > now:
+            if pending and next_frame < due:
+                time.sleep(max(next_frame - time.perf_counter(), 0))
+                next_frame = paint_frame() + frame_interval
+            time.sleep(max(due - time.perf_counter(), 0))
+        begin = time.perf_counter()
+        handler(event['data'])
+        handler_times[event['kind']].append(time.perf_counter() - begin)
+        pending[event['kind']] += 1
+        if oldest_pending is None:
+            oldest_pending = due  # Includes any time the GUI was running behind
+        if not speed and time.perf_counter() >= next_frame:
+            next_frame = paint_frame() + frame_interval
+    if pending:
+        paint_frame()
+    elapsed = time.perf_counter() - started
+    window.hide()  # close() would ask for confirmation
+
+    report = {
+        'events': sum(len(times) for times in handler_times.values()),
+        'recorded_seconds': round(events[-1]['t'], 3) if events else 0,
+        'replay_seconds': round(elapsed, 3),
+        'handlers': {kind: dict(timing_summary(times), count=len(times)) for kind, times in handler_times.items()},
+        'paint': dict(timing_summary(paint_times), frames=len(paint_times)),
+        'frame_latency': timing_summary(frame_latencies),
+        'dropped_updates': dropped,
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def record(path):
+    """Run the GUI, appending the events of every download it starts to path"""
+    app = QApplication([sys.argv[0]])
+    window = youtube_downloader.MainWindow()
+    with EventRecorder(path) as recorder:
+        window.event_recorder = recorder
+        window.show()
+        return app.exec_()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    record_parser = commands.add_parser('record', help='run the GUI and append its download events to PATH')
+    record_parser.add_argument('path', metavar='PATH')
+    replay_parser = commands.add_parser('replay', help='replay recorded events, print UI timings and exit')
+    replay_parser.add_argument('path', metavar='PATH')
+    replay_parser.add_argument('--speed', type=float, default=1.0, metavar='X',
+                               help='replay speed factor, 0 for as fast as possible (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if args.command == 'record':
+        return record(args.path)
+    replay_events(args.path, args.speed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
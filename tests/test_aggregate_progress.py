@@ -0,0 +1,45 @@
+import pytest
+
+from youtube_downloader import AggregateProgress
+
+
+def test_unseen_items_are_estimated_from_the_average():
+    progress = AggregateProgress(4)
+    percent, _ = progress.update('a', 'a.mp4', 50, 100, now=0)
+    assert percent == pytest.approx(12.5)  # 50 of 100 + 3 unseen items of ~100
+
+
+def test_percent_never_moves_backwards():
+    progress = AggregateProgress(4)
+    progress.update('a', 'a.mp4', 100, 100, finished=True, now=0)
+    assert progress.percent == pytest.approx(25.0)
+    percent, _ = progress.update('b', 'b.mp4', 0, 1000, now=1)  # Much larger than estimated
+    assert percent == pytest.approx(25.0)
+    progress.update('b', 'b.mp4', 1000, 1000, finished=True, now=2)
+    progress.update('c', 'c.mp4', 500, 500, finished=True, now=3)
+    percent, _ = progress.update('d', 'd.mp4', 400, 400, finished=True, now=4)
+    assert percent == pytest.approx(100.0)
+
+
+def test_skipped_items_leave_the_estimate():
+    progress = AggregateProgress(2)
+    progress.skip()
+    percent, _ = progress.update('a', 'a.mp4', 50, 100, now=0)
+    assert percent == pytest.approx(50.0)
+
+
+def test_no_percent_until_the_item_count_is_known():
+    progress = AggregateProgress(0)
+    percent, _ = progress.update('a', 'a.mp4', 50, 100, now=0)
+    assert percent == 0
+    progress.set_item_count(2)
+    percent, _ = progress.update('a', 'a.mp4', 60, 100, now=1)
+    assert percent == pytest.approx(30.0)
+
+
+def test_eta_uses_throughput_not_resumed_bytes():
+    progress = AggregateProgress(1)
+    _, eta = progress.update('a', 'a.mp4', 400, 1000, now=0)  # Resumed .part data
+    assert eta is None
+    _, eta = progress.update('a', 'a.mp4', 600, 1000, now=2)
+    assert eta == pytest.approx(4.0)  # 400 bytes left at 100 bytes/s
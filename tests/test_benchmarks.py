@@ -0,0 +1,37 @@
+import json
+from types import SimpleNamespace
+
+from benchmarks import fragments, gui_replay, progress_events
+from youtube_downloader import ProgressEvent, Signal
+
+
+def test_progress_events_benchmark_runs(capsys):
+    assert progress_events.main(['50']) == 0
+    assert 'progress_hook' in capsys.readouterr().out
+
+
+def test_recorded_events_replay(tmp_path, capsys):
+    job = SimpleNamespace(**{name: Signal() for name in (
+        'progress', 'detailed_progress', 'status', 'download_error', 'finished', 'cancelled')})
+    path = tmp_path / 'events.jsonl'
+    with gui_replay.EventRecorder(path) as recorder:
+        recorder.attach(job)
+        job.status.emit('Starting download...')
+        job.detailed_progress.emit(ProgressEvent(1024, 4096, 512.0, 6, 'a.mp4', 25.0, 1, 1, 6))
+        job.progress.emit(25.0)
+        job.finished.emit()
+    job.progress.emit(50.0)  # After close: dropped, not an error
+    assert [json.loads(line)['kind'] for line in path.read_text().splitlines()] == [
+        'status', 'detail', 'progress', 'finished']
+    report = gui_replay.replay_events(path, speed=0)
+    assert report['events'] == 3
+    assert set(report['handlers']) == {'status', 'detail', 'progress'}
+
+
+def test_fragments_benchmark_reports_each_concurrency(monkeypatch, capsys):
+    monkeypatch.setattr(fragments, 'BENCHMARK_FRAGMENT_CONCURRENCY', (2,))
+    fragments.main(['4', '--latency', '0'])
+    report = json.loads(capsys.readouterr().out)
+    assert report['fragment_count'] == 4
+    (run,) = report['runs']
+    assert (run['latency_ms'], run['fragment_concurrency']) == (0, 2)
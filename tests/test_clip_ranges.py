@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from youtube_downloader import load_clip_ranges, parse_timestamp
+
+
+def test_parse_timestamp_accepts_seconds_and_clock_times():
+    assert parse_timestamp(90) == 90.0
+    assert parse_timestamp('1:30') == 90.0
+    assert parse_timestamp('01:00:05.5') == 3605.5
+
+
+def test_csv_skips_header_and_comments(tmp_path):
+    path = tmp_path / 'clips.csv'
+    path.write_text('start,end,name\n# intro\n0:10,0:20,First\n1:00,1:30\n', encoding='utf-8')
+    assert load_clip_ranges(str(path)) == [(10.0, 20.0, 'First'), (60.0, 90.0, '')]
+
+
+def test_json_accepts_lists_and_objects(tmp_path):
+    path = tmp_path / 'clips.json'
+    path.write_text(json.dumps([[5, 10, 'a'], {'start': '0:30', 'end': '0:45', 'name': ' b '}]), encoding='utf-8')
+    assert load_clip_ranges(str(path)) == [(5.0, 10.0, 'a'), (30.0, 45.0, 'b')]
+
+
+def test_end_before_start_is_rejected(tmp_path):
+    path = tmp_path / 'clips.csv'
+    path.write_text('0:20,0:10\n', encoding='utf-8')
+    with pytest.raises(ValueError):
+        load_clip_ranges(str(path))
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from youtube_downloader import ENTRY_STORE_BATCH, EntryStore
+
+
+@pytest.fixture
+def store():
+    store = EntryStore.from_rows((f'id{n}', f'Video {n}', float(n)) for n in range(1, 61))
+    yield store
+    store.close()
+
+
+def test_selection_spec_collapses_runs(store):
+    assert store.selection_spec() == '1-60'
+    store.set_all_selected(False)
+    assert store.selection_spec() == ''
+    store.set_selected(list(range(1, 41)) + [42] + list(range(50, 61)), True)
+    assert store.selection_spec() == '1-40,42,50-60'
+    assert store.selected_count() == 52
+
+
+def test_entries_by_position(store):
+    assert len(store) == 60
+    assert store.entry(2) == ('id2', 'Video 2', 2.0, 1)
+    assert store.titles[-1] == 'Video 60'
+    assert list(store.durations)[:3] == [1.0, 2.0, 3.0]
+    with pytest.raises(IndexError):
+        store.titles[60]
+
+
+def test_reads_span_batches_and_the_file_goes_on_close():
+    count = ENTRY_STORE_BATCH * 2 + 5
+    store = EntryStore.from_rows((str(n), str(n), 0.0) for n in range(count))
+    store.set_selected([count], False)
+    assert store.selection_spec() == f'1-{count - 1}'
+    path = store.path
+    store.close()
+    assert not os.path.exists(path)
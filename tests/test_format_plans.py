@@ -0,0 +1,44 @@
+import json
+import os
+import threading
+
+import pytest
+
+from youtube_downloader import split_format_alternatives, update_json_file
+
+
+def test_splits_only_top_level_fallbacks():
+    assert split_format_alternatives('bestvideo+bestaudio/best') == ['bestvideo+bestaudio', 'best']
+    assert split_format_alternatives('bv[ext=mp4]+ba[ext=m4a]/b[ext=mp4]/b') == [
+        'bv[ext=mp4]+ba[ext=m4a]', 'b[ext=mp4]', 'b']
+    assert split_format_alternatives('(bv/bv*)+ba[format_note!=a/b]/b') == ['(bv/bv*)+ba[format_note!=a/b]', 'b']
+    assert split_format_alternatives('best') == ['best']
+
+
+def test_concurrent_updates_are_merged(tmp_path):
+    path = str(tmp_path / 'state.json')
+
+    def bump(key):
+        for _ in range(20):
+            update_json_file(path, lambda state: state.update({key: state.get(key, 0) + 1}))
+
+    threads = [threading.Thread(target=bump, args=(f'job{n}',)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {f'job{n}': 20 for n in range(4)}
+    assert os.listdir(tmp_path) == ['state.json']  # No temporary files left behind
+
+
+def test_unreadable_state_starts_empty_and_write_errors_raise(tmp_path):
+    path = tmp_path / 'state.json'
+    path.write_text('{not json')
+    update_json_file(str(path), lambda state: state.update(ok=True))
+    assert json.loads(path.read_text()) == {'ok': True}
+
+    blocker = tmp_path / 'not-a-folder'
+    blocker.write_text('')
+    with pytest.raises(OSError):
+        update_json_file(str(blocker / 'state.json'), lambda state: None)
@@ -0,0 +1,38 @@
+import time
+
+import yt_dlp.utils
+
+import youtube_downloader
+from youtube_downloader import FRAGMENT_RETRY_MAX_SLEEP, fragment_retry_sleep
+
+
+def test_backoff_doubles_up_to_the_cap():
+    assert [fragment_retry_sleep(n=n) for n in range(4)] == [0.5, 1.0, 2.0, 4.0]
+    assert fragment_retry_sleep(n=20) == FRAGMENT_RETRY_MAX_SLEEP
+
+
+def test_called_the_way_yt_dlp_calls_it(monkeypatch):
+    slept = []
+    monkeypatch.setattr(time, 'sleep', slept.append)
+    for count in (1, 2, 3):
+        yt_dlp.utils.RetryManager.report_retry(
+            'Fragment not found', count, 10, sleep_func=fragment_retry_sleep,
+            info=lambda msg: None, warn=lambda msg: None)
+    assert slept == [0.5, 1.0, 2.0]
+
+
+def test_job_options_use_it_for_fragments(monkeypatch, tmp_path):
+    captured = {}
+
+    class StopAtOptions(Exception):
+        pass
+
+    def capture(self, params=None, auto_init=True):
+        captured.update(params)
+        raise StopAtOptions
+
+    monkeypatch.setattr(youtube_downloader.SessionYoutubeDL, '__init__', capture)
+    job = youtube_downloader.DownloadJob('https://example.com/video', str(tmp_path), 'best', 1)
+    job.run()
+    assert job.outcome == 'failed'
+    assert captured['retry_sleep_functions'] == {'fragment': fragment_retry_sleep}
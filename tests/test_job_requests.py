@@ -0,0 +1,71 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from youtube_downloader import (
+    DaemonHTTPServer, JobScheduler, count_playlist_items, job_from_request)
+
+
+def test_count_playlist_items():
+    assert count_playlist_items('1-3,7') == 4
+    assert count_playlist_items('5') == 1
+    assert count_playlist_items('2-2, 10-12,') == 4
+
+
+def test_single_video_defaults(tmp_path):
+    job = job_from_request({'url': 'https://example.com/v', 'save_path': str(tmp_path)})
+    assert not job.is_playlist and job.total_selected == 1
+    assert job.format_id == 'bestvideo+bestaudio/best'
+
+
+def test_playlist_items_set_the_size():
+    job = job_from_request({'url': 'https://example.com/p', 'items': '1-3,7', 'format': 'mp3'})
+    assert job.is_playlist and job.total_selected == 4
+    assert job.audio_codec == 'mp3'
+
+
+def test_whole_playlist_size_comes_from_the_first_entry():
+    job = job_from_request({'url': 'https://example.com/p', 'playlist': True})
+    assert job.total_selected == 0
+    job.resume_event.set()
+    job.match_filter({'id': 'a', 'n_entries': 25}, incomplete=True)
+    assert job.total_selected == 25 and job.aggregate.item_count == 25
+
+
+def test_clips_as_lists_and_objects():
+    job = job_from_request({'url': 'https://example.com/v', 'clips': [
+        ['0:10', '0:20', 'intro'], {'start': 30, 'end': '1:00'}]})
+    assert job.clip_ranges == [(10.0, 20.0, 'intro'), (30.0, 60.0, '')]
+
+
+@pytest.mark.parametrize('request_body', [
+    [],
+    {'url': 'https://example.com/v', 'clips': [{'start': 10}]},
+    {'url': 'https://example.com/v', 'clips': [['0:20', '0:10']]},
+    {'url': 'https://example.com/v', 'clips': 'intro'},
+    {'url': 'https://example.com/v', 'format': 'nope'},
+    {},
+])
+def test_malformed_requests_raise_value_error(request_body):
+    with pytest.raises(ValueError):
+        job_from_request(request_body)
+
+
+@pytest.fixture
+def daemon():
+    server = DaemonHTTPServer(('127.0.0.1', 0), JobScheduler(max_workers=1))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize('body', [b'[]', b'"x"', b'{"url": "u", "clips": [{"end": 5}]}', b'{'])
+def test_daemon_answers_malformed_jobs_with_400(daemon, body):
+    conn = http.client.HTTPConnection(*daemon, timeout=5)
+    conn.request('POST', '/jobs', body, {'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    assert response.status == 400
+    assert 'error' in json.loads(response.read())
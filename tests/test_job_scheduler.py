@@ -0,0 +1,90 @@
+import threading
+
+from youtube_downloader import JobScheduler, Signal
+
+
+class FakeJob:
+    """Blocks in run() until released or cancelled, like a DownloadJob would"""
+
+    def __init__(self):
+        self.progress = Signal()
+        self.detailed_progress = Signal()
+        self.status = Signal()
+        self.download_error = Signal()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.cancelled = threading.Event()
+        self.runs = 0
+        self.outcome = None
+
+    def run(self):
+        self.runs += 1
+        self.cancelled.clear()
+        self.release.clear()
+        self.started.set()
+        while not self.release.wait(0.01):
+            if self.cancelled.is_set():
+                self.outcome = 'cancelled'
+                return
+        self.outcome = 'finished'
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+def wait_for_state(record, state):
+    with record.changed:
+        record.changed.wait_for(lambda: record.state == state, timeout=5)
+    assert record.state == state
+
+
+def test_runs_at_most_max_workers_in_queue_order():
+    scheduler = JobScheduler(max_workers=1)
+    first, second = FakeJob(), FakeJob()
+    r1, r2 = scheduler.submit(first), scheduler.submit(second)
+    assert first.started.wait(5)
+    assert r2.state == 'queued' and scheduler.queue_position(r2) == 1
+    first.release.set()
+    wait_for_state(r1, 'finished')
+    assert second.started.wait(5)
+    second.release.set()
+    wait_for_state(r2, 'finished')
+
+
+def test_cancel_waiting_and_running_jobs():
+    scheduler = JobScheduler(max_workers=1)
+    running, waiting = FakeJob(), FakeJob()
+    r1, r2 = scheduler.submit(running), scheduler.submit(waiting)
+    assert running.started.wait(5)
+    assert scheduler.cancel(r2.id)
+    assert r2.state == 'cancelled' and waiting.runs == 0
+    assert scheduler.cancel(r1.id)
+    wait_for_state(r1, 'cancelled')
+    assert not scheduler.cancel(r1.id)
+
+
+def test_pause_running_job_frees_its_slot_and_resume_reruns_it():
+    scheduler = JobScheduler(max_workers=1)
+    first, second = FakeJob(), FakeJob()
+    r1, r2 = scheduler.submit(first), scheduler.submit(second)
+    assert first.started.wait(5)
+    assert scheduler.pause(r1.id)
+    wait_for_state(r1, 'paused')
+    assert second.started.wait(5)
+    assert not scheduler.resume(r2.id)  # Running, not paused
+    first.started.clear()
+    assert scheduler.resume(r1.id)
+    second.release.set()
+    wait_for_state(r2, 'finished')
+    assert first.started.wait(5) and first.runs == 2
+    first.release.set()
+    wait_for_state(r1, 'finished')
+
+
+def test_move_reorders_waiting_jobs():
+    scheduler = JobScheduler(max_workers=0)
+    records = [scheduler.submit(FakeJob()) for _ in range(3)]
+    assert scheduler.move(records[2].id, -2)
+    assert [scheduler.queue_position(r) for r in records] == [2, 3, 1]
+    scheduler.shutdown(timeout=1)
+    assert all(r.state == 'cancelled' for r in records)
@@ -0,0 +1,79 @@
+import os
+import stat
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+import yt_dlp
+
+import youtube_downloader
+from youtube_downloader import JobCancelled, PipeMergePP, Signal, call_ffmpeg
+
+
+def fake_ffmpeg(tmp_path, monkeypatch, body):
+    script = tmp_path / 'bin' / 'ffmpeg'
+    script.parent.mkdir()
+    script.write_text('#!/bin/sh\n' + body)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f'{script.parent}{os.pathsep}{os.environ["PATH"]}')
+
+
+def test_cancel_terminates_the_ffmpeg_it_started(tmp_path, monkeypatch):
+    pid_file = tmp_path / 'pid'
+    fake_ffmpeg(tmp_path, monkeypatch, f'echo $$ > {pid_file}\nexec sleep 30\n')
+    cancel = threading.Event()
+    threading.Timer(0.3, cancel.set).start()
+    started = time.monotonic()
+    with pytest.raises(JobCancelled):
+        call_ffmpeg(['-i', 'x', 'out.mp4'], cancel)
+    assert time.monotonic() - started < 5
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+
+
+def make_pp(tmp_path):
+    finished = []
+    job = SimpleNamespace(status=Signal(), cancel_event=threading.Event(), progress_hook=finished.append)
+    pp = PipeMergePP(job)
+    pp.set_downloader(yt_dlp.YoutubeDL({'outtmpl': str(tmp_path / '%(title)s.%(ext)s'), 'quiet': True}))
+    return pp, job, finished
+
+
+def info(*protocols):
+    return {
+        'id': 'abc', 'title': 'clip', 'ext': 'mp4',
+        'requested_formats': [
+            {'url': f'https://example.com/{n}', 'protocol': p, 'http_headers': {'User-Agent': 'ua'}}
+            for n, p in enumerate(protocols)
+        ],
+    }
+
+
+def test_merges_http_tracks_with_the_jobs_cancel_event(tmp_path, monkeypatch):
+    calls = []
+
+    def run(args, cancel_event=None):
+        calls.append((args, cancel_event))
+        with open(args[-1], 'wb') as f:
+            f.write(b'merged')
+        return 0, ''
+
+    monkeypatch.setattr(youtube_downloader, 'call_ffmpeg', run)
+    pp, job, finished = make_pp(tmp_path)
+    pp.run(info('https', 'https'))
+    (args, cancel_event), = calls
+    assert cancel_event is job.cancel_event
+    assert [args[i + 1] for i, a in enumerate(args) if a == '-i'] == [
+        'https://example.com/0', 'https://example.com/1']
+    assert args[-5:-1] == ['-map', '1', '-c', 'copy']
+    assert (tmp_path / 'clip.mp4').read_bytes() == b'merged'
+    assert finished[0]['status'] == 'finished' and finished[0]['total_bytes'] == 6
+
+
+def test_leaves_other_protocols_to_yt_dlp(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(youtube_downloader, 'call_ffmpeg', lambda *a: calls.append(a))
+    pp, _, finished = make_pp(tmp_path)
+    pp.run(info('https', 'm3u8_native'))
+    assert calls == [] and finished == []
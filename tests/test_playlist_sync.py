@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from youtube_downloader import SYNC_STATE_NAME, PlaylistSync
+
+URL = 'https://example.com/playlist'
+
+
+def make_sync(save_path, fresh_ids, complete=True, old_ids=None, done=()):
+    if old_ids is not None:
+        state = {'PL': {'url': URL, 'ids': old_ids, 'done': sorted(done)}}
+        (save_path / SYNC_STATE_NAME).write_text(json.dumps(state), encoding='utf-8')
+    sync = PlaylistSync(str(save_path), URL)
+
+    def enumerate_ids(known_ids, newest_first):
+        sync.playlist_id = 'PL'
+        return list(fresh_ids), complete
+
+    sync.enumerate_ids = enumerate_ids
+    return sync
+
+
+def touch(save_path, *names):
+    for name in names:
+        (save_path / name).write_bytes(b'')
+
+
+def test_first_sync_downloads_everything(tmp_path):
+    sync = make_sync(tmp_path, ['a', 'b', 'c'])
+    assert sync.plan() == [1, 2, 3]
+    assert sync.moves == {} and sync.removed == []
+
+
+def test_reorder_moves_and_removal(tmp_path):
+    sync = make_sync(tmp_path, ['c', 'a', 'd'], old_ids=['a', 'b', 'c'], done={'a', 'b', 'c'})
+    assert sync.plan() == [3]
+    assert sync.moves == {1: 2, 3: 1}
+    assert sync.removed == [2]
+    assert sync.done == {'a', 'c'}
+
+
+def test_renames_move_only_finished_media(tmp_path):
+    touch(tmp_path, '001_A.mp4', '001_A.jpg', '003_C.mp4', '003_C.f137.mp4')
+    sync = make_sync(tmp_path, ['c', 'a'], old_ids=['a', 'b', 'c'], done={'a', 'c'})
+    sync.plan()
+    assert sync.apply_renames() == 2
+    assert sorted(os.listdir(tmp_path)) == [
+        SYNC_STATE_NAME, '001_A.jpg', '001_C.mp4', '002_A.mp4', '003_C.f137.mp4']
+
+
+def test_commit_ignores_leftovers_of_unfinished_downloads(tmp_path):
+    sync = make_sync(tmp_path, ['a', 'b', 'c'])
+    sync.plan()
+    touch(tmp_path, '001_A.mp4', '002_B.mp4.part', '002_B.webp', '003_C.f251.webm')
+    sync.commit()
+    state = json.loads((tmp_path / SYNC_STATE_NAME).read_text(encoding='utf-8'))
+    assert state['PL'] == {'url': URL, 'ids': ['a', 'b', 'c'], 'done': ['a']}
+
+
+def test_newest_first_carries_the_unfetched_tail_behind_the_last_seen_entry(tmp_path):
+    # 'x' was at the front before and isn't in the fetched part any more, so it is gone
+    old_ids = ['x', 'a', 'b', 'c', 'd']
+    sync = make_sync(tmp_path, ['n', 'a', 'b'], complete=False, old_ids=old_ids, done={'x', 'a', 'b', 'c'})
+    assert sync.plan(newest_first=True) == [1, 5]
+    assert sync.ids == ['n', 'a', 'b', 'c', 'd']
+    assert sync.removed == [1]
+    assert sync.moves == {}
+
+
+def test_empty_listing_never_prunes(tmp_path):
+    touch(tmp_path, '001_A.mp4')
+    sync = make_sync(tmp_path, [], old_ids=['a'], done={'a'})
+    with pytest.raises(RuntimeError):
+        sync.plan()
@@ -0,0 +1,49 @@
+import functools
+import inspect
+
+import pytest
+import yt_dlp
+from yt_dlp.networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
+
+import youtube_downloader
+from youtube_downloader import SessionYoutubeDL
+
+
+def test_yt_dlp_internals_are_still_there():
+    """SharedSession breaks silently if any of these move; update it and the pin together"""
+    assert _REQUEST_HANDLERS and isinstance(_RH_PREFERENCES, set)
+    for name in ('_request_director', 'cookiejar'):
+        assert isinstance(inspect.getattr_static(yt_dlp.YoutubeDL, name), functools.cached_property)
+    assert list(inspect.signature(yt_dlp.YoutubeDL.build_request_director).parameters)[1:] == [
+        'handlers', 'preferences']
+    if youtube_downloader.RequestsRH is not None:
+        assert 'cookiejar' in inspect.signature(youtube_downloader.RequestsRH._create_instance).parameters
+
+
+@pytest.fixture
+def session(monkeypatch):
+    monkeypatch.setattr(youtube_downloader, '_shared_session', None)
+    yield
+    shared = youtube_downloader._shared_session
+    if shared is not None:
+        for director in shared.directors.values():
+            director.close()
+
+
+def proxies(director):
+    return {handler.proxies.get('all') for handler in director.handlers.values()}
+
+
+def test_jobs_with_the_same_options_share_a_director(session):
+    with SessionYoutubeDL({'quiet': True}) as first, SessionYoutubeDL({'quiet': True}) as second:
+        assert first._request_director is second._request_director
+        assert first.cookiejar is second.cookiejar
+
+
+def test_network_options_get_their_own_director(session):
+    with SessionYoutubeDL({'quiet': True}) as plain, \
+            SessionYoutubeDL({'quiet': True, 'proxy': 'http://127.0.0.1:3128'}) as proxied, \
+            SessionYoutubeDL({'quiet': True, 'socket_timeout': 5}) as timed:
+        assert len({id(ydl._request_director) for ydl in (plain, proxied, timed)}) == 3
+        assert proxies(proxied._request_director) == {'http://127.0.0.1:3128'}
+        assert proxies(plain._request_director) == {None}
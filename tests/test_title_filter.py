@@ -0,0 +1,55 @@
+import re
+
+import pytest
+from PyQt5.QtCore import Qt
+
+from youtube_downloader import EntryListModel, EntryStore, TitleIndex
+
+TITLES = ['Café Tour Part 1', 'Cafe tour part 2', 'Cooking pasta', 'Tour recap']
+DURATIONS = [300, 900, 1200, 60]
+
+
+def test_prefix_words_fold_case_and_accents():
+    index = TitleIndex(TITLES, DURATIONS)
+    assert index.search('cafe') == [0, 1]
+    assert index.search('TOU par') == [0, 1]
+    assert index.search('tour') == [0, 1, 3]
+    assert index.search('xyz') == []
+    assert index.search('') == [0, 1, 2, 3]
+
+
+def test_regex_and_duration_range():
+    index = TitleIndex(TITLES, DURATIONS)
+    assert index.search(r'part \d$', regex=True) == [0, 1]
+    assert index.search('tour', min_duration=120, max_duration=1000) == [0, 1]
+    assert index.search(min_duration=1000) == [2]
+    with pytest.raises(re.error):
+        index.search('(', regex=True)
+
+
+@pytest.fixture
+def store():
+    store = EntryStore.from_rows((f'id{i}', title, DURATIONS[i]) for i, title in enumerate(TITLES))
+    yield store
+    store.close()
+
+
+def test_model_filter_maps_rows_to_entries(store):
+    model = EntryListModel(store)
+    store.set_all_selected(True)
+    model.set_filter(TitleIndex(store.titles).search('tour'))
+    assert model.rowCount() == 3
+    assert model.data(model.index(2)) == '4. Tour recap'
+    model.setData(model.index(2), Qt.Unchecked, Qt.CheckStateRole)
+    assert not store.is_selected(4) and store.is_selected(3)
+    model.set_filter(None)
+    assert model.rowCount() == 4
+    assert model.data(model.index(3), Qt.CheckStateRole) == Qt.Unchecked
+
+
+def test_set_checked_uses_entry_indices(store):
+    model = EntryListModel(store)
+    store.set_all_selected(False)
+    model.set_filter([1, 3])
+    model.set_checked([1, 3], True)
+    assert [store.is_selected(n) for n in range(1, 5)] == [False, True, False, True]
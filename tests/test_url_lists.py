@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import youtube_downloader
+from youtube_downloader import EntryStore, cached_url_summary, parse_url_list
+
+A = 'https://www.youtube.com/watch?v=aaa'
+B = 'https://youtu.be/bbb'
+
+
+def test_text_keeps_order_and_drops_duplicates_and_junk():
+    text = f'{A}\n\n  {B}  \nnot a url\n{A}\n'
+    assert parse_url_list(text) == [A, B]
+
+
+def test_csv_uses_the_url_column():
+    text = f'title,url\nFirst,{A}\nSecond,{B}\n'
+    assert parse_url_list(text, 'list.CSV') == [A, B]
+    assert parse_url_list(f'{B},x\n{A},y\n', 'list.csv') == [B, A]
+
+
+def test_json_strings_or_objects():
+    assert parse_url_list(json.dumps([A, {'url': B}, {'title': 'no url'}]), 'list.json') == [A, B]
+    assert parse_url_list(json.dumps([B])) == [B]  # Pasted JSON is recognised without a name
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    calls = []
+
+    def fetch(url, is_cancelled=None):
+        calls.append(url)
+        count = int(url.rsplit('/', 1)[1])
+        store = EntryStore.from_rows((f'id{i}', f'Video {i}', 60.0) for i in range(count))
+        return f'Playlist {count}', count, store, 0.0
+
+    monkeypatch.setattr(youtube_downloader, 'fetch_url_metadata', fetch)
+    monkeypatch.setattr(youtube_downloader, '_metadata_cache', {})
+    monkeypatch.setattr(youtube_downloader, '_metadata_cache_size', 0)
+    yield calls
+    for _, _, _, entries, _ in youtube_downloader._metadata_cache.values():
+        entries.close()
+
+
+def test_cached_playlists_are_copies_per_caller(fetches):
+    url = 'https://example.com/list/3'
+    _, count, first, _ = cached_url_summary(url)
+    first.set_all_selected(False)
+    first.close()
+    title, count, second, _ = cached_url_summary(url)
+    assert fetches == [url]
+    assert (title, count, len(second), second.selected_count()) == ('Playlist 3', 3, 3, 3)
+    assert list(second.titles) == ['Video 0', 'Video 1', 'Video 2']
+    second.close()
+
+
+def test_cache_is_bounded_by_entry_count(fetches, monkeypatch):
+    monkeypatch.setattr(youtube_downloader, 'METADATA_CACHE_ENTRIES', 10)
+    for count in (4, 5, 6, 20):
+        cached_url_summary(f'https://example.com/list/{count}')[2].close()
+    assert [entry[2] for entry in youtube_downloader._metadata_cache.values()] == [6]
+    assert youtube_downloader._metadata_cache_size == 6
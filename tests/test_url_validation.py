@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+from PyQt5.QtWidgets import QApplication
+
+from youtube_downloader import MainWindow
+
+URL = 'https://example.com/watch?v=abc'
+RESULT = (True, 'Some video', 1, None, 75.0)
+
+
+@pytest.fixture
+def window():
+    app = QApplication.instance() or QApplication([])
+    window = MainWindow()
+    yield window
+    window.validation_timer.stop()
+    window.deleteLater()
+    app.processEvents()
+
+
+def finish(window, speculative, result=RESULT):
+    validator = SimpleNamespace(url=URL, generation=window.validation_generation, speculative=speculative)
+    window.handle_validation_finished(validator, *result)
+
+
+def test_speculative_result_stays_on_the_url_page(window):
+    window.url_input.setText(URL)
+    window.validation_timer.stop()
+    finish(window, speculative=True)
+    assert window.stack.currentIndex() == 0
+    assert 'Some video' in window.url_status_label.text()
+    window.validate_url()  # An explicit submit uses the cached result without another fetch
+    assert window.stack.currentIndex() == 1
+    assert window.speculative_result is None
+
+
+def test_cached_result_is_dropped_when_the_url_changes(window):
+    window.url_input.setText(URL)
+    finish(window, speculative=True)
+    window.url_input.setText(URL + 'x')
+    window.validation_timer.stop()
+    assert window.speculative_result is None
+
+
+def test_explicit_validation_navigates(window):
+    finish(window, speculative=False)
+    assert window.stack.currentIndex() == 1
@@ -1,183 +1,3469 @@
 import sys
 import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+import re
+import csv
+import bisect
+import unicodedata
+import sqlite3
+import tempfile
+import weakref
+import urllib.parse
+import argparse
+import asyncio
+import subprocess
+import socketserver
+import socket
+import signal
+from collections import deque, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
 from PyQt5.QtWidgets import *
-from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtCore import Qt, QObject, QThread, QTimer, QAbstractListModel, QModelIndex, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
 import yt_dlp
+from yt_dlp.networking.common import _REQUEST_HANDLERS, _RH_PREFERENCES
+from yt_dlp.postprocessor import PostProcessor
+
+try:
+    import xxhash  # Optional, much faster than SHA-256 on large archives
+except ImportError:
+    xxhash = None
+
+try:
+    import urllib3  # Installed along with requests, which yt-dlp then uses for pooled connections
+    from yt_dlp.networking._requests import RequestsRH
+except ImportError:
+    RequestsRH = None
+
+COPY_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MB chunks for cross-device copies
+CANCEL_POLL_INTERVAL = 0.2  # Seconds between cancel checks while waiting on ffmpeg
+MANIFEST_NAME = 'download_manifest.jsonl'
+DURATION_TOLERANCE = 2.0  # Seconds of slack allowed by the ffprobe check
+
+# Protocols fetched by ffmpeg itself in pipe-merge mode. When every track of a
+# bestvideo+bestaudio selection uses one of these, yt-dlp hands both URLs to a
+# single ffmpeg process which muxes them straight into the output file. Other
+# protocols (e.g. DASH fragments) fall back to separate downloads + merge.
+PIPE_MERGE_PROTOCOLS = ('http', 'https')  # Tracks ffmpeg can read straight from the server
+
+# Format choices as (combo label, short name for the API/CLI, yt-dlp selector, audio codec)
+FORMAT_CHOICES = [
+    ('Best Quality (Video + Audio)', 'best', 'bestvideo+bestaudio/best', None),
+    ('HD 1080p', '1080p', 'bestvideo[height<=1080]+bestaudio/best', None),
+    ('HD 720p', '720p', 'bestvideo[height<=720]+bestaudio/best', None),
+    ('SD 480p', '480p', 'bestvideo[height<=480]+bestaudio/best', None),
+    ('SD 360p', '360p', 'bestvideo[height<=360]+bestaudio/best', None),
+    ('Audio Only (MP3)', 'mp3', 'bestaudio/best', 'mp3'),
+    ('Audio Only (M4A)', 'm4a', 'bestaudio[ext=m4a]/bestaudio/best', 'm4a'),
+    ('Audio Only (Opus)', 'opus', 'bestaudio[acodec=opus]/bestaudio/best', 'opus'),
+]
+
+
+def find_format_choice(name):
+    """Look up a FORMAT_CHOICES entry by short name, label or index"""
+    for index, choice in enumerate(FORMAT_CHOICES):
+        if name in (choice[0], choice[1], index, str(index)):
+            return choice
+    raise ValueError(f"Unknown format '{name}', expected one of: "
+                     + ', '.join(choice[1] for choice in FORMAT_CHOICES))
+
+
+# Target audio codecs: (extension, source acodecs that can be stream-copied, encoder args)
+AUDIO_CODECS = {
+    'mp3': ('mp3', ('mp3',), ['-c:a', 'libmp3lame', '-q:a', '2']),
+    'm4a': ('m4a', ('mp4a', 'aac'), ['-c:a', 'aac', '-b:a', '192k']),
+    'opus': ('opus', ('opus',), ['-c:a', 'libopus', '-b:a', '160k']),
+}
+
+_manifest_lock = threading.Lock()
+_state_file_lock = threading.Lock()  # Held while a sync state or format plan file is rewritten
+_transcode_pool = None
+_transcode_pool_lock = threading.Lock()
+
+
+def get_transcode_pool():
+    """Process-wide pool of ffmpeg encoder slots, one per CPU core"""
+    global _transcode_pool
+    with _transcode_pool_lock:
+        if _transcode_pool is None:
+            _transcode_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2,
+                                                 thread_name_prefix='transcode')
+        return _transcode_pool
+
+
+class JobCancelled(yt_dlp.utils.DownloadCancelled):
+    """Raised from hooks and post-processors once a job has been asked to stop"""
+
+
+HOST_CONNECTION_LIMIT = 16  # Connections per host; enough for the most parallel fragments
+HOST_POOL_COUNT = 32  # Hosts whose connection pools are kept around
+HOST_POOL_TIMEOUT = 60  # Seconds a request waits for a free connection before failing
+
+
+if RequestsRH is not None:
+    class TimedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+        """Connection pool that gives up after HOST_POOL_TIMEOUT instead of waiting forever when full"""
+
+        def urlopen(self, *args, pool_timeout=None, **kwargs):
+            return super().urlopen(*args, pool_timeout=pool_timeout or HOST_POOL_TIMEOUT, **kwargs)
+
+    class TimedHTTPSConnectionPool(TimedHTTPConnectionPool, urllib3.HTTPSConnectionPool):
+        pass
+
+    class CappedRequestsRH(RequestsRH):
+        """yt-dlp's requests handler with blocking per-host pools of HOST_CONNECTION_LIMIT connections"""
+
+        def _create_instance(self, *args, **kwargs):
+            session = super()._create_instance(*args, **kwargs)
+            for adapter in set(session.adapters.values()):
+                adapter.init_poolmanager(HOST_POOL_COUNT, HOST_CONNECTION_LIMIT, block=True)
+                adapter.poolmanager.pool_classes_by_scheme = {
+                    'http': TimedHTTPConnectionPool, 'https': TimedHTTPSConnectionPool}
+            return session
+
+
+# YoutubeDL params a request director or cookie jar is built from; jobs share one only when all of these match
+SESSION_PARAMS = (
+    'proxy', 'socket_timeout', 'source_address', 'nocheckcertificate', 'legacyserverconnect',
+    'enable_file_urls', 'impersonate', 'client_certificate', 'client_certificate_key',
+    'client_certificate_password', 'http_headers', 'compat_opts', 'debug_printtraffic',
+    'cookiefile', 'cookiesfrombrowser',
+)
+
+
+def session_key(params):
+    """Hashable summary of the SESSION_PARAMS in a YoutubeDL params dict"""
+    key = []
+    for name in SESSION_PARAMS:
+        value = params.get(name)
+        if isinstance(value, dict):
+            value = tuple(sorted((k, repr(v)) for k, v in value.items()))
+        elif isinstance(value, (set, frozenset)):
+            value = frozenset(map(repr, value))
+        elif isinstance(value, (list, tuple)):
+            value = tuple(map(repr, value))
+        elif value is not None:
+            value = repr(value)
+        key.append(value)
+    return tuple(key)
+
+
+class SharedSession:
+    """HTTP state shared by every YoutubeDL this process creates.
+
+    yt-dlp builds a request director (its connection pools) and a cookie jar
+    per YoutubeDL, so each validation and each download started on cold
+    TCP/TLS connections and empty cookies. One long-lived owner instance per
+    set of network options (session_key) provides both to all others instead,
+    so a job with its own proxy, timeout or cookie file gets its own director.
+    When the requests package is installed, at most HOST_CONNECTION_LIMIT
+    connections per host are open at once; further requests wait up to
+    HOST_POOL_TIMEOUT for one to be released. SessionYoutubeDL returns
+    connections that extractors leave partly read.
+
+    This relies on yt-dlp internals (_REQUEST_HANDLERS, _RH_PREFERENCES, the
+    _request_director and cookiejar cached properties), which is why
+    requirements.txt pins the yt-dlp range and tests/test_shared_session.py
+    checks they are still there.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.owners = {}  # session_key -> owner YoutubeDL
+        self.directors = {}  # session_key -> request director
+        self.handlers = list(_REQUEST_HANDLERS.values())
+        if RequestsRH is not None:
+            self.handlers = [CappedRequestsRH if handler is RequestsRH else handler for handler in self.handlers]
+
+    def director_for(self, params):
+        """(director, cookiejar) for these params, built by a new owner the first time"""
+        key = session_key(params)
+        with self.lock:
+            if key not in self.owners:
+                owner = yt_dlp.YoutubeDL({
+                    **{name: params[name] for name in SESSION_PARAMS if params.get(name) is not None},
+                    'quiet': True, 'no_warnings': True,
+                })
+                self.directors[key] = owner.build_request_director(self.handlers, _RH_PREFERENCES)
+                self.owners[key] = owner
+            return self.directors[key], self.owners[key].cookiejar
+
+    def attach(self, ydl):
+        director, cookiejar = self.director_for(ydl.params)
+        stale = ydl.__dict__.pop('_request_director', None)
+        if stale is not None:
+            stale.close()
+        # Both are cached properties, so presetting them replaces the per-instance ones
+        ydl.__dict__['_request_director'] = director
+        ydl.__dict__['cookiejar'] = cookiejar
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = SharedSession()
+        return _shared_session
+
+
+class SessionYoutubeDL(yt_dlp.YoutubeDL):
+    """YoutubeDL that uses the process-wide SharedSession for HTTP and cookies"""
+
+    def __init__(self, params=None, auto_init=True):
+        self.open_responses = []
+        self.responses_lock = threading.Lock()  # urlopen is called from fragment threads too
+        super().__init__(params, auto_init)
+        get_shared_session().attach(self)
+
+    def urlopen(self, req):
+        response = super().urlopen(req)
+        with self.responses_lock:
+            self.open_responses = [r for r in self.open_responses if not r.fp.closed]
+            self.open_responses.append(response)
+        return response
+
+    def release_responses(self):
+        """Close responses nobody read to the end, returning their connections to the shared pool"""
+        with self.responses_lock:
+            responses, self.open_responses = self.open_responses, []
+        for response in responses:
+            if response.fp.closed:
+                continue  # Read to the end, its connection is back in the pool already
+            response.close()
+            release_conn = getattr(response.fp, 'release_conn', None)  # Only urllib3 responses pool
+            if release_conn:
+                release_conn()
+
+    def process_info(self, info_dict):
+        self.release_responses()  # Whatever extraction left open is no longer needed
+        return super().process_info(info_dict)
+
+    def close(self):
+        self.release_responses()
+        self.__dict__.pop('_request_director', None)  # Owned by the shared session
+        super().close()
+
+
+def call_ffmpeg(args, cancel_event=None):
+    """Run ffmpeg and return (returncode, stderr), terminating it if cancel_event gets set"""
+    proc = subprocess.Popen(['ffmpeg', '-y', '-loglevel', 'error', *args],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    while True:
+        try:
+            _, stderr = proc.communicate(timeout=CANCEL_POLL_INTERVAL)
+            return proc.returncode, stderr
+        except subprocess.TimeoutExpired:
+            if cancel_event is not None and cancel_event.is_set():
+                proc.terminate()
+                proc.communicate()
+                raise JobCancelled('Cancelled during post-processing')
+
+
+def new_hasher(algorithm):
+    """Return a fresh incremental hasher for 'sha256' or 'xxh64'"""
+    if algorithm == 'xxh64':
+        if xxhash is None:
+            raise RuntimeError('xxhash is not installed (pip install xxhash)')
+        return xxhash.xxh64()
+    return hashlib.new(algorithm)
+
+
+def hash_file(path, hasher):
+    """Feed an existing file into hasher in chunks"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(COPY_CHUNK_SIZE)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher
+
+
+def remove_files(paths):
+    """Delete whichever of paths exist"""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def finalize_file(src, dest_dir, hasher=None, dest_name=None):
+    """Move a finished file from staging into dest_dir in one final step.
+
+    Uses a plain rename when both paths share a filesystem, otherwise streams
+    the file into a hidden temp name next to the destination and renames it,
+    so a partially copied file is never visible under its final name.
+    If a hasher is given it is fed the bytes as they are copied.
+    """
+    dest_name = dest_name or os.path.basename(src)
+    dest = os.path.join(dest_dir, dest_name)
+    os.makedirs(dest_dir, exist_ok=True)
+    if os.stat(src).st_dev == os.stat(dest_dir).st_dev:
+        if hasher is not None:
+            hash_file(src, hasher)  # Read from the (fast) staging copy, not the destination
+        os.replace(src, dest)
+        return dest
+
+    tmp_dest = os.path.join(dest_dir, f'.{dest_name}.finalizing')
+    try:
+        with open(src, 'rb') as fin, open(tmp_dest, 'wb') as fout:
+            while True:
+                chunk = fin.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if hasher is not None:
+                    hasher.update(chunk)
+                fout.write(chunk)
+            fout.flush()
+            os.fsync(fout.fileno())
+        shutil.copystat(src, tmp_dest)
+        os.replace(tmp_dest, dest)
+    except BaseException:
+        if os.path.exists(tmp_dest):
+            os.remove(tmp_dest)
+        raise
+    os.remove(src)
+    return dest
+
+
+FICLONE = 0x40049409  # Linux ioctl for copy-on-write clones (btrfs, XFS)
+
+
+def reflink_file(src, dest):
+    """Make dest a copy-on-write clone of src, raising OSError where unsupported"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError('Reflinks are not supported on this platform')
+    try:
+        with open(src, 'rb') as fin, open(dest, 'wb') as fout:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+    except OSError:
+        remove_files([dest])
+        raise
+
+
+def link_file(src, dest):
+    """Expose src at dest as a hardlink, else a reflink, else a symlink"""
+    if os.path.lexists(dest):
+        if os.path.exists(dest) and os.path.samefile(src, dest):
+            return dest
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+        return dest
+    except OSError:
+        pass  # Different filesystem or no hardlink support
+    try:
+        reflink_file(src, dest)
+        return dest
+    except OSError:
+        pass
+    os.symlink(os.path.abspath(src), dest)
+    return dest
+
+
+class MediaLibrary:
+    """Content-addressed store holding one file per (video ID, format).
+
+    Files live in root/<first two ID chars>/<id>.<format key>.<ext>; output
+    folders get links to them under their own names, so a video shared by
+    several playlists is downloaded and stored once.
+    """
+
+    def __init__(self, root, format_id, audio_codec=None):
+        self.root = root
+        self.format_key = self.make_format_key(format_id, audio_codec)
+
+    @staticmethod
+    def make_format_key(format_id, audio_codec=None):
+        for _, name, selector, codec in FORMAT_CHOICES:
+            if selector == format_id and codec == audio_codec:
+                return name
+        return hashlib.sha1(f'{format_id}|{audio_codec}'.encode('utf-8')).hexdigest()[:10]
+
+    def shard_dir(self, video_id):
+        return os.path.join(self.root, video_id[:2].lower())
+
+    def path_for(self, video_id, ext):
+        return os.path.join(self.shard_dir(video_id), f'{video_id}.{self.format_key}.{ext}')
+
+    def find(self, video_id):
+        """Path of the stored file for video_id, or None"""
+        prefix = f'{video_id}.{self.format_key}.'
+        try:
+            names = os.listdir(self.shard_dir(video_id))
+        except OSError:
+            return None
+        for name in names:
+            if name.startswith(prefix):
+                return os.path.join(self.shard_dir(video_id), name)
+        return None
+
+    def link(self, stored_path, dest):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        return link_file(stored_path, dest)
+
+
+# Output layouts as (combo label, short name for the API/CLI, outtmpl folder part)
+OUTPUT_LAYOUTS = [
+    ('All Files in One Folder', 'flat', ''),
+    ('Folder per Playlist', 'playlist', '%(playlist_title,playlist_id|Singles)s'),
+    ('Folders by Upload Year/Month', 'date', os.path.join('%(upload_date>%Y|undated)s', '%(upload_date>%m|00)s')),
+    ('Folders by Video ID Prefix', 'id', '%(id.:2)s'),
+]
+# Extensions of finished downloads. Partial files, thumbnails, subtitles and
+# .info.json files next to them are left out of the output index.
+VIDEO_OUTPUT_EXTS = {'mp4', 'mkv', 'webm', 'mov', 'm4v', 'flv', 'avi', '3gp', 'ts'}
+AUDIO_OUTPUT_EXTS = {'mp3', 'm4a', 'opus', 'ogg', 'aac', 'flac', 'wav'}
+INTERMEDIATE_STEM_RE = re.compile(r'\.(f\d[\w-]*|f(hls|dash|http)-[\w-]+|temp)$')  # Single tracks before merging: name.f137.mp4
+
+
+def find_output_layout(name):
+    """Look up an OUTPUT_LAYOUTS entry by short name, label or index"""
+    for index, layout in enumerate(OUTPUT_LAYOUTS):
+        if name in (layout[0], layout[1], index, str(index)):
+            return layout
+    raise ValueError(f"Unknown layout '{name}', expected one of: "
+                     + ', '.join(layout[1] for layout in OUTPUT_LAYOUTS))
+
+
+class OutputIndex:
+    """In-memory index of the finished files under an output folder.
+
+    Maps each folder (relative to root) to the names of its media files
+    without extension and the extensions present for each, so checking whether
+    an entry's output exists is a dict lookup instead of a filesystem probe.
+    refresh() rescans only the folders whose mtime changed, since adding,
+    removing or renaming a file updates it.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.dirs = {}  # relative folder -> (mtime_ns, {stem: extensions}, relative subfolders)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def media_name(name):
+        """(stem, lowercase extension) of a finished media file, None for anything else"""
+        base, ext = os.path.splitext(name)
+        ext = ext[1:].lower()
+        if name.startswith('.') or (ext not in VIDEO_OUTPUT_EXTS and ext not in AUDIO_OUTPUT_EXTS):
+            return None
+        if INTERMEDIATE_STEM_RE.search(base):
+            return None
+        return base, ext
+
+    def refresh(self):
+        """Bring the index up to date; returns the number of folders that were rescanned"""
+        rescanned = 0
+        with self.lock:
+            seen = set()
+            pending = ['']
+            while pending:
+                rel = pending.pop()
+                path = os.path.join(self.root, rel)
+                try:
+                    mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(rel)
+                cached = self.dirs.get(rel)
+                if cached and cached[0] == mtime:
+                    pending.extend(cached[2])
+                    continue
+                files, subdirs = defaultdict(set), []
+                try:
+                    with os.scandir(path) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False):
+                                if not entry.name.startswith('.'):
+                                    subdirs.append(os.path.join(rel, entry.name))
+                            else:
+                                media = self.media_name(entry.name)
+                                if media:
+                                    files[media[0]].add(media[1])
+                except OSError:
+                    continue
+                self.dirs[rel] = (mtime, dict(files), subdirs)
+                rescanned += 1
+                pending.extend(subdirs)
+            for rel in set(self.dirs) - seen:
+                del self.dirs[rel]
+        return rescanned
+
+    def contains(self, relative_stem, exts):
+        """Whether a finished file root/relative_stem.<one of exts> is indexed"""
+        folder, name = os.path.split(os.path.normpath(relative_stem))
+        cached = self.dirs.get(folder)
+        return cached is not None and not cached[1].get(name, set()).isdisjoint(exts)
+
+
+_output_indexes = {}
+_output_indexes_lock = threading.Lock()
+
+
+def get_output_index(root):
+    """The process-wide OutputIndex for root, built on first use and refreshed on every call"""
+    root = os.path.abspath(root)
+    with _output_indexes_lock:
+        index = _output_indexes.get(root)
+        if index is None:
+            index = _output_indexes[root] = OutputIndex(root)
+    index.refresh()
+    return index
+
+
+def probe_integrity(path, expected_duration=None):
+    """Quick ffprobe check of a finished file, returns (ok, message).
+
+    Only the container headers are read, so this is cheap even for large files.
+    """
+    if shutil.which('ffprobe') is None:
+        return True, 'ffprobe not found, integrity check skipped'
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+         '-of', 'default=noprint_wrappers=1:nokey=1', path],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0 or result.stderr.strip():
+        return False, result.stderr.strip() or f'ffprobe exited with {result.returncode}'
+    try:
+        duration = float(result.stdout.strip())
+    except ValueError:
+        return False, 'No duration found in container'
+    if expected_duration and duration + DURATION_TOLERANCE < expected_duration:
+        return False, f'Truncated: {duration:.1f}s of expected {expected_duration:.1f}s'
+    return True, f'OK ({duration:.1f}s)'
+
+
+def update_json_file(path, update):
+    """Apply update(state) to the JSON object stored at path and write it back.
+
+    The file is re-read under a process-wide lock so jobs sharing a folder
+    merge their changes instead of overwriting each other's, and the result
+    goes to a unique temporary file that replaces path in one step.
+    Raises OSError if the file can't be written.
+    """
+    directory = os.path.dirname(path) or '.'
+    with _state_file_lock:
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        update(state)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def append_manifest(manifest_path, entry):
+    """Append one JSON line to the download manifest"""
+    with _manifest_lock:
+        with open(manifest_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+
+class FinalizePP(PostProcessor):
+    """Moves the finished output to save_path and optionally records its checksum.
+
+    dest_dir is None when there is no staging directory, in which case the file
+    is left in place and only hashed/verified. With a library the file is
+    stored there and linked into the output folder instead.
+    """
+
+    def __init__(self, dest_dir=None, hash_algorithm=None, expected_duration=None, status_callback=None, library=None, staging_root=None):
+        super().__init__()
+        self.dest_dir = dest_dir
+        self.staging_root = staging_root  # Subfolders of this are recreated under dest_dir
+        self.library = library
+        self.hash_algorithm = hash_algorithm
+        self.expected_duration = expected_duration  # Overrides info duration for clips
+        self.status_callback = status_callback
+
+    def report(self, msg):
+        if self.status_callback:
+            self.status_callback(msg)
+
+    def destination(self, src):
+        """dest_dir plus src's subfolder of the staging root (output layouts)"""
+        if not self.staging_root:
+            return self.dest_dir
+        return os.path.normpath(os.path.join(self.dest_dir, os.path.relpath(os.path.dirname(src), self.staging_root)))
+
+    def run(self, info):
+        src = info.get('filepath')
+        if not src or not os.path.exists(src):
+            return [], info
+
+        hasher = new_hasher(self.hash_algorithm) if self.hash_algorithm else None
+        if self.library and info.get('id'):
+            self.report(f'Adding {os.path.basename(src)} to library...')
+            stored_path = self.library.path_for(info['id'], os.path.splitext(src)[1].lstrip('.'))
+            stored_path = finalize_file(src, os.path.dirname(stored_path), hasher,
+                                        dest_name=os.path.basename(stored_path))
+            link_dir = self.destination(src) if self.dest_dir else os.path.dirname(src)
+            info['filepath'] = self.library.link(stored_path, os.path.join(link_dir, os.path.basename(src)))
+        elif self.dest_dir:
+            self.report(f'Moving {os.path.basename(src)} to destination...')
+            info['filepath'] = finalize_file(src, self.destination(src), hasher)
+        elif hasher is not None:
+            hash_file(src, hasher)
+
+        if hasher is not None:
+            path = info['filepath']
+            ok, message = probe_integrity(path, self.expected_duration or info.get('duration'))
+            append_manifest(os.path.join(os.path.dirname(path), MANIFEST_NAME), {
+                'id': info.get('id'),
+                'title': info.get('title'),
+                'file': os.path.basename(path),
+                'size': os.path.getsize(path),
+                'algorithm': self.hash_algorithm,
+                'digest': hasher.hexdigest(),
+                'verified': ok,
+                'check': message,
+                'time': int(time.time()),
+            })
+            self.report(f'Verified {os.path.basename(path)}: {message}' if ok
+                        else f'Warning: integrity check failed for {os.path.basename(path)}: {message}')
+        return [], info
+
+
+class PooledPP(PostProcessor):
+    """Base for post-processors that hand ffmpeg work to the shared transcode pool.
+
+    next_pp (e.g. a FinalizePP) is run on each produced file once it is ready,
+    which may be on a pool thread after yt-dlp has moved on to the next item.
+    """
+
+    def __init__(self, next_pp=None, status_callback=None, cancel_event=None):
+        super().__init__()
+        self.next_pp = next_pp
+        self.status_callback = status_callback
+        self.cancel_event = cancel_event  # Set by the owning job to stop queued and running ffmpeg work
+        self.pending = []  # Futures of jobs still running in the pool
+
+    def report(self, msg):
+        if self.status_callback:
+            self.status_callback(msg)
+
+    def submit(self, fn, *args):
+        self.pending.append(get_transcode_pool().submit(self.run_pooled, fn, *args))
+
+    def run_pooled(self, fn, *args):
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise JobCancelled('Cancelled before post-processing')
+        return fn(*args)
+
+    def finish(self, info):
+        if self.next_pp:
+            return self.next_pp.run(info)
+        return [], info
+
+    def wait(self):
+        """Block until every queued job is done, re-raising the first error"""
+        while self.pending:
+            self.pending.pop(0).result()
+
+    def cancel(self):
+        """Drop queued work that has not started yet"""
+        for future in self.pending:
+            future.cancel()
+
+
+def run_ffmpeg(args, src, tmp_dest, dest, cancel_event=None):
+    """Run ffmpeg into a temp name and rename it into place when it succeeds"""
+    try:
+        returncode, stderr = call_ffmpeg([*args, tmp_dest], cancel_event)
+    except BaseException:
+        remove_files([tmp_dest])
+        raise
+    if returncode != 0:
+        remove_files([tmp_dest])
+        raise RuntimeError(f'ffmpeg failed on {os.path.basename(src)}: {stderr.strip()}')
+    os.replace(tmp_dest, dest)
+
+
+class AudioConvertPP(PooledPP):
+    """Turns downloaded audio into the requested codec.
+
+    Matching codecs are remuxed with stream copy inline; everything else is
+    handed to the shared transcode pool so the next download can start while
+    the encoder runs.
+    """
+
+    def __init__(self, codec, next_pp=None, status_callback=None, cancel_event=None):
+        super().__init__(next_pp, status_callback, cancel_event)
+        self.codec = codec
+
+    def run(self, info):
+        src = info.get('filepath')
+        if not src or not os.path.exists(src):
+            return [], info
+
+        ext, copy_codecs, encode_args = AUDIO_CODECS[self.codec]
+        acodec = (info.get('acodec') or '').lower()
+        stream_copy = acodec.startswith(copy_codecs)
+        if stream_copy and src.endswith('.' + ext):
+            return self.finish(info)  # Already in the right container, nothing to do
+
+        if stream_copy:
+            self.report(f'Remuxing {os.path.basename(src)} to {ext}...')
+            self.convert(info, ['-c:a', 'copy'])
+            return self.finish(info)
+
+        self.report(f'Queued {os.path.basename(src)} for {self.codec} conversion')
+        self.submit(self.convert_and_finish, info, encode_args)
+        return [], info
+
+    def convert(self, info, codec_args):
+        src = info['filepath']
+        ext = AUDIO_CODECS[self.codec][0]
+        base = os.path.splitext(src)[0]
+        dest = f'{base}.{ext}'
+        run_ffmpeg(['-i', src, '-vn', '-map_metadata', '0', *codec_args],
+                   src, f'{base}.converting.{ext}', dest, self.cancel_event)
+        if dest != src:
+            os.remove(src)
+        info['filepath'] = dest
+        info['ext'] = ext
+
+    def convert_and_finish(self, info, codec_args):
+        self.convert(info, codec_args)
+        self.finish(info)
+        self.report(f'Converted {os.path.basename(info["filepath"])}')
+
+def parse_timestamp(value):
+    """Parse seconds or [[hh:]mm:]ss(.ms) into float seconds"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).strip().split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def format_timestamp(seconds):
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+def load_clip_ranges(path):
+    """Read clip ranges from a CSV (start,end[,name]) or JSON file.
+
+    JSON may be a list of [start, end(, name)] lists or of objects with
+    start/end/name keys. Returns a list of (start, end, name) tuples.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            rows = json.load(f)
+        else:
+            rows = [row for row in csv.reader(f) if row and not row[0].startswith('#')]
+
+    ranges = []
+    for row in rows:
+        if isinstance(row, dict):
+            start, end, name = row.get('start'), row.get('end'), row.get('name', '')
+        else:
+            start, end, name = row[0], row[1], row[2] if len(row) > 2 else ''
+        try:
+            start, end = parse_timestamp(start), parse_timestamp(end)
+        except ValueError:
+            continue  # Header row or junk
+        if end <= start:
+            raise ValueError(f'Clip end must be after start: {start} - {end}')
+        ranges.append((start, end, str(name).strip()))
+    return ranges
+
+
+class ClipPP(PooledPP):
+    """Cuts several clips out of one downloaded source.
+
+    Each clip is a stream-copied cut (so boundaries snap to keyframes) run on
+    the shared transcode pool; the source is removed once every cut has
+    succeeded, and kept if any of them failed or was cancelled.
+    """
+
+    def __init__(self, ranges, next_pp=None, status_callback=None, cancel_event=None):
+        super().__init__(next_pp, status_callback, cancel_event)
+        self.ranges = ranges
+        self.lock = threading.Lock()
+
+    def run(self, info):
+        src = info.get('filepath')
+        if not src or not os.path.exists(src):
+            return [], info
+
+        self.report(f'Cutting {len(self.ranges)} clips from {os.path.basename(src)}...')
+        remaining = [len(self.ranges), 0]  # Cuts still running, cuts that failed
+        for number, (start, end, name) in enumerate(self.ranges, 1):
+            self.submit(self.cut, info, number, start, end, name, remaining)
+        return [], info
+
+    def cut(self, info, number, start, end, name, remaining):
+        src = info['filepath']
+        base, ext = os.path.splitext(src)
+        label = yt_dlp.utils.sanitize_filename(name) if name else \
+            f"{format_timestamp(start)}-{format_timestamp(end)}".replace(':', '.')
+        dest = f'{base} [{number:02d} {label}]{ext}'
+        succeeded = False
+        try:
+            run_ffmpeg(['-ss', str(start), '-i', src, '-t', str(end - start),
+                        '-map', '0', '-c', 'copy', '-avoid_negative_ts', 'make_zero'],
+                       src, f'{base} [{number:02d}].cutting{ext}', dest, self.cancel_event)
+            succeeded = True
+        finally:
+            with self.lock:
+                remaining[0] -= 1
+                remaining[1] += not succeeded
+                last = remaining[0] == 0
+                failed = remaining[1]
+            if last and not failed:
+                os.remove(src)
+            elif last:
+                self.report(f'Kept {os.path.basename(src)}: {failed} clip(s) failed')
+        clip_info = dict(info, filepath=dest, duration=end - start,
+                         title=f"{info.get('title', '')} [{label}]")
+        self.finish(clip_info)
+        self.report(f'Clip {number} of {len(self.ranges)} done')
+
+class ChapterSplitPP(PooledPP):
+    """Splits a downloaded file into one file per chapter.
+
+    Uses a single ffmpeg segment-muxer pass with stream copy, so the source is
+    read once; split points snap to the first keyframe at or after each chapter
+    start. Files without chapters pass through unchanged.
+    """
+
+    def run(self, info):
+        src = info.get('filepath')
+        chapters = info.get('chapters') or []
+        if not src or not os.path.exists(src) or len(chapters) < 2:
+            return self.finish(info)
+
+        self.report(f'Splitting {os.path.basename(src)} into {len(chapters)} chapters...')
+        self.submit(self.split, info, chapters)
+        return [], info
+
+    def split(self, info, chapters):
+        src = info['filepath']
+        base, ext = os.path.splitext(src)
+        # The base goes into a %-pattern (here and in ffmpeg's segment muxer), so escape titles like '100%'
+        pattern = base.replace('%', '%%') + f'.chapter%03d{ext}'
+        split_times = ','.join(str(chapter['start_time']) for chapter in chapters[1:])
+        segments = [pattern % i for i in range(len(chapters))]
+        try:
+            returncode, stderr = call_ffmpeg(
+                ['-i', src, '-map', '0', '-c', 'copy', '-f', 'segment',
+                 '-segment_times', split_times, '-reset_timestamps', '1', pattern],
+                self.cancel_event
+            )
+        except BaseException:
+            remove_files(segments)
+            raise
+        if returncode != 0:
+            remove_files(segments)
+            raise RuntimeError(f'ffmpeg failed on {os.path.basename(src)}: {stderr.strip()}')
+        os.remove(src)
+
+        for number, (chapter, segment) in enumerate(zip(chapters, segments), 1):
+            if not os.path.exists(segment):
+                continue  # Chapter shorter than a GOP, merged into its neighbour
+            title = yt_dlp.utils.sanitize_filename(chapter.get('title') or f'Chapter {number}')
+            dest = f'{base} - {number:02d} {title}{ext}'
+            os.replace(segment, dest)
+            chapter_info = dict(info, filepath=dest, chapters=None,
+                                duration=chapter['end_time'] - chapter['start_time'],
+                                title=f"{info.get('title', '')} - {title}")
+            self.finish(chapter_info)
+        self.report(f'Split {os.path.basename(src)} into {len(chapters)} chapters')
+
+SYNC_STATE_NAME = '.playlist_sync.json'
+SYNC_STOP_STREAK = 10  # Known entries in a row that end a newest-first enumeration
+REMOVED_DIR_NAME = 'Removed'
+
+
+class PlaylistSync:
+    """Keeps a local playlist mirror current by diffing entry IDs.
+
+    State lives in save_path/.playlist_sync.json, keyed by playlist ID: the
+    last-seen ordered ID list and the IDs already downloaded. Downloaded files
+    are found by their %(playlist_index)03d_ prefix, so reorders are handled by
+    renaming instead of refetching. Only finished media counts: partial files,
+    single tracks and thumbnails/subtitles are neither counted nor moved.
+    """
+
+    def __init__(self, save_path, url, check_interrupt=None):
+        self.save_path = save_path
+        self.url = url
+        self.check_interrupt = check_interrupt  # Called per entry; raises to abort a long enumeration
+        self.state_path = os.path.join(save_path, SYNC_STATE_NAME)
+        self.playlist_id = None
+        self.ids = []           # Entry IDs in playlist order after this sync
+        self.new_positions = [] # 1-based positions of entries to download
+        self.moves = {}         # old position -> new position for already downloaded entries
+        self.removed = []       # Old positions of downloaded entries no longer in the playlist
+        self.done = set()       # IDs that have been downloaded
+
+    def load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def enumerate_ids(self, known_ids, newest_first):
+        """Fetch the current entry IDs, stopping early on newest-first playlists"""
+        ydl_opts = {
+            'extract_flat': True,
+            'lazy_playlist': True,
+            'quiet': True,
+            'no_warnings': True,
+        }
+        ids = []
+        streak = 0
+        with SessionYoutubeDL(ydl_opts) as ydl:
+            info = follow_url_results(ydl, ydl.extract_info(self.url, download=False, process=False))
+            self.playlist_id = info.get('id') or self.url
+            for entry in info.get('entries') or []:
+                if self.check_interrupt:
+                    self.check_interrupt()
+                entry_id = entry.get('id') if entry else None  # Keep positions of unavailable entries
+                ids.append(entry_id)
+                if newest_first:
+                    streak = streak + 1 if entry_id in known_ids else 0
+                    if streak >= SYNC_STOP_STREAK:
+                        return ids, False
+        return ids, True
+
+    def plan(self, newest_first=False):
+        """Diff the live playlist against the stored state"""
+        state = self.load_state()
+        # The playlist ID is only known after enumerating, so look up by URL first
+        previous = next((p for p in state.values() if p.get('url') == self.url), {})
+        old_ids = previous.get('ids', [])
+        done = set(previous.get('done', []))
+
+        fresh_ids, complete = self.enumerate_ids(done, newest_first)
+        if not any(fresh_ids) and (done or self.local_files()):
+            # Far more likely a failed lookup than a playlist emptied out; don't archive everything
+            raise RuntimeError('The playlist returned no videos; not syncing so existing files are left alone')
+        if complete:
+            self.ids = fresh_ids
+        else:
+            # Only the newest part was fetched. The old entries after the last one seen there keep
+            # their order behind it; older ones that should have been seen before it are gone.
+            seen = set(fresh_ids)
+            old_index = {entry_id: pos for pos, entry_id in enumerate(old_ids) if entry_id}
+            anchor = max((old_index[i] for i in fresh_ids if i in old_index), default=-1)
+            self.ids = fresh_ids + [i for i in old_ids[anchor + 1:] if i not in seen]
+
+        new_index = {entry_id: pos for pos, entry_id in enumerate(self.ids, 1) if entry_id}
+        self.new_positions = [pos for entry_id, pos in new_index.items() if entry_id not in done]
+        self.moves = {}
+        self.removed = []
+        for old_pos, entry_id in enumerate(old_ids, 1):
+            if entry_id not in done:
+                continue
+            if entry_id not in new_index:
+                self.removed.append(old_pos)
+            elif new_index[entry_id] != old_pos:
+                self.moves[old_pos] = new_index[entry_id]
+        self.done = done & set(new_index)
+        return self.new_positions
+
+    def local_files(self):
+        return [name for name in os.listdir(self.save_path) if not name.startswith('.')]
+
+    def files_at(self, position):
+        """Finished media files saved for a playlist position"""
+        prefix = f'{position:03d}_'
+        return [name for name in os.listdir(self.save_path)
+                if name.startswith(prefix) and OutputIndex.media_name(name)]
+
+    def apply_renames(self):
+        """Rename downloaded files to their new positions (two phases to avoid clashes)"""
+        staged = []
+        for old_pos, new_pos in self.moves.items():
+            for name in self.files_at(old_pos):
+                tmp_name = f'.sync_{new_pos:03d}_{name.split("_", 1)[1]}'
+                os.replace(os.path.join(self.save_path, name), os.path.join(self.save_path, tmp_name))
+                staged.append(tmp_name)
+        for tmp_name in staged:
+            os.replace(os.path.join(self.save_path, tmp_name), os.path.join(self.save_path, tmp_name[6:]))
+        return len(staged)
+
+    def archive_removed(self):
+        """Move files of entries that left the playlist into the Removed folder"""
+        removed_dir = os.path.join(self.save_path, REMOVED_DIR_NAME)
+        count = 0
+        for old_pos in self.removed:
+            for name in self.files_at(old_pos):
+                os.makedirs(removed_dir, exist_ok=True)
+                os.replace(os.path.join(self.save_path, name), os.path.join(removed_dir, name.split('_', 1)[1]))
+                count += 1
+        return count
+
+    def commit(self):
+        """Record which new entries now have files and save the state"""
+        for pos in self.new_positions:
+            if self.files_at(pos):
+                self.done.add(self.ids[pos - 1])
+        entry = {'url': self.url, 'ids': self.ids, 'done': sorted(self.done)}
+        update_json_file(self.state_path, lambda state: state.update({self.playlist_id: entry}))
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def normalize_text(text):
+    """Case- and diacritic-folded form of text used for searching"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+class TitleIndex:
+    """Precomputed search index over playlist entry titles.
+
+    Plain queries match entries containing a token starting with every query
+    word (so partially typed words already match), after case and diacritic
+    folding. Lookups go through a sorted token list, not a scan of all titles.
+    """
+
+    def __init__(self, titles, durations=None):
+        self.titles = titles  # Any sequence, e.g. an EntryStore column
+        self.durations = durations or []
+        postings = defaultdict(set)
+        for index, title in enumerate(titles):
+            for token in TOKEN_RE.findall(normalize_text(title)):
+                postings[token].add(index)
+        self.postings = postings
+        self.tokens = sorted(postings)
+
+    def prefix_matches(self, word):
+        """Indices of entries with a token starting with word"""
+        matches = set()
+        position = bisect.bisect_left(self.tokens, word)
+        while position < len(self.tokens) and self.tokens[position].startswith(word):
+            matches |= self.postings[self.tokens[position]]
+            position += 1
+        return matches
+
+    def search(self, query='', regex=False, min_duration=None, max_duration=None):
+        """Sorted 0-based indices of entries matching query and the duration range.
+
+        Raises re.error for an invalid regex.
+        """
+        if regex and query:
+            pattern = re.compile(query, re.IGNORECASE)
+            matches = {i for i, title in enumerate(self.titles) if pattern.search(title)}
+        else:
+            words = TOKEN_RE.findall(normalize_text(query))
+            matches = None
+            for word in sorted(words, key=len, reverse=True):  # Longest words narrow fastest
+                word_matches = self.prefix_matches(word)
+                matches = word_matches if matches is None else matches & word_matches
+                if not matches:
+                    break
+            if matches is None:
+                matches = set(range(len(self.titles)))
+
+        if (min_duration or max_duration) and self.durations:
+            # One pass over the column rather than a lookup per match
+            matches = {i for i, duration in enumerate(self.durations)
+                       if i in matches
+                       and (not min_duration or duration >= min_duration)
+                       and (not max_duration or duration <= max_duration)}
+        return sorted(matches)
+
+
+PLAUSIBLE_URL_RE = re.compile(r'^(https?://)?([\w-]+\.)+[a-z]{2,}/\S+', re.IGNORECASE)
+VALIDATION_DEBOUNCE_MS = 400
+MAX_URL_REDIRECTS = 5
+
+
+def follow_url_results(ydl, info, check_cancelled=None):
+    """Resolve url/url_transparent results (short links, channel -> uploads playlist) unprocessed"""
+    for _ in range(MAX_URL_REDIRECTS):
+        if info.get('_type') not in ('url', 'url_transparent'):
+            break
+        if check_cancelled is not None:
+            check_cancelled()
+        info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+    return info
+
+
+class ValidationCancelled(Exception):
+    """Raised inside UrlValidator once a newer validation has superseded it"""
+
+
+ENTRY_STORE_BATCH = 1000  # Rows per insert batch and per read chunk
+
+
+class EntryColumn:
+    """Read-only sequence view of one EntryStore column (0-based), read from SQLite on access"""
+
+    def __init__(self, store, name):
+        self.store = store
+        self.name = name
+
+    def __len__(self):
+        return len(self.store)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.store)
+        row = self.store.fetch_one(f'SELECT {self.name} FROM entries WHERE position = ?', (index + 1,))
+        if row is None:
+            raise IndexError(index)
+        return row[0]
+
+    def __iter__(self):
+        return self.store.iter_column(self.name)
+
+
+class EntryStore:
+    """Playlist entries (id, title, duration, selected) in a temporary SQLite file.
+
+    The validator writes the entries once; the playlist list, title filter and
+    job setup read them by 1-based position, so a 50k-entry channel isn't held
+    as Python lists and copied between them. The file is removed when the store
+    is closed or garbage collected.
+    """
+
+    def __init__(self):
+        fd, self.path = tempfile.mkstemp(prefix='playlist-', suffix='.sqlite')
+        os.close(fd)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode = OFF')  # Scratch data, nothing to recover
+        self.conn.execute('PRAGMA synchronous = OFF')
+        self.conn.execute('CREATE TABLE entries (position INTEGER PRIMARY KEY, id TEXT, title TEXT, '
+                          'duration REAL, selected INTEGER NOT NULL DEFAULT 1)')
+        self.lock = threading.Lock()  # Written by the validator thread, read by the GUI
+        self.count = 0
+        self.pending = []
+        self.titles = EntryColumn(self, 'title')
+        self.durations = EntryColumn(self, 'duration')
+        self.finalizer = weakref.finalize(self, EntryStore.remove, self.conn, self.path)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """A new store holding (id, title, duration) rows in order"""
+        store = cls()
+        for row in rows:
+            store.append(*row)
+        store.flush()
+        return store
+
+    def copy(self):
+        """A new store with the same entries, copied page by page inside SQLite"""
+        store = EntryStore()
+        with self.lock:
+            self.conn.backup(store.conn)
+        store.count = self.count
+        return store
+
+    @staticmethod
+    def remove(conn, path):
+        conn.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def close(self):
+        self.finalizer()
+
+    def __len__(self):
+        return self.count
+
+    def append(self, video_id, title, duration):
+        """Buffer one entry at the next position; call flush() when done"""
+        self.pending.append((self.count + len(self.pending) + 1, video_id, title, duration))
+        if len(self.pending) >= ENTRY_STORE_BATCH:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.conn.executemany('INSERT INTO entries (position, id, title, duration) VALUES (?, ?, ?, ?)',
+                                  self.pending)
+            self.conn.commit()
+        self.count += len(self.pending)
+        self.pending = []
+
+    def fetch_one(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def iter_column(self, name, where=''):
+        """Yield a column in position order, reading it in chunks"""
+        last = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(
+                    f'SELECT position, {name} FROM entries WHERE position > ? {where} '
+                    f'ORDER BY position LIMIT ?', (last, ENTRY_STORE_BATCH)).fetchall()
+            if not rows:
+                return
+            for position, value in rows:
+                yield value
+            last = rows[-1][0]
+
+    def entry(self, position):
+        """(id, title, duration, selected) of the entry at a 1-based position"""
+        return self.fetch_one('SELECT id, title, duration, selected FROM entries WHERE position = ?', (position,))
+
+    def is_selected(self, position):
+        row = self.fetch_one('SELECT selected FROM entries WHERE position = ?', (position,))
+        return bool(row and row[0])
+
+    def set_selected(self, positions, selected):
+        with self.lock:
+            self.conn.executemany('UPDATE entries SET selected = ? WHERE position = ?',
+                                  ((int(selected), position) for position in positions))
+            self.conn.commit()
+
+    def set_all_selected(self, selected):
+        with self.lock:
+            self.conn.execute('UPDATE entries SET selected = ?', (int(selected),))
+            self.conn.commit()
+
+    def selected_count(self):
+        return self.fetch_one('SELECT COUNT(*) FROM entries WHERE selected')[0]
+
+    def selection_spec(self):
+        """Selected positions as a compact playlist_items spec, e.g. '1-40,42,50-60'"""
+        ranges = []
+        for position in self.iter_column('position', 'AND selected'):
+            if ranges and ranges[-1][1] == position - 1:
+                ranges[-1][1] = position
+            else:
+                ranges.append([position, position])
+        return ','.join(f'{start}-{end}' if end > start else str(start) for start, end in ranges)
+
+
+def fetch_url_metadata(url, is_cancelled=None):
+    """Look up a video or playlist without downloading it.
+
+    Returns (title, video_count, entries, duration) where entries is an
+    EntryStore for playlists and None for single videos. Entries are written
+    to the store page by page as they arrive. Raises ValidationCancelled as
+    soon as is_cancelled() turns true.
+    """
+    def check_cancelled():
+        if is_cancelled is not None and is_cancelled():
+            raise ValidationCancelled('Validation superseded')
+
+    ydl_opts = {
+        'extract_flat': True,  # Only extract metadata, don't download video info
+        'lazy_playlist': True,  # Page through entries so a superseded validation stops early
+        'quiet': True,
+        'no_warnings': True,
+    }
+    with SessionYoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        # Follow redirects such as short links to the actual video or playlist page
+        info = follow_url_results(ydl, info, check_cancelled)
+        is_playlist = 'entries' in info
+        title = info.get('title', '')
+        duration = info.get('duration', 0) if not is_playlist else 0  # Get video duration in seconds
+        
+        # Store video titles (and durations, when the playlist lists them) for playlist
+        entries = None
+        if is_playlist:
+            entries = EntryStore()
+            try:
+                for entry in info['entries']:
+                    check_cancelled()
+                    entry = entry or {}  # Keep the position of unavailable entries
+                    entries.append(entry.get('id'), entry.get('title', 'Unknown Title'), float(entry.get('duration') or 0))
+                entries.flush()
+            except BaseException:
+                entries.close()
+                raise
+        video_count = len(entries) if is_playlist else 1
+        return title, video_count, entries, float(duration or 0)
+
+
+METADATA_CACHE_TTL = 600  # Seconds a looked-up URL's metadata is reused
+METADATA_CACHE_ENTRIES = 200000  # Playlist entries kept across all cached URLs (a single video counts as one)
+
+_metadata_cache = {}  # url -> (monotonic time stored, title, count, EntryStore or None, duration), oldest first
+_metadata_cache_size = 0  # Entries held by _metadata_cache
+_metadata_cache_lock = threading.Lock()
+
+
+def _expire_metadata_cache(room=0):
+    """Drop entries older than METADATA_CACHE_TTL, then the oldest until room more entries fit; hold the lock"""
+    global _metadata_cache_size
+    now = time.monotonic()
+    # Entries are kept in insertion order, so the ones to drop are all at the front
+    for key, (stamp, _, count, entries, _) in list(_metadata_cache.items()):
+        if now - stamp < METADATA_CACHE_TTL and _metadata_cache_size + room <= METADATA_CACHE_ENTRIES:
+            break
+        del _metadata_cache[key]
+        _metadata_cache_size -= count
+        if entries is not None:
+            entries.close()
+
+
+def cached_url_summary(url, is_cancelled=None):
+    """fetch_url_metadata() reused for METADATA_CACHE_TTL seconds.
+
+    The cache keeps its own EntryStore per playlist and hands every caller a
+    copy made by SQLite, so callers can select and close theirs without
+    affecting anyone else's, and no entries pass through Python lists.
+    """
+    global _metadata_cache_size
+    with _metadata_cache_lock:
+        _expire_metadata_cache()
+        hit = _metadata_cache.get(url)
+        if hit:
+            _, title, video_count, entries, duration = hit
+            return title, video_count, entries.copy() if entries is not None else None, duration
+    title, video_count, entries, duration = fetch_url_metadata(url, is_cancelled)
+    if video_count <= METADATA_CACHE_ENTRIES:
+        cached = entries.copy() if entries is not None else None
+        with _metadata_cache_lock:
+            stale = _metadata_cache.pop(url, None)  # Re-insert at the end to keep the order by time
+            if stale:
+                _metadata_cache_size -= stale[2]
+                if stale[3] is not None:
+                    stale[3].close()
+            _expire_metadata_cache(video_count)
+            _metadata_cache[url] = (time.monotonic(), title, video_count, cached, duration)
+            _metadata_cache_size += video_count
+    return title, video_count, entries, duration
+
+
+def parse_url_list(text, name=''):
+    """URLs from a pasted block or a .txt/.csv/.json file, in order and without duplicates.
+
+    Text is one URL per line. CSV uses the 'url' column if there is a header,
+    otherwise the first column. JSON is a list of URL strings or of objects
+    with a 'url' key. Lines that don't look like URLs are skipped.
+    """
+    name = name.lower()
+    if name.endswith('.json') or (not name and text.lstrip().startswith('[')):
+        urls = [row.get('url') if isinstance(row, dict) else row for row in json.loads(text)]
+    elif name.endswith('.csv'):
+        rows = [row for row in csv.reader(text.splitlines()) if row]
+        header = [cell.strip().lower() for cell in rows[0]] if rows else []
+        column = header.index('url') if 'url' in header else 0
+        urls = [row[column] for row in rows if len(row) > column]
+    else:
+        urls = text.splitlines()
+    urls = [str(url).strip() for url in urls if url]
+    return list(dict.fromkeys(url for url in urls if PLAUSIBLE_URL_RE.match(url)))
+
 
 class UrlValidator(QThread):
-    finished = pyqtSignal(bool, str, int, list, float)  # Added float for duration
+    validated = pyqtSignal(bool, str, int, object, float)  # Title, count, EntryStore or None, duration
     
-    def __init__(self, url):
+    def __init__(self, url, generation=0, speculative=False):
         super().__init__()
         self.url = url
+        self.generation = generation  # Results from older generations are discarded
+        self.speculative = speculative  # Started automatically rather than by the Validate button
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop at the next playlist page; the result is discarded either way"""
+        self.cancelled = True
         
     def run(self):
         try:
-            ydl_opts = {
-                'extract_flat': True,  # Only extract metadata, don't download video info
-                'quiet': True,
-                'no_warnings': True,
-            }
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(self.url, download=False)
-                is_playlist = 'entries' in info
-                title = info.get('title', '')
-                video_count = len(info['entries']) if is_playlist else 1
-                duration = info.get('duration', 0) if not is_playlist else 0  # Get video duration in seconds
-                
-                # Get video titles for playlist
-                video_titles = []
-                if is_playlist:
-                    for entry in info['entries']:
-                        video_titles.append(entry.get('title', 'Unknown Title'))
-                
-                self.finished.emit(True, title, video_count, video_titles, duration)
+            self.validated.emit(True, *cached_url_summary(self.url, lambda: self.cancelled))
         except Exception as e:
-            self.finished.emit(False, str(e), 0, [], 0)
+            self.validated.emit(False, str(e), 0, None, 0)
+
+BATCH_VALIDATION_WORKERS = 8
+
+
+class BatchValidator(QObject):
+    """Validate many URLs on a bounded thread pool, reporting each one as it completes"""
+    result = pyqtSignal(int, bool, object)  # Row, valid, summary tuple or error message
+
+    def __init__(self, urls, max_workers=BATCH_VALIDATION_WORKERS):
+        super().__init__()
+        self.urls = urls
+        self.cancelled = False
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='batch-validate')
+
+    def start(self):
+        for row, url in enumerate(self.urls):
+            self.executor.submit(self.validate, row, url)
+        self.executor.shutdown(wait=False)  # Threads exit once the queue drains
+
+    def cancel(self):
+        """Skip URLs that haven't started and stop running ones at their next playlist page"""
+        self.cancelled = True
+
+    def validate(self, row, url):
+        if self.cancelled:
+            return
+        try:
+            summary = cached_url_summary(url, lambda: self.cancelled)
+        except Exception as e:
+            if not self.cancelled:
+                self.result.emit(row, False, str(e))
+            return
+        self.result.emit(row, True, summary)
+
+
+class Signal:
+    """Minimal stand-in for pyqtSignal so the download engine runs without Qt"""
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in self.slots:
+            slot(*args)
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return 'Calculating...'
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
+
+
+THROUGHPUT_WINDOW = 20.0  # Seconds of transfer history behind the job ETA
+THROUGHPUT_SAMPLE_INTERVAL = 0.5
+
+
+class AggregateProgress:
+    """Byte-weighted progress and ETA across every item of a job.
+
+    Items count by their size in bytes; items that haven't started yet are
+    assumed to be as large as the average item seen so far. The ETA uses the
+    throughput summed over all files in the last THROUGHPUT_WINDOW seconds,
+    so it holds when several files transfer at once. With an item_count of 0
+    (not known yet) no percentage is reported until set_item_count() is called.
+    """
+
+    def __init__(self, item_count, window=THROUGHPUT_WINDOW):
+        self.item_count = item_count
+        self.window = window
+        self.lock = threading.Lock()
+        self.files = {}  # (item, path) -> [downloaded, size]
+        self.items = set()
+        self.skipped = 0  # Items that needed no transfer, e.g. library links
+        self.done_bytes = 0
+        self.known_bytes = 0  # Sum of sizes of the files seen so far
+        self.transferred = 0  # Bytes moved while watched (excludes resumed .part data)
+        self.samples = deque()  # (time, transferred)
+        self.percent = 0.0
+
+    def skip(self):
+        with self.lock:
+            self.skipped += 1
+
+    def set_item_count(self, item_count):
+        with self.lock:
+            self.item_count = item_count
+
+    def update(self, item, path, downloaded, total, finished=False, now=None):
+        """Record one hook callback and return (percent, eta in seconds or None)"""
+        now = time.monotonic() if now is None else now
+        with self.lock:
+            entry = self.files.get((item, path))
+            if finished:
+                downloaded = max(downloaded, total, entry[0] if entry else 0)
+                total = downloaded
+            size = max(total, downloaded)
+            if entry is None:
+                # Bytes already there on first sight (resumed or existing files) aren't throughput
+                entry = self.files[(item, path)] = [0, 0]
+                self.items.add(item)
+            else:
+                self.transferred += max(downloaded - entry[0], 0)
+            self.done_bytes += downloaded - entry[0]
+            self.known_bytes += size - entry[1]
+            entry[0], entry[1] = downloaded, size
+
+            if not self.samples or now - self.samples[-1][0] >= THROUGHPUT_SAMPLE_INTERVAL:
+                self.samples.append((now, self.transferred))
+                while len(self.samples) > 2 and self.samples[1][0] <= now - self.window:
+                    self.samples.popleft()
+
+            unseen = max(self.item_count - len(self.items) - self.skipped, 0)
+            estimated = self.known_bytes + unseen * self.known_bytes / max(len(self.items), 1)
+            if estimated > 0 and self.item_count:
+                # Never move backwards when an item turns out larger than estimated
+                self.percent = max(self.percent, min(self.done_bytes * 100 / estimated, 100.0))
+
+            eta = None
+            since, base = self.samples[0]
+            if now - since >= 1.0 and self.transferred > base:
+                rate = (self.transferred - base) / (now - since)
+                eta = max(estimated - self.done_bytes, 0) / rate
+            return self.percent, eta
+
+
+class ProgressEvent:
+    """One progress hook callback kept as raw numbers.
+
+    Display strings are only built when a consumer reads them, so callbacks
+    nobody renders (coalesced GUI updates, unwatched daemon jobs) stay cheap.
+    """
+    __slots__ = ('downloaded', 'total', 'speed', 'eta', 'path', 'percent', 'video_num', 'total_videos', 'job_eta')
+
+    def __init__(self, downloaded, total, speed, eta, path, percent, video_num, total_videos, job_eta=None):
+        self.downloaded = downloaded  # Bytes
+        self.total = total  # Bytes, 0 when unknown
+        self.speed = speed  # Bytes per second or None
+        self.eta = eta  # Seconds left for this file, or None
+        self.job_eta = job_eta  # Seconds left for the whole job, or None
+        self.path = path
+        self.percent = percent  # Byte-weighted percent of the whole job, None while calculating
+        self.video_num = video_num
+        self.total_videos = total_videos
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path or '')
+
+    @property
+    def speed_str(self):
+        return f"{self.speed/1024/1024:.1f} MB/s" if self.speed else "N/A"
+
+    @property
+    def downloaded_str(self):
+        return f"{self.downloaded/1024/1024:.1f}"
+
+    @property
+    def total_str(self):
+        return f"{self.total/1024/1024:.1f} MB" if self.total else "Unknown"
+
+    @property
+    def percent_str(self):
+        return f"{self.percent:.1f}%" if self.percent is not None else "Calculating..."
+
+    @property
+    def eta_str(self):
+        return format_eta(self.eta)
+
+    @property
+    def job_eta_str(self):
+        return format_eta(self.job_eta)
+
+    def to_dict(self):
+        """JSON form for the daemon API: display strings plus the raw numbers"""
+        return {
+            'speed': self.speed_str,
+            'downloaded': self.downloaded_str,
+            'total': self.total_str,
+            'video_num': self.video_num,
+            'filename': self.filename,
+            'percent': self.percent_str,
+            'eta': self.eta_str,
+            'job_eta': self.job_eta_str,
+            'total_videos': self.total_videos,
+            'downloaded_bytes': self.downloaded,
+            'total_bytes': self.total,
+            'speed_bps': self.speed,
+            'eta_seconds': self.eta,
+            'job_eta_seconds': self.job_eta,
+        }
+
+
+FRAGMENT_CONCURRENCY_MAX = 16  # Parallel fragment requests per video (DASH/HLS)
+FRAGMENT_RETRIES_DEFAULT = 10
+FRAGMENT_RETRY_MAX_SLEEP = 30.0  # Seconds; retry waits double from 0.5 s up to this
+# HTTP chunk sizes as (combo label, bytes); None downloads each file or fragment in one request
+HTTP_CHUNK_SIZES = [('Off', None), ('1 MB', 1 << 20), ('10 MB', 10 << 20), ('50 MB', 50 << 20)]
+
+
+def fragment_retry_sleep(n):
+    """Seconds to wait before fragment retry n (0-based); yt-dlp passes n as a keyword"""
+    return min(0.5 * 2 ** n, FRAGMENT_RETRY_MAX_SLEEP)
+
+
+def parse_chunk_size(value):
+    """Bytes from an int or a size like '10M'; None or 0 means no chunking"""
+    if value in (None, '', 0, '0'):
+        return None
+    size = value if isinstance(value, int) else yt_dlp.utils.parse_bytes(str(value))
+    if not size or size < 0:
+        raise ValueError(f"Invalid HTTP chunk size '{value}'")
+    return size
+
+
+FORMAT_PLAN_NAME = '.format_plans.json'
+FORMAT_PLAN_MARGIN = 300  # Seconds before its format URLs expire that a plan stops being reused
+FORMAT_PLAN_DEFAULT_TTL = 6 * 3600  # For formats whose URLs don't say when they expire
+
+
+def split_format_alternatives(selector):
+    """Top-level '/' fallbacks of a yt-dlp format selector, in order of preference"""
+    parts, depth, start = [], 0, 0
+    for i, char in enumerate(selector):
+        if char in '[(':
+            depth += 1
+        elif char in '])':
+            depth -= 1
+        elif char == '/' and depth == 0:
+            parts.append(selector[start:i])
+            start = i + 1
+    parts.append(selector[start:])
+    return parts
+
+
+def format_expiry(fmt):
+    """Unix time a format's URL expires (googlevideo 'expire' parameter), or None"""
+    query = urllib.parse.parse_qs(urllib.parse.urlparse(fmt.get('url') or '').query)
+    try:
+        return float(query['expire'][0])
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+class FormatPlan:
+    """Concrete format IDs a selector resolved to for one video"""
+    __slots__ = ('video_id', 'format_id', 'tier', 'filesize', 'expires')
+
+    def __init__(self, video_id, format_id, tier, filesize, expires):
+        self.video_id = video_id
+        self.format_id = format_id  # e.g. '137+140'
+        self.tier = tier  # Index of the selector alternative that matched; > 0 means a fallback
+        self.filesize = filesize  # Bytes, exact or approximate; None when unknown
+        self.expires = expires
+
+    def is_fresh(self, now=None):
+        return (now or time.time()) < self.expires - FORMAT_PLAN_MARGIN
+
+    def to_dict(self):
+        return {'id': self.video_id, 'format_id': self.format_id, 'tier': self.tier,
+                'filesize': self.filesize, 'expires': self.expires}
+
+
+class FormatPlanner:
+    """Resolves a format selector to concrete format IDs once per video.
+
+    Passed to yt-dlp as the 'format' option (yt-dlp accepts a callable
+    selector). The first time a video is seen, the selector's alternatives are
+    tried in order and the winning format IDs are remembered until the format
+    URLs expire; retries and resumed runs pick the same formats straight from
+    the plan, so a .part file is always continued with the format it was
+    started with. Plans are saved next to the downloads for later runs.
+    """
+
+    def __init__(self, selector, path=None):
+        self.selector = selector
+        self.alternatives = split_format_alternatives(selector)
+        self.path = path
+        self.plans = {}  # video id -> FormatPlan
+        self.lock = threading.Lock()
+        self.local = threading.local()  # Video being processed and parsed selectors, per yt-dlp instance
+        self.reused = 0
+        self.load()
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                saved = json.load(f).get(self.selector, {})
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for video_id, plan in saved.items():
+            plan = FormatPlan(video_id, plan['format_id'], plan['tier'], plan['filesize'], plan['expires'])
+            if plan.is_fresh(now):
+                self.plans[video_id] = plan
+
+    def save(self, status_callback=None):
+        """Merge the fresh plans into the plan file (other selectors' plans are kept).
+
+        The plans only save lookups on later runs, so a failed write is
+        reported through status_callback rather than raised.
+        """
+        if not self.path or not self.plans:
+            return
+        now = time.time()
+        with self.lock:
+            fresh = {video_id: plan.to_dict() for video_id, plan in self.plans.items() if plan.is_fresh(now)}
+
+        def merge(state):
+            saved = {video_id: plan for video_id, plan in state.get(self.selector, {}).items()
+                     if plan.get('expires', 0) - FORMAT_PLAN_MARGIN > now}
+            saved.update(fresh)
+            state[self.selector] = saved
+
+        try:
+            update_json_file(self.path, merge)
+        except OSError as e:
+            if status_callback:
+                status_callback(f'Warning: Could not save format plans: {e}')
+
+    def get(self, video_id):
+        """The fresh plan for video_id, or None"""
+        plan = self.plans.get(video_id)
+        return plan if plan and plan.is_fresh() else None
+
+    def estimated_bytes(self, video_ids=None):
+        """(known bytes, number of planned videos without a size) over video_ids or all plans"""
+        plans = [self.plans.get(video_id) for video_id in video_ids] if video_ids is not None else list(self.plans.values())
+        plans = [plan for plan in plans if plan]
+        return sum(plan.filesize or 0 for plan in plans), sum(1 for plan in plans if not plan.filesize)
+
+    def begin(self, ydl, video_id):
+        """Called before yt-dlp selects formats for video_id (see FormatPlanPP)"""
+        if getattr(self.local, 'ydl', None) is not ydl:
+            self.local.ydl = ydl
+            self.local.selectors = {}
+        self.local.video_id = video_id
+
+    def build(self, spec):
+        selectors = self.local.selectors
+        if spec not in selectors:
+            selectors[spec] = self.local.ydl.build_format_selector(spec)
+        return selectors[spec]
+
+    def __call__(self, ctx):
+        available = {fmt.get('format_id') for fmt in ctx['formats']}
+        video_id = getattr(self.local, 'video_id', None)
+        plan = self.get(video_id)
+        if plan and set(plan.format_id.split('+')) <= available:
+            self.reused += 1
+            yield from self.build(plan.format_id)(ctx)
+            return
+        for tier, alternative in enumerate(self.alternatives):
+            selected = list(self.build(alternative)(ctx))
+            if selected:
+                if video_id:
+                    self.record(video_id, selected[-1], tier)
+                yield from selected
+                return
+
+    def record(self, video_id, fmt, tier):
+        tracks = fmt.get('requested_formats') or [fmt]
+        expiries = [expiry for expiry in map(format_expiry, tracks) if expiry]
+        expires = min(expiries) if expiries else time.time() + FORMAT_PLAN_DEFAULT_TTL
+        plan = FormatPlan(video_id, fmt['format_id'], tier,
+                          fmt.get('filesize') or fmt.get('filesize_approx'), expires)
+        with self.lock:
+            self.plans[video_id] = plan
+        return plan
+
+    def plan_entries(self, entries, workers=BATCH_VALIDATION_WORKERS, progress_callback=None):
+        """Resolve (position, url, video id) entries in parallel, skipping ones with a fresh plan.
+
+        Returns {video id: FormatPlan}; entries that fail to resolve are left out.
+        The video id may be None, e.g. for a single video URL.
+        """
+        def resolve(entry):
+            _, url, video_id = entry
+            ydl_opts = {'format': self, 'quiet': True, 'no_warnings': True, 'noplaylist': True}
+            try:
+                with SessionYoutubeDL(ydl_opts) as ydl:
+                    ydl.add_post_processor(FormatPlanPP(self), when='after_filter')
+                    info = ydl.extract_info(url, download=False)
+                return self.get(info.get('id'))
+            except Exception:
+                return None
+
+        plans = {entry[2]: self.get(entry[2]) for entry in entries if self.get(entry[2])}
+        todo = [entry for entry in entries if entry[2] not in plans]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for done, plan in enumerate(pool.map(resolve, todo), 1):
+                if plan:
+                    plans[plan.video_id] = plan
+                if progress_callback:
+                    progress_callback(done, len(todo))
+        return plans
+
+
+class FormatPlanPP(PostProcessor):
+    """Tells a FormatPlanner which video yt-dlp is about to select formats for"""
+
+    def __init__(self, planner):
+        super().__init__()
+        self.planner = planner
+
+    def run(self, info):
+        self.planner.begin(self._downloader, info.get('id'))
+        return [], info
+
+
+class PipeMergePP(PostProcessor):
+    """Streams the video and audio tracks straight into one ffmpeg muxer before yt-dlp downloads them.
+
+    The ffmpeg process is started through call_ffmpeg with the job's cancel event, so a cancel
+    terminates it. yt-dlp then finds the merged file in place and goes on with post-processing.
+    Formats ffmpeg cannot read over plain HTTP are left to yt-dlp's own download and merge.
+    """
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def run(self, info):
+        formats = info.get('requested_formats') or []
+        if len(formats) < 2 or any(f.get('protocol') not in PIPE_MERGE_PROTOCOLS for f in formats):
+            return [], info
+        dest = self._downloader.prepare_filename(info, 'temp')
+        if os.path.exists(dest):
+            return [], info
+        args = []
+        for fmt in formats:
+            cookies = self._downloader.cookiejar.get_cookies_for_url(fmt['url'])
+            if cookies:
+                args += ['-cookies', ''.join(f'{c.name}={c.value}; path={c.path}; domain={c.domain};\r\n'
+                                             for c in cookies)]
+            headers = fmt.get('http_headers') or info.get('http_headers')
+            if headers:
+                args += ['-headers', ''.join(f'{key}: {value}\r\n' for key, value in headers.items())]
+            args += ['-i', fmt['url']]
+        for i in range(len(formats)):
+            args += ['-map', str(i)]
+        args += ['-c', 'copy']
+        os.makedirs(os.path.dirname(dest) or '.', exist_ok=True)
+        stem, ext = os.path.splitext(dest)
+        self.job.status.emit(f'Streaming {len(formats)} tracks into ffmpeg...')
+        run_ffmpeg(args, dest, f'{stem}.temp{ext}', dest, self.job.cancel_event)
+        size = os.path.getsize(dest)
+        self.job.progress_hook({'status': 'finished', 'info_dict': info, 'filename': dest,
+                                'downloaded_bytes': size, 'total_bytes': size})
+        return [], info
+
+
+def plan_formats(args):
+    """Print the format plan and size estimate for a URL's videos as JSON, then exit"""
+    _, _, format_id, _ = find_format_choice(args.format)
+    save_path = os.path.expanduser(args.save_path)
+    planner = FormatPlanner(format_id, os.path.join(save_path, FORMAT_PLAN_NAME))
+    entries = list_playlist_entries(args.plan_formats, args.items)
+    if not entries:  # A single video
+        entries = [(1, args.plan_formats, None)]
+    plans = planner.plan_entries(
+        entries, progress_callback=lambda done, total: print(f'Planned {done} of {total}', file=sys.stderr))
+    if entries[0][2] is None and plans:
+        entries = [(1, args.plan_formats, next(iter(plans)))]
+    planner.save(lambda msg: print(msg, file=sys.stderr))
+    known, unknown = planner.estimated_bytes([entry[2] for entry in entries])
+    report = {
+        'selector': format_id,
+        'videos': [dict(plans[video_id].to_dict(), position=position) if video_id in plans
+                   else {'id': video_id, 'position': position, 'error': 'no matching format'}
+                   for position, _, video_id in entries],
+        'estimated_bytes': known,
+        'unknown_sizes': unknown,
+        'fallbacks': sum(1 for plan in plans.values() if plan.tier > 0),
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if len(plans) == len(entries) else 1
+
+
+class DownloadJob:
+    """Qt-free download engine shared by the GUI worker and the daemon.
+
+    Reports through Signal objects named like DownloadWorker's signals and
+    runs synchronously in the calling thread.
+    """
+
+    def __init__(self, url, save_path, format_id, num_videos, start_index=1, end_index=None, is_playlist=False, start_time=None, end_time=None, playlist_items=None, staging_path=None, hash_algorithm=None, merge_mode='file', audio_codec=None, clip_ranges=None, split_chapters=False, sync_mode=None, archive_removed=False, library_path=None, playlist_index=None, output_layout='flat', fragment_concurrency=1, http_chunk_size=None, fragment_retries=FRAGMENT_RETRIES_DEFAULT, skip_existing=True):
+        self.progress = Signal()
+        self.status = Signal()
+        self.finished = Signal()
+        self.download_error = Signal()
+        self.detailed_progress = Signal()
+        self.cancelled = Signal()
+        self.cancel_event = threading.Event()
+        self.resume_event = threading.Event()  # Cleared while paused
+        self.resume_event.set()
+        self.outcome = None  # 'finished', 'failed' or 'cancelled' once run() returns
+        self.url = url
+        self.save_path = save_path
+        self.staging_path = staging_path  # Fast local dir for .part and intermediate files
+        self.hash_algorithm = hash_algorithm  # 'sha256', 'xxh64' or None to skip verification
+        self.merge_mode = merge_mode  # 'file' (download tracks, then merge) or 'pipe'
+        self.audio_codec = audio_codec  # Key of AUDIO_CODECS for audio-only downloads
+        self.clip_ranges = clip_ranges if not is_playlist else None  # [(start, end, name)] cut from one fetch
+        self.split_chapters = split_chapters and not self.clip_ranges  # One file per chapter
+        self.sync_mode = sync_mode  # None, 'all' or 'newest_first'
+        self.archive_removed = archive_removed  # Move files of removed entries aside when syncing
+        self.playlist_index = playlist_index  # Position of a single video fetched on its own (sharding)
+        # Subfolder template of the output layout; sync finds its files by name in save_path, so it stays flat
+        self.layout_folder = find_output_layout(output_layout)[2] if not sync_mode else ''
+        self.output_index = None  # OutputIndex of save_path, set while running
+        self.output_dir = None
+        # Fragmented (DASH/HLS) formats: parallel fragment requests per video, reassembled in order by yt-dlp
+        self.fragment_concurrency = max(1, min(int(fragment_concurrency), FRAGMENT_CONCURRENCY_MAX))
+        self.http_chunk_size = http_chunk_size  # Bytes per HTTP range request, None for one request
+        self.fragment_retries = fragment_retries
+        self.skip_existing = skip_existing  # Skip entries whose file is already in save_path
+        # Shared content-addressed store; not used for clips/chapters, which are per-folder derivatives
+        self.library = None
+        if library_path and not self.clip_ranges and not self.split_chapters:
+            self.library = MediaLibrary(library_path, format_id, audio_codec)
+        self.ydl = None
+        self.format_id = format_id
+        self.num_videos = num_videos
+        self.is_playlist = is_playlist
+        self.start_index = start_index
+        self.end_index = end_index if end_index else num_videos
+        self.start_time = start_time  # Time in seconds
+        self.end_time = end_time  # Time in seconds
+        self.current_video = 0
+        self.playlist_items = playlist_items
+        self.current_video_index = 0  # Add this to track the actual video index
+        self.total_selected = num_videos  # Videos selected; 0 until a whole playlist reports its length
+        self.aggregate = AggregateProgress(self.total_selected)
+        self.format_planner = None  # Kept across runs so a resumed job reuses the resolved formats
+
+    def cancel(self):
+        """Ask the job to stop at the next hook call; .part data is kept for resuming"""
+        self.cancel_event.set()
+        self.resume_event.set()  # Wake a paused hook so it can raise
+
+    def pause(self):
+        """Hold the download inside the progress hook until resume() or cancel()"""
+        self.resume_event.clear()
+        self.status.emit('Paused')
+
+    def resume(self):
+        self.resume_event.set()
+        self.status.emit('Resumed')
+
+    def is_paused(self):
+        return not self.resume_event.is_set()
+
+    def library_match_filter(self, info, *, incomplete=False):
+        """Skip entries already in the library, linking the stored file instead of fetching it"""
+        video_id = info.get('id')
+        stored_path = self.library.find(video_id) if video_id else None
+        if stored_path is None:
+            return None
+        link_info = dict(info, ext=os.path.splitext(stored_path)[1].lstrip('.'))
+        name = os.path.relpath(self.ydl.prepare_filename(link_info), self.output_dir)
+        self.library.link(stored_path, os.path.join(self.save_path, name))
+        self.current_video_index += 1
+        self.aggregate.skip()
+        self.status.emit(f'Linked {name} from library')
+        return 'Already in library'
+
+    def existing_output_filter(self, info, *, incomplete=False):
+        """Skip entries whose output is already in save_path, using the in-memory index"""
+        if not info.get('title'):
+            return None  # Can't know the file name yet
+        stem = os.path.splitext(self.ydl.prepare_filename(dict(info, ext='_')))[0]
+        # Only a file this format choice could have produced counts, not an .mp4 when MP3s are wanted
+        exts = {AUDIO_CODECS[self.audio_codec][0]} if self.audio_codec else VIDEO_OUTPUT_EXTS
+        if not self.output_index.contains(os.path.relpath(stem, self.output_dir), exts):
+            return None
+        self.current_video_index += 1
+        self.aggregate.skip()
+        self.status.emit(f'Skipping {os.path.basename(stem)}, already downloaded')
+        return 'Already downloaded'
+
+    def match_filter(self, info, *, incomplete=False):
+        self.check_interrupt()  # Runs before each entry is extracted, long before any progress hook
+        if not self.total_selected:
+            # Whole playlists are queued without knowing their length; take it from the first entry
+            count = info.get('n_entries') or info.get('playlist_count')
+            if count:
+                self.total_selected = count
+                self.aggregate.set_item_count(count)
+        if self.output_index:
+            reason = self.existing_output_filter(info, incomplete=incomplete)
+            if reason:
+                return reason
+        if self.library:
+            return self.library_match_filter(info, incomplete=incomplete)
+        return None
+
+    def check_interrupt(self):
+        """Called from yt-dlp hooks: blocks while paused and raises once cancelled"""
+        self.resume_event.wait()
+        if self.cancel_event.is_set():
+            raise JobCancelled('Download cancelled')
+
+    def progress_hook(self, d):
+        self.check_interrupt()
+        item = (d.get('info_dict') or {}).get('id') or d.get('filename')
+        total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+        downloaded = d.get('downloaded_bytes') or 0
+        if d['status'] == 'downloading':
+            percent, job_eta = self.aggregate.update(item, d.get('filename'), downloaded, total)
+            if percent:
+                self.progress.emit(percent)
+
+            self.detailed_progress.emit(ProgressEvent(
+                downloaded, total, d.get('speed'), d.get('eta'), d.get('filename'), percent or None,
+                min(self.current_video_index + 1, self.total_selected or self.current_video_index + 1),
+                self.total_selected or None, job_eta
+            ))
+            
+        elif d['status'] == 'finished':
+            percent, _ = self.aggregate.update(item, d.get('filename'), downloaded, total, finished=True)
+            self.progress.emit(percent)
+            self.current_video_index += 1  # Increment the video index when a video is finished
+            self.status.emit('Processing completed file...')
+
+    def prepare_sync(self):
+        """Work out which playlist entries are new; returns the PlaylistSync or None if up to date"""
+        self.status.emit('Checking playlist for changes...')
+        os.makedirs(self.save_path, exist_ok=True)
+        sync = PlaylistSync(self.save_path, self.url, self.check_interrupt)
+        new_positions = sync.plan(newest_first=self.sync_mode == 'newest_first')
+        if sync.moves:
+            self.status.emit(f'Renamed {sync.apply_renames()} file(s) for reordered videos')
+        if sync.removed and self.archive_removed:
+            self.status.emit(f"Moved {sync.archive_removed()} file(s) of removed videos to '{REMOVED_DIR_NAME}'")
+        if not new_positions:
+            sync.commit()
+            return None
+        self.status.emit(f'{len(new_positions)} new video(s) to download')
+        self.playlist_items = ','.join(map(str, new_positions))
+        self.total_selected = len(new_positions)
+        self.aggregate = AggregateProgress(self.total_selected)
+        return sync
+
+    def run(self):
+        # A paused-then-resumed job is run again; yt-dlp skips finished files and resumes .part files
+        self.cancel_event.clear()
+        self.resume_event.set()
+        self.current_video_index = 0
+        self.aggregate = AggregateProgress(self.total_selected)
+        self.outcome = None
+        pooled_pps = []
+        try:
+            sync = None
+            if self.sync_mode:
+                sync = self.prepare_sync()
+                if sync is None:
+                    self.status.emit('Playlist is already up to date')
+                    self.outcome = 'finished'
+                    self.finished.emit()
+                    return
+
+            # With a staging dir, everything is written there and only the final file is moved
+            output_dir = self.output_dir = self.staging_path or self.save_path
+            if self.is_playlist:
+                name_template = '%(playlist_index)03d_%(title)s.%(ext)s'
+            elif self.playlist_index:
+                name_template = f'{self.playlist_index:03d}_%(title)s.%(ext)s'  # Same name as in a playlist run
+            else:
+                name_template = '%(title)s.%(ext)s'
+            if self.layout_folder:
+                name_template = os.path.join(self.layout_folder, name_template)
+            # Clips and chapters are saved under other names, so only whole files are looked up
+            self.output_index = None
+            if self.skip_existing and not self.clip_ranges and not self.split_chapters:
+                self.output_index = get_output_index(self.save_path)
+            if self.format_planner is None:
+                self.format_planner = FormatPlanner(self.format_id, os.path.join(self.save_path, FORMAT_PLAN_NAME))
+            ydl_opts = {
+                'format': self.format_planner,
+                'outtmpl': os.path.join(output_dir, name_template),
+                'progress_hooks': [self.progress_hook],
+                'postprocessor_hooks': [self.post_process_hook],
+                'noplaylist': not self.is_playlist,
+                'playlist_items': self.playlist_items if self.is_playlist else None,
+                'logger': self,
+                'concurrent_fragment_downloads': self.fragment_concurrency,
+                'fragment_retries': self.fragment_retries,
+                'retry_sleep_functions': {'fragment': fragment_retry_sleep},
+            }
+            if self.http_chunk_size:
+                ydl_opts['http_chunk_size'] = self.http_chunk_size
+
+            ydl_opts['match_filter'] = self.match_filter
+
+            # Add time range processing for single video
+            if not self.is_playlist and not self.clip_ranges and (self.start_time is not None or self.end_time is not None):
+                # Add postprocessor for ffmpeg
+                ydl_opts.update({
+                    'postprocessor_args': [
+                        '-ss', str(self.start_time) if self.start_time else '0',
+                        '-t', str(self.end_time - (self.start_time or 0)) if self.end_time else None
+                    ],
+                    'prefer_ffmpeg': True,
+                })
+
+            with SessionYoutubeDL(ydl_opts) as ydl:
+                self.ydl = ydl
+                finalizer = None
+                if self.staging_path or self.hash_algorithm or self.library:
+                    clip_duration = None
+                    if not self.is_playlist and not self.clip_ranges and self.end_time:
+                        clip_duration = self.end_time - (self.start_time or 0)
+                    finalizer = FinalizePP(
+                        self.save_path if self.staging_path else None,
+                        hash_algorithm=self.hash_algorithm,
+                        expected_duration=clip_duration,
+                        status_callback=self.status.emit,
+                        library=self.library,
+                        staging_root=self.staging_path
+                    )
+                # Each stage runs the next one itself once its output exists:
+                # clips or chapters -> audio conversion -> finalize
+                first_pp = finalizer
+                if self.audio_codec:
+                    first_pp = AudioConvertPP(self.audio_codec, first_pp, self.status.emit, self.cancel_event)
+                    pooled_pps.insert(0, first_pp)
+                if self.clip_ranges:
+                    first_pp = ClipPP(self.clip_ranges, first_pp, self.status.emit, self.cancel_event)
+                    pooled_pps.insert(0, first_pp)
+                elif self.split_chapters:
+                    first_pp = ChapterSplitPP(first_pp, self.status.emit, self.cancel_event)
+                    pooled_pps.insert(0, first_pp)
+                if first_pp:
+                    ydl.add_post_processor(first_pp, when='after_move')
+                ydl.add_post_processor(FormatPlanPP(self.format_planner), when='after_filter')
+                if self.merge_mode == 'pipe' and '+' in self.format_id:
+                    # Stream video+audio tracks straight into the ffmpeg muxer
+                    ydl.add_post_processor(PipeMergePP(self), when='before_dl')
+                self.status.emit('Starting download...')
+                try:
+                    ydl.download([self.url])
+                finally:
+                    self.format_planner.save(self.status.emit)
+
+            for pp in pooled_pps:
+                if pp.pending:
+                    self.status.emit('Waiting for post-processing to finish...')
+                pp.wait()
+
+            if sync:
+                sync.commit()
+            
+            self.outcome = 'finished'
+            self.finished.emit()
+        except Exception as e:
+            if self.cancel_event.is_set():
+                for pp in pooled_pps:
+                    pp.cancel()
+                self.outcome = 'cancelled'
+                self.status.emit('Download cancelled, partial files kept for resuming')
+                self.cancelled.emit()
+            else:
+                self.outcome = 'failed'
+                self.download_error.emit(str(e))
+
+    def post_process_hook(self, d):
+        """Handle post-processing progress"""
+        self.check_interrupt()
+        if d['status'] == 'started':
+            self.status.emit(f"Post-processing: {d.get('postprocessor', '')}")
+        elif d['status'] == 'finished':
+            self.status.emit('Post-processing finished')
+
+    # Add these methods for logging
+    def debug(self, msg):
+        if msg.strip():
+            self.status.emit(msg)
+
+    def warning(self, msg):
+        if msg.strip():
+            self.status.emit(f"Warning: {msg}")
+
+    def error(self, msg):
+        if msg.strip():
+            self.status.emit(f"Error: {msg}")
+            self.download_error.emit(msg)  # Use download_error signal instead
+
+
+class DownloadWorker(QThread):
+    progress = pyqtSignal(float)
+    status = pyqtSignal(str)
+    finished = pyqtSignal()
+    download_error = pyqtSignal(str)  # Renamed from error to download_error
+    detailed_progress = pyqtSignal(object)  # ProgressEvent
+    cancelled = pyqtSignal()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        # Takes the same arguments as DownloadJob and forwards its signals to Qt
+        self.job = DownloadJob(*args, **kwargs)
+        self.job.progress.connect(self.progress.emit)
+        self.job.status.connect(self.status.emit)
+        self.job.finished.connect(self.finished.emit)
+        self.job.download_error.connect(self.download_error.emit)
+        self.job.detailed_progress.connect(self.detailed_progress.emit)
+        self.job.cancelled.connect(self.cancelled.emit)
+
+    def run(self):
+        self.job.run()
+
+
+JOB_STATES_WAITING = ('queued', 'paused')
+JOB_STATES_DONE = ('finished', 'failed', 'cancelled')
+JOB_EVENT_HISTORY = 1000  # Events kept per job for late-joining stream clients
+
+
+class JobEvent:
+    """Entry in a job's event history; kind is 'progress', 'detail', 'status', 'error' or 'state'"""
+    __slots__ = ('seq', 'time', 'kind', 'data')
+
+    def __init__(self, seq, time, kind, data):
+        self.seq = seq
+        self.time = time
+        self.kind = kind
+        self.data = data
+
+    def to_dict(self):
+        data = self.data.to_dict() if isinstance(self.data, ProgressEvent) else self.data
+        return {'seq': self.seq, 'time': self.time, 'type': self.kind, 'data': data}
+
+
+class JobRecord:
+    """A DownloadJob plus its scheduling state and event history"""
+
+    def __init__(self, job_id, job, request, listeners=()):
+        self.id = job_id
+        self.job = job
+        self.request = request
+        self.state = 'queued'
+        self.progress = 0.0
+        self.detail = None  # Latest ProgressEvent
+        self.error = None
+        self.events = deque(maxlen=JOB_EVENT_HISTORY)
+        self.seq = 0
+        self.changed = threading.Condition()
+        self.listeners = listeners  # Called as listener(record, kind, data) on every event
+        self.thread = None
+        self.pause_requested = False  # Running job is being stopped to be parked as paused
+
+    def add_event(self, kind, data):
+        with self.changed:
+            self.seq += 1
+            self.events.append(JobEvent(self.seq, time.time(), kind, data))
+            self.changed.notify_all()
+        for listener in self.listeners:
+            listener(self, kind, data)
+
+    def events_since(self, seq, timeout=None):
+        """Events newer than seq, waiting up to timeout for one to arrive"""
+        with self.changed:
+            if self.seq <= seq and self.state not in JOB_STATES_DONE:
+                self.changed.wait(timeout)
+            return [event for event in self.events if event.seq > seq]
+
+    def summary(self):
+        return {
+            'id': self.id,
+            'url': self.job.url,
+            'state': self.state,
+            'progress': round(self.progress, 1),
+            'detail': self.detail.to_dict() if self.detail else {},
+            'error': self.error,
+        }
+
+
+class JobScheduler:
+    """Runs DownloadJobs with at most max_workers at a time.
+
+    Waiting jobs start in queue order and can be paused (held back), moved
+    or cancelled before they start.
+    """
+
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self.jobs = {}       # id -> JobRecord, in submission order
+        self.queue = []      # Waiting JobRecords in start order
+        self.running = set()
+        self.listeners = []
+        self.lock = threading.RLock()
+        self.next_id = 1
+
+    def add_listener(self, listener):
+        """Register listener(record, kind, data) for events of every job"""
+        self.listeners.append(listener)
+
+    def submit(self, job, request=None):
+        with self.lock:
+            record = JobRecord(self.next_id, job, request or {}, self.listeners)
+            self.jobs[record.id] = record
+            self.queue.append(record)
+            self.next_id += 1
+
+        def on_progress(value):
+            record.progress = value
+            record.add_event('progress', value)
+
+        def on_detail(info):
+            record.detail = info
+            record.add_event('detail', info)
+
+        def on_error(msg):
+            record.error = msg
+            record.add_event('error', msg)
+
+        job.progress.connect(on_progress)
+        job.detailed_progress.connect(on_detail)
+        job.status.connect(lambda msg: record.add_event('status', msg))
+        job.download_error.connect(on_error)
+        self.set_state(record, 'queued')
+        self.dispatch()
+        return record
+
+    def dispatch(self):
+        """Start waiting jobs while there are free slots"""
+        with self.lock:
+            while len(self.running) < self.max_workers:
+                record = next((r for r in self.queue if r.state == 'queued'), None)
+                if record is None:
+                    break
+                self.queue.remove(record)
+                self.running.add(record)
+                self.set_state(record, 'running')
+                record.thread = threading.Thread(target=self.run_job, args=(record,),
+                                                 name=f'download-{record.id}', daemon=True)
+                record.thread.start()
+
+    def run_job(self, record):
+        try:
+            record.job.run()
+        finally:
+            with self.lock:
+                self.running.discard(record)
+                if record.job.outcome == 'cancelled' and record.pause_requested:
+                    # Parked at the front of the queue; resuming reruns it from its .part files
+                    record.pause_requested = False
+                    self.queue.insert(0, record)
+                    state = 'paused'
+                else:
+                    state = record.job.outcome if record.job.outcome in JOB_STATES_DONE else 'failed'
+            self.set_state(record, state)
+            self.dispatch()
+
+    def set_state(self, record, state):
+        record.state = state
+        record.add_event('state', state)
+
+    def waiting_record(self, job_id):
+        record = self.jobs.get(job_id)
+        return record if record in self.queue else None
+
+    def cancel(self, job_id):
+        """Cancel a waiting job, or ask a running one to stop"""
+        with self.lock:
+            record = self.jobs.get(job_id)
+            if record in self.running:
+                record.pause_requested = False
+                record.job.cancel()
+                return True
+            if record not in self.queue:
+                return False
+            self.queue.remove(record)
+        self.set_state(record, 'cancelled')
+        return True
+
+    def pause(self, job_id):
+        """Hold a job back until it is resumed.
+
+        A running job is stopped (keeping its partial files) so its slot and
+        bandwidth go to the next waiting job.
+        """
+        with self.lock:
+            record = self.jobs.get(job_id)
+            if record in self.running:
+                record.pause_requested = True
+                record.job.cancel()
+                return True
+            if record not in self.queue or record.state != 'queued':
+                return False
+        self.set_state(record, 'paused')
+        return True
+
+    def resume(self, job_id):
+        with self.lock:
+            record = self.waiting_record(job_id)
+            if record is None or record.state != 'paused':
+                return False
+        self.set_state(record, 'queued')
+        self.dispatch()
+        return True
+
+    def move(self, job_id, offset):
+        """Move a waiting job earlier (negative offset) or later in the queue"""
+        with self.lock:
+            record = self.waiting_record(job_id)
+            if record is None:
+                return False
+            index = self.queue.index(record)
+            self.queue.remove(record)
+            self.queue.insert(max(0, min(len(self.queue), index + offset)), record)
+        return True
+
+    def queue_position(self, record):
+        with self.lock:
+            return self.queue.index(record) + 1 if record in self.queue else None
+
+    def set_max_workers(self, max_workers):
+        self.max_workers = max_workers
+        self.dispatch()
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return [record.summary() for record in list(self.jobs.values())]
+
+    def shutdown(self, timeout=None):
+        """Cancel every job and wait up to timeout seconds for running ones to stop"""
+        with self.lock:
+            records = list(self.queue) + list(self.running)
+        for record in records:
+            self.cancel(record.id)
+        deadline = time.monotonic() + (timeout or 0)
+        for record in records:
+            if record.thread is not None:
+                record.thread.join(max(0, deadline - time.monotonic()) if timeout is not None else None)
+
+
+class SchedulerBridge(QObject):
+    """Re-emits JobScheduler events as a Qt signal delivered on the GUI thread"""
+    job_event = pyqtSignal(int, str, object)
+
+    def __init__(self, scheduler):
+        super().__init__()
+        scheduler.add_listener(lambda record, kind, data: self.job_event.emit(record.id, kind, data))
+
+
+def count_playlist_items(items):
+    """Number of entries selected by a playlist_items spec like '1-3,7'"""
+    count = 0
+    for part in str(items).split(','):
+        if '-' in part:
+            start, end = part.split('-', 1)
+            count += int(end) - int(start) + 1
+        elif part.strip():
+            count += 1
+    return count
+
+
+def clip_from_request(clip):
+    """(start, end, name) from a job's [start, end(, name)] list or {start, end, name} object"""
+    if isinstance(clip, dict):
+        clip = [clip.get('start'), clip.get('end'), clip.get('name', '')]
+    if not isinstance(clip, list) or len(clip) < 2 or clip[0] is None or clip[1] is None:
+        raise ValueError(f'Malformed clip {clip!r}: expected [start, end, name] or {{"start", "end", "name"}}')
+    start, end = parse_timestamp(clip[0]), parse_timestamp(clip[1])
+    if end <= start:
+        raise ValueError(f'Clip end must be after start: {clip[0]} - {clip[1]}')
+    return start, end, str(clip[2]) if len(clip) > 2 else ''
+
+
+def job_from_request(request):
+    """Build a DownloadJob from a JSON job description.
+
+    Required: url. Optional: format (see FORMAT_CHOICES short names), save_path,
+    playlist, items ('1-3,7'), start_time/end_time, clips, staging_path,
+    verify ('sha256'/'xxh64'), merge_mode, split_chapters, sync, archive_removed,
+    library_path, layout (see OUTPUT_LAYOUTS short names), playlist_index,
+    fragments (parallel fragment requests), http_chunk_size (bytes or '10M'),
+    fragment_retries, skip_existing (default true), processes (shard a playlist,
+    see ShardedJob).
+    """
+    if not isinstance(request, dict):
+        raise ValueError('The job description must be a JSON object')
+    url = request.get('url')
+    if not url:
+        raise ValueError("Missing 'url'")
+    _, _, format_id, audio_codec = find_format_choice(request.get('format', 'best'))
+    if int(request.get('processes') or 1) > 1:
+        if request.get('sync'):
+            raise ValueError("'sync' can't be combined with 'processes'")
+        return ShardedJob(request, int(request['processes']))
+    is_playlist = bool(request.get('playlist') or request.get('items') or request.get('sync'))
+    items = request.get('items')
+    start_time = request.get('start_time')
+    end_time = request.get('end_time')
+    clips = request.get('clips') or []
+    if not isinstance(clips, list):
+        raise ValueError("'clips' must be a list")
+    clips = [clip_from_request(clip) for clip in clips]
+    return DownloadJob(
+        url,
+        os.path.expanduser(request.get('save_path') or '~/Downloads'),
+        format_id,
+        count_playlist_items(items) if items else 0 if is_playlist else 1,
+        is_playlist=is_playlist,
+        start_time=parse_timestamp(start_time) if start_time is not None else None,
+        end_time=parse_timestamp(end_time) if end_time is not None else None,
+        playlist_items=items,
+        staging_path=request.get('staging_path'),
+        hash_algorithm=request.get('verify'),
+        merge_mode=request.get('merge_mode', 'file'),
+        audio_codec=audio_codec,
+        clip_ranges=clips or None,
+        split_chapters=bool(request.get('split_chapters')),
+        sync_mode='all' if request.get('sync') is True else request.get('sync') or None,
+        archive_removed=bool(request.get('archive_removed')),
+        library_path=request.get('library_path'),
+        playlist_index=request.get('playlist_index'),
+        output_layout=request.get('layout', 'flat'),
+        fragment_concurrency=int(request.get('fragments') or 1),
+        http_chunk_size=parse_chunk_size(request.get('http_chunk_size')),
+        fragment_retries=int(request.get('fragment_retries', FRAGMENT_RETRIES_DEFAULT)),
+        skip_existing=bool(request.get('skip_existing', True)),
+    )
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """JSON job API:
+
+    POST   /jobs              submit a job, returns its summary
+    GET    /jobs              list jobs
+    GET    /jobs/<id>         job summary
+    GET    /jobs/<id>/events  newline-delimited JSON event stream until the job ends
+    POST   /jobs/<id>/pause   pause a job (running jobs stop and keep partial files)
+    POST   /jobs/<id>/resume  queue a paused job again
+    DELETE /jobs/<id>         cancel a job
+    """
+
+    def address_string(self):
+        return self.client_address[0] if self.client_address else 'unix'
+
+    def send_json(self, code, obj):
+        body = json.dumps(obj).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def find_record(self):
+        parts = self.path.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'jobs' or not parts[1].isdigit():
+            return None, parts
+        return self.server.scheduler.get(int(parts[1])), parts
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/jobs':
+            return self.send_json(200, self.server.scheduler.list())
+        record, parts = self.find_record()
+        if record is None:
+            return self.send_json(404, {'error': 'No such job'})
+        if parts[2:] == ['events']:
+            return self.stream_events(record)
+        self.send_json(200, record.summary())
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/jobs':
+            return self.control_job()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            job = job_from_request(request)
+        except (ValueError, TypeError, IndexError, KeyError, AttributeError) as e:
+            return self.send_json(400, {'error': str(e)})
+        record = self.server.scheduler.submit(job, request)
+        self.send_json(201, record.summary())
+
+    def control_job(self):
+        record, parts = self.find_record()
+        if record is None or len(parts) != 3 or parts[2] not in ('pause', 'resume'):
+            return self.send_json(404, {'error': 'Not found'})
+        action = getattr(self.server.scheduler, parts[2])
+        if not action(record.id):
+            return self.send_json(409, {'error': f'Job is {record.state}'})
+        self.send_json(200, record.summary())
+
+    def do_DELETE(self):
+        record, _ = self.find_record()
+        if record is None:
+            return self.send_json(404, {'error': 'No such job'})
+        if not self.server.scheduler.cancel(record.id):
+            return self.send_json(409, {'error': f'Job is {record.state}'})
+        self.send_json(200, record.summary())
+
+    def stream_events(self, record):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        seq = 0
+        try:
+            while True:
+                events = record.events_since(seq, timeout=15)
+                for event in events:
+                    self.wfile.write(json.dumps(event.to_dict()).encode('utf-8') + b'\n')
+                    seq = event.seq
+                self.wfile.flush()
+                if record.state in JOB_STATES_DONE and not events:
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away
+
+
+class DaemonHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, scheduler):
+        super().__init__(address, DaemonRequestHandler)
+        self.scheduler = scheduler
+
+
+class DaemonUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, scheduler):
+        if os.path.exists(path):
+            os.remove(path)  # Stale socket from a previous run
+        super().__init__(path, DaemonRequestHandler)
+        self.scheduler = scheduler
+
+
+def run_daemon(args):
+    """Serve the job API until interrupted"""
+    scheduler = JobScheduler(max_workers=args.workers)
+    if args.socket:
+        server = DaemonUnixServer(args.socket, scheduler)
+        where = args.socket
+    else:
+        host, _, port = args.listen.rpartition(':')
+        server = DaemonHTTPServer((host or '127.0.0.1', int(port)), scheduler)
+        where = f'http://{host or "127.0.0.1"}:{port}'
+    print(f'Download daemon listening on {where} with {args.workers} worker(s)', file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        scheduler.shutdown(timeout=5)
+    return 0
+
+
+# Streamable containers for pipe output: (ffmpeg muxer, file extension)
+STREAM_CONTAINERS = {
+    'mkv': ('matroska', 'mkv'),  # Any codec, written front to back without seeking
+    'ts': ('mpegts', 'ts'),  # H.264/AAC only, but items concatenate into one continuous stream
+}
+# Muxers for the audio-only choices (m4a/mp4 needs a seekable output, ADTS doesn't)
+STREAM_AUDIO_MUXERS = {'mp3': ('mp3', 'mp3'), 'm4a': ('adts', 'aac'), 'opus': ('ogg', 'opus')}
+STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class MediaStreamer:
+    """Stream videos into a pipe instead of files.
+
+    Each selected video is resolved by yt-dlp and handed to one ffmpeg process
+    that fetches the tracks itself and muxes them into a streamable container
+    on its stdout, so the consumer gets data right away and nothing is written
+    to disk. Playlist items are streamed one after another. With
+    framing='chunked' every item is a JSON header line followed by HTTP-style
+    chunks (hex size, CRLF, data, CRLF), ending with a zero-size chunk.
+    """
+
+    def __init__(self, url, format_name='best', playlist=False, items=None, container='mkv',
+                 framing='raw', status_callback=None):
+        _, _, self.format_id, self.audio_codec = find_format_choice(format_name)
+        self.url = url
+        self.playlist = playlist
+        self.items = items
+        self.muxer, self.ext = STREAM_AUDIO_MUXERS[self.audio_codec] if self.audio_codec else STREAM_CONTAINERS[container]
+        self.framing = framing
+        self.status_callback = status_callback or (lambda msg: None)
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def entries(self, ydl):
+        """Yield (playlist index, fully resolved info) for each selected video"""
+        info = ydl.extract_info(self.url, download=False)
+        if 'entries' not in info:
+            yield 1, info
+            return
+        for position, entry in enumerate(info['entries'], 1):
+            if self.cancel_event.is_set():
+                return
+            if not entry:
+                continue
+            # Entries are flat; resolve formats one at a time so streaming starts after the first
+            resolved = ydl.extract_info(entry.get('url') or entry.get('webpage_url'),
+                                        download=False, ie_key=entry.get('ie_key'))
+            yield entry.get('playlist_index') or position, resolved
+
+    def ffmpeg_args(self, info):
+        formats = info.get('requested_formats') or [info]
+        args = ['ffmpeg', '-loglevel', 'error', '-nostdin']
+        for fmt in formats:
+            headers = ''.join(f'{key}: {value}\r\n' for key, value in (fmt.get('http_headers') or {}).items())
+            if headers:
+                args += ['-headers', headers]
+            args += ['-i', fmt['url']]
+        for index in range(len(formats)):
+            args += ['-map', str(index)]
+        if self.audio_codec:
+            ext, copy_codecs, encode_args = AUDIO_CODECS[self.audio_codec]
+            source_codec = (formats[0].get('acodec') or '').split('.')[0]
+            args += ['-vn'] + (['-c:a', 'copy'] if source_codec in copy_codecs else encode_args)
+        else:
+            args += ['-c', 'copy']
+        return args + ['-f', self.muxer, 'pipe:1']
+
+    def stream_entry(self, info, out):
+        """Run ffmpeg for one video, writing its output to out; returns (returncode, stderr)"""
+        chunked = self.framing == 'chunked'
+        out.flush()
+        proc = subprocess.Popen(self.ffmpeg_args(info), stdin=subprocess.DEVNULL,
+                                stdout=subprocess.PIPE if chunked else out.fileno(),
+                                stderr=subprocess.PIPE)
+        try:
+            if chunked:
+                while True:
+                    data = proc.stdout.read1(STREAM_CHUNK_SIZE)
+                    if not data or self.cancel_event.is_set():
+                        break
+                    out.write(b'%x\r\n%s\r\n' % (len(data), data))
+                out.write(b'0\r\n\r\n')
+                out.flush()
+            while True:
+                try:
+                    _, stderr = proc.communicate(timeout=CANCEL_POLL_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    if self.cancel_event.is_set():
+                        proc.terminate()
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        stderr = stderr.decode('utf-8', 'replace').strip()
+        if proc.returncode in (-signal.SIGPIPE, 128 + signal.SIGPIPE) or 'Broken pipe' in stderr:
+            raise BrokenPipeError('Reader closed the stream')
+        return proc.returncode, stderr
+
+    def run(self, out):
+        """Stream every selected video into out; returns the number of failed items"""
+        ydl_opts = {
+            'format': self.format_id,
+            'quiet': True,
+            'no_warnings': True,
+            'noplaylist': not self.playlist,
+            'playlist_items': self.items if self.playlist else None,
+            'extract_flat': 'in_playlist',
+            'lazy_playlist': True,
+        }
+        failed = 0
+        with SessionYoutubeDL(ydl_opts) as ydl:
+            for index, info in self.entries(ydl):
+                if self.cancel_event.is_set():
+                    break
+                title = info.get('title', '')
+                self.status_callback(f'Streaming {index}: {title}')
+                if self.framing == 'chunked':
+                    header = {'index': index, 'id': info.get('id'), 'title': title, 'ext': self.ext}
+                    out.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+                returncode, stderr = self.stream_entry(info, out)
+                if returncode != 0 and not self.cancel_event.is_set():
+                    failed += 1
+                    self.status_callback(f'Error streaming {index}: {stderr or returncode}')
+        return failed
+
+
+def open_stream_output(target):
+    """Binary writer for '-' (stdout), 'unix:PATH' (connect to a listening socket) or a path/FIFO"""
+    if target == '-':
+        return sys.stdout.buffer
+    if target.startswith('unix:'):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(target[len('unix:'):])
+        return sock.makefile('wb')
+    return open(target, 'wb')  # Opening a FIFO blocks until a reader attaches
+
+
+def run_stream(args):
+    """Stream the given URL to the chosen output and exit"""
+    streamer = MediaStreamer(
+        args.stream, args.format, playlist=args.playlist or bool(args.items), items=args.items,
+        container=args.container, framing=args.framing,
+        status_callback=lambda msg: print(msg, file=sys.stderr)
+    )
+    out = open_stream_output(args.output)
+    try:
+        failed = streamer.run(out)
+    except BrokenPipeError:
+        print('Reader closed the stream', file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        streamer.cancel()
+        return 130
+    finally:
+        if out is not sys.stdout.buffer:
+            try:
+                out.close()
+            except BrokenPipeError:
+                pass
+    return 1 if failed else 0
+
+
+SHARD_JOURNAL_NAME = '.shard_journal.jsonl'
+SHARD_PROGRESS_INTERVAL = 0.25  # Seconds between progress reports from a shard worker
+SHARD_WORKER_EXIT_TIMEOUT = 30
+
+
+def list_playlist_entries(url, items=None):
+    """(position, video URL, video id) of the selected playlist entries, without resolving formats"""
+    ydl_opts = {'extract_flat': 'in_playlist', 'quiet': True, 'no_warnings': True, 'playlist_items': items}
+    with SessionYoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+    entries = []
+    for position, entry in enumerate(info.get('entries') or [], 1):
+        if entry:
+            entries.append((entry.get('playlist_index') or position,
+                            entry.get('url') or entry.get('webpage_url'), entry.get('id')))
+    return entries
+
+
+def read_shard_journal(path):
+    """Keys (video id, or position when unknown) of the items a shard journal marks as done"""
+    done = set()
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # Torn last line after a crash
+                if record.get('state') == 'done':
+                    done.add(record.get('id') or record.get('position'))
+    return done
+
+
+class ShardWorkerState:
+    """Coordinator-side view of one connected shard worker"""
+
+    def __init__(self, name):
+        self.name = name
+        self.shard = deque()
+        self.leased = set()  # Positions handed out and not yet reported back
+
+
+class ShardRequestHandler(socketserver.StreamRequestHandler):
+    """One worker connection: a JSON request per line, answered by one JSON reply line"""
+
+    def handle(self):
+        job = self.server.job
+        worker = None
+        try:
+            for line in self.rfile:
+                message = json.loads(line)
+                if worker is None:
+                    worker = ShardWorkerState(message.get('worker') or str(self.client_address))
+                reply = job.handle_message(worker, message)
+                self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            if worker is not None:
+                job.worker_lost(worker)
+
+
+class ShardServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, job):
+        self.job = job
+        super().__init__(address, ShardRequestHandler)
+
+
+class ShardedJob:
+    """Download a playlist with several worker processes, locally or on other hosts.
+
+    This object is the coordinator. It lists the selected entries, splits them
+    into one contiguous shard per process and hands items out over a TCP
+    protocol of JSON lines. A worker takes items from its own shard, then steals
+    from the far end of the largest remaining shard. Results go to a journal
+    in the save folder that only the coordinator writes, so no item is fetched
+    twice, not even when the job is run again. It has the same signals as
+    DownloadJob, so it runs in the scheduler, the daemon and the asyncio API.
+    """
+
+    def __init__(self, request, processes=2, listen='127.0.0.1:0', spawn_workers=True):
+        find_format_choice(request.get('format', 'best'))  # Fail before any worker starts
+        if find_output_layout(request.get('layout', 'flat'))[1] == 'playlist':
+            # Workers fetch single videos, which carry no playlist title
+            raise ValueError("The 'playlist' layout can't be combined with 'processes'")
+        self.progress = Signal()
+        self.status = Signal()
+        self.finished = Signal()
+        self.download_error = Signal()
+        self.detailed_progress = Signal()
+        self.cancelled = Signal()
+        self.cancel_event = threading.Event()
+        self.outcome = None
+        self.url = request['url']
+        self.request = request
+        self.processes = max(processes, 1)
+        self.listen = listen
+        self.spawn_workers = spawn_workers  # False to wait for --shard-worker processes only
+        self.save_path = os.path.expanduser(request.get('save_path') or '~/Downloads')
+        self.journal_path = os.path.join(self.save_path, SHARD_JOURNAL_NAME)
+        # What each worker runs per item: one video, saved under its playlist position
+        self.worker_request = {key: value for key, value in request.items()
+                               if key not in ('items', 'playlist', 'processes', 'sync')}
+        self.worker_request['save_path'] = self.save_path
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        self.address = None
+        self.entries = {}
+        self.shards = []
+        self.unclaimed = []
+        self.remaining = 0
+        self.completed = 0
+        self.failed = 0
+        self.connected = 0
+        self.aggregate = AggregateProgress(1)
+
+    def cancel(self):
+        """Tell workers to stop at their next progress report; partial files are kept"""
+        self.cancel_event.set()
+        with self.lock:
+            self.changed.notify_all()
+
+    def plan(self):
+        """List entries, drop those already journaled and cut the rest into shards"""
+        self.status.emit('Listing playlist entries...')
+        entries = list_playlist_entries(self.url, self.request.get('items'))
+        os.makedirs(self.save_path, exist_ok=True)
+        done = read_shard_journal(self.journal_path)
+        pending = [entry for entry in entries if (entry[2] or entry[0]) not in done]
+        if len(pending) < len(entries):
+            self.status.emit(f'Skipping {len(entries) - len(pending)} item(s) already in the journal')
+        self.entries = {entry[0]: entry for entry in pending}
+        size = -(-len(pending) // self.processes) or 1
+        self.shards = [deque(entry[0] for entry in pending[i:i + size]) for i in range(0, len(pending), size)]
+        self.unclaimed = list(self.shards)
+        self.remaining = len(pending)
+        self.completed = self.failed = 0
+        self.aggregate = AggregateProgress(len(pending))
+
+    def run(self):
+        self.cancel_event.clear()
+        self.outcome = None
+        server = None
+        workers = []
+        try:
+            self.plan()
+            if self.remaining:
+                host, _, port = self.listen.rpartition(':')
+                server = ShardServer((host or '127.0.0.1', int(port)), self)
+                threading.Thread(target=server.serve_forever, name='shard-coordinator', daemon=True).start()
+                bound_host, bound_port = server.server_address[:2]
+                self.address = f'{bound_host}:{bound_port}'
+                self.status.emit(f'Coordinator listening on {self.address}, {self.remaining} item(s) to fetch')
+                if self.spawn_workers:
+                    local = f"{'127.0.0.1' if bound_host in ('0.0.0.0', '') else bound_host}:{bound_port}"
+                    workers = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--shard-worker', local],
+                                                stdin=subprocess.DEVNULL)
+                               for _ in range(self.processes)]
+                with self.lock:
+                    while self.remaining and not self.cancel_event.is_set():
+                        if workers and not self.connected and all(w.poll() is not None for w in workers):
+                            raise RuntimeError('All shard workers exited')
+                        self.changed.wait(CANCEL_POLL_INTERVAL)
+            for worker in workers:
+                try:
+                    worker.wait(timeout=SHARD_WORKER_EXIT_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    worker.kill()
+
+            if self.cancel_event.is_set():
+                self.outcome = 'cancelled'
+                self.status.emit('Download cancelled, partial files kept for resuming')
+                self.cancelled.emit()
+            elif self.failed:
+                self.outcome = 'failed'
+                self.download_error.emit(f'{self.failed} item(s) failed, run again to retry them')
+            else:
+                self.outcome = 'finished'
+                self.finished.emit()
+        except Exception as e:
+            self.cancel_event.set()  # Stop any workers that are still connected
+            self.outcome = 'failed'
+            self.download_error.emit(str(e))
+        finally:
+            for worker in workers:
+                if worker.poll() is None:
+                    worker.wait()
+            if server:
+                server.shutdown()
+                server.server_close()
+
+    def handle_message(self, worker, message):
+        op = message.get('op')
+        if op == 'hello':
+            with self.lock:
+                if self.unclaimed:
+                    worker.shard = self.unclaimed.pop(0)
+                self.connected += 1
+            self.status.emit(f'Worker {worker.name} connected')
+            return {'op': 'config', 'request': self.worker_request}
+        if op == 'result':
+            self.record_result(worker, message)
+            return {'op': 'ok'}
+        if self.cancel_event.is_set():
+            return {'op': 'cancel'}
+        if op == 'next':
+            position = self.take_item(worker)
+            if position is None:
+                return {'op': 'done'}
+            return {'op': 'item', 'position': position, 'url': self.entries[position][1]}
+        if op == 'progress':
+            self.report_progress(message)
+            return {'op': 'ok'}
+        return {'op': 'error', 'error': f'Unknown op {op!r}'}
+
+    def take_item(self, worker):
+        with self.lock:
+            if worker.shard:
+                position = worker.shard.popleft()
+            else:
+                victim = max(self.shards, key=len, default=None)
+                if not victim:
+                    return None
+                position = victim.pop()  # Steal from the end its owner reaches last
+            worker.leased.add(position)
+            return position
+
+    def report_progress(self, message):
+        percent, job_eta = self.aggregate.update(
+            message['position'], message.get('path'), message.get('downloaded') or 0, message.get('total') or 0)
+        self.progress.emit(percent)
+        self.detailed_progress.emit(ProgressEvent(
+            message.get('downloaded') or 0, message.get('total') or 0, message.get('speed'), message.get('eta'),
+            message.get('path'), percent, min(self.completed + self.failed + 1, len(self.entries)),
+            len(self.entries), job_eta
+        ))
+
+    def record_result(self, worker, message):
+        position = message['position']
+        with self.lock:
+            worker.leased.discard(position)
+            if message.get('cancelled'):
+                self.shards.append(deque([position]))  # Picked up again if the job is resumed
+                return
+            state = 'done' if message.get('ok') else 'failed'
+            _, _, video_id = self.entries[position]
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'position': position, 'id': video_id, 'state': state,
+                                    'worker': worker.name, 'time': time.time()}) + '\n')
+            self.remaining -= 1
+            if message.get('ok'):
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.changed.notify_all()
+        if message.get('ok'):
+            size = message.get('bytes') or 0
+            percent, _ = self.aggregate.update(position, message.get('path'), size, size, finished=True)
+            self.progress.emit(percent)
+            self.status.emit(f'[{worker.name}] Finished item {position}')
+        else:
+            self.status.emit(f"[{worker.name}] Item {position} failed: {message.get('error')}")
+
+    def worker_lost(self, worker):
+        with self.lock:
+            self.connected -= 1
+            if worker.leased:
+                # Hand unfinished items back so the remaining workers pick them up
+                self.shards.append(deque(sorted(worker.leased)))
+                worker.leased.clear()
+            self.changed.notify_all()
+        self.status.emit(f'Worker {worker.name} disconnected')
+
+
+def run_shard_worker(address):
+    """Fetch items from a ShardedJob coordinator at HOST:PORT until it runs out"""
+    host, _, port = address.rpartition(':')
+    name = f'{socket.gethostname()}:{os.getpid()}'
+    with socket.create_connection((host, int(port))) as sock:
+        rfile = sock.makefile('rb')
+        wfile = sock.makefile('wb')
+
+        def call(message):
+            wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+            wfile.flush()
+            line = rfile.readline()
+            if not line:
+                raise ConnectionError('Coordinator closed the connection')
+            return json.loads(line)
+
+        request = call({'op': 'hello', 'worker': name})['request']
+        while True:
+            reply = call({'op': 'next'})
+            if reply['op'] != 'item':
+                break
+            position = reply['position']
+            job = job_from_request(dict(request, url=reply['url'], playlist_index=position))
+            last = {'event': None, 'sent': 0.0}
+            errors = []
+
+            def on_detail(event):
+                last['event'] = event
+                now = time.monotonic()
+                if now - last['sent'] < SHARD_PROGRESS_INTERVAL:
+                    return
+                last['sent'] = now
+                reply = call({'op': 'progress', 'position': position, 'path': event.path,
+                              'downloaded': event.downloaded, 'total': event.total,
+                              'speed': event.speed, 'eta': event.eta})
+                if reply['op'] == 'cancel':
+                    job.cancel()
+
+            job.detailed_progress.connect(on_detail)
+            job.download_error.connect(errors.append)
+            job.run()
+            event = last['event']
+            call({'op': 'result', 'position': position, 'ok': job.outcome == 'finished',
+                  'cancelled': job.outcome == 'cancelled', 'error': errors[-1] if errors else None,
+                  'path': event.path if event else None,
+                  'bytes': max(event.total, event.downloaded) if event else 0})
+            if job.outcome == 'cancelled':
+                break
+    return 0
+
+
+def run_shard(args):
+    """Download a playlist with several worker processes, printing progress to stderr"""
+    job = ShardedJob({'url': args.shard, 'format': args.format, 'items': args.items,
+                      'save_path': args.save_path, 'layout': args.layout, 'fragments': args.fragments,
+                      'http_chunk_size': args.http_chunk_size, 'fragment_retries': args.fragment_retries,
+                      'skip_existing': not args.no_skip_existing},
+                     args.processes, args.shard_listen)
+    job.status.connect(lambda msg: print(msg, file=sys.stderr))
+    job.download_error.connect(lambda msg: print(f'Error: {msg}', file=sys.stderr))
+    last_print = [0.0]
+
+    def on_detail(event):
+        now = time.monotonic()
+        if now - last_print[0] >= 1:
+            last_print[0] = now
+            print(f'{event.percent_str} - item {event.video_num} of {event.total_videos} - '
+                  f'ETA {event.job_eta_str}', file=sys.stderr)
+
+    job.detailed_progress.connect(on_detail)
+    thread = threading.Thread(target=job.run, name='shard-job')
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(CANCEL_POLL_INTERVAL)
+    except KeyboardInterrupt:
+        job.cancel()
+        thread.join()
+    return 0 if job.outcome == 'finished' else 1
+
+
+class AsyncDownloader:
+    """asyncio front end for embedding the downloader in async services.
+
+        client = AsyncDownloader(max_downloads=4)
+        summary = await client.validate(url)
+        async for event in client.download({'url': url, 'format': '720p'}):
+            ...
+
+    Blocking yt-dlp work runs on the client's own thread pool. Jobs waiting
+    for a download slot are plain coroutines and hold no thread. Cancelling
+    the consuming task (or leaving the async for early) stops the job and
+    keeps its partial files, just like a cancel in the GUI.
+    """
+
+    def __init__(self, max_downloads=2, max_validations=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_downloads + max_validations,
+                                           thread_name_prefix='async-download')
+        self.max_downloads = max_downloads
+        self.max_validations = max_validations
+        self.download_slots = None  # Semaphores are created on first use inside the running loop
+        self.validation_slots = None
+
+    def slots(self):
+        if self.download_slots is None:
+            self.download_slots = asyncio.Semaphore(self.max_downloads)
+            self.validation_slots = asyncio.Semaphore(self.max_validations)
+        return self.download_slots, self.validation_slots
+
+    async def validate(self, url):
+        """Resolve a URL into a dict with title, count, entries (EntryStore or None), duration and is_playlist"""
+        _, validation_slots = self.slots()
+        cancelled = threading.Event()
+        async with validation_slots:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, cached_url_summary, url, cancelled.is_set)
+            try:
+                title, count, entries, duration = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                cancelled.set()  # The thread stops at its next playlist page
+                raise
+        return {'title': title, 'count': count, 'entries': entries, 'duration': duration,
+                'is_playlist': count > 1}
+
+    async def download(self, plan):
+        """Run a download and yield its JobEvents.
+
+        plan is a DownloadJob or a job description as accepted by the daemon
+        (see job_from_request). The last event is a 'state' event carrying
+        'finished', 'failed' or 'cancelled'.
+        """
+        job = plan if isinstance(plan, DownloadJob) else job_from_request(plan)
+        download_slots, _ = self.slots()
+        loop = asyncio.get_running_loop()
+        events = asyncio.Queue()
+        seq = 0
+
+        def forward(kind):
+            return lambda data: loop.call_soon_threadsafe(events.put_nowait, (kind, data))
+
+        job.progress.connect(forward('progress'))
+        job.detailed_progress.connect(forward('detail'))
+        job.status.connect(forward('status'))
+        job.download_error.connect(forward('error'))
+
+        async with download_slots:
+            future = loop.run_in_executor(self.executor, job.run)
+            # Queued after every event the job thread sent, so nothing is lost
+            future.add_done_callback(lambda _: events.put_nowait(None))
+            try:
+                while True:
+                    item = await events.get()
+                    if item is None:
+                        break
+                    seq += 1
+                    yield JobEvent(seq, time.time(), *item)
+            finally:
+                if not future.done():
+                    job.cancel()
+                    await asyncio.shield(future)
+        yield JobEvent(seq + 1, time.time(), 'state', job.outcome or 'failed')
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+
+BATCH_POLICIES = [
+    ('Download all videos', 'all'),
+    ('Download the first N videos', 'first'),
+    ('Skip playlists', 'skip'),
+]
+
+
+class BatchImportDialog(QDialog):
+    """Paste or load a list of URLs, validate them in parallel and queue the valid ones"""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.main_window = window
+        self.urls = []
+        self.summaries = {}  # Row -> summary tuple of the URLs that validated
+        self.checked = 0
+        self.validator = None
+        self.setWindowTitle('Import URL List')
+        self.resize(820, 600)
+
+        layout = QVBoxLayout(self)
+        self.url_text = QTextEdit()
+        self.url_text.setPlaceholderText('Paste URLs, one per line, or load a .txt, .csv or .json file')
+        self.url_text.setMaximumHeight(140)
+        layout.addWidget(self.url_text)
+
+        input_buttons = QHBoxLayout()
+        load_btn = QPushButton('Load File...')
+        load_btn.clicked.connect(self.load_file)
+        self.validate_btn = QPushButton('Validate All')
+        self.validate_btn.clicked.connect(self.validate_all)
+        input_buttons.addWidget(load_btn)
+        input_buttons.addWidget(self.validate_btn)
+        input_buttons.addStretch()
+        layout.addLayout(input_buttons)
+
+        self.results_table = QTableWidget(0, 4)
+        self.results_table.setHorizontalHeaderLabels(['URL', 'Status', 'Title', 'Videos'])
+        self.results_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.results_table)
+
+        policy_layout = QHBoxLayout()
+        policy_layout.addWidget(QLabel('Format:'))
+        self.format_combo = QComboBox()
+        self.format_combo.addItems([choice[0] for choice in FORMAT_CHOICES])
+        self.format_combo.setCurrentIndex(window.format_combo.currentIndex())
+        policy_layout.addWidget(self.format_combo)
+        policy_layout.addWidget(QLabel('Playlists:'))
+        self.policy_combo = QComboBox()
+        self.policy_combo.addItems([label for label, _ in BATCH_POLICIES])
+        policy_layout.addWidget(self.policy_combo)
+        self.first_n = QSpinBox()
+        self.first_n.setRange(1, 100000)
+        self.first_n.setValue(10)
+        self.first_n.setPrefix('N = ')
+        policy_layout.addWidget(self.first_n)
+        policy_layout.addStretch()
+        layout.addLayout(policy_layout)
+
+        bottom = QHBoxLayout()
+        self.summary_label = QLabel('No URLs loaded')
+        self.summary_label.setObjectName("statsLabel")
+        self.queue_btn = QPushButton('Queue Valid URLs')
+        self.queue_btn.setEnabled(False)
+        self.queue_btn.clicked.connect(self.queue_valid)
+        bottom.addWidget(self.summary_label)
+        bottom.addStretch()
+        bottom.addWidget(self.queue_btn)
+        layout.addLayout(bottom)
+
+    def load_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import URL List", "",
+                                              "URL lists (*.txt *.csv *.json);;All files (*)")
+        if not path:
+            return
+        try:
+            with open(path, encoding='utf-8') as f:
+                urls = parse_url_list(f.read(), path)
+        except (OSError, ValueError, AttributeError) as e:
+            QMessageBox.warning(self, 'Error', f'Could not read URL list: {e}')
+            return
+        self.url_text.setPlainText('\n'.join(urls))
+
+    def validate_all(self):
+        try:
+            urls = parse_url_list(self.url_text.toPlainText())
+        except (ValueError, AttributeError) as e:
+            QMessageBox.warning(self, 'Error', f'Could not read URL list: {e}')
+            return
+        if not urls:
+            QMessageBox.warning(self, 'Error', 'No URLs found')
+            return
+        if self.validator:
+            self.validator.cancel()
+        self.urls = urls
+        self.summaries = {}
+        self.checked = 0
+        self.results_table.setRowCount(len(urls))
+        for row, url in enumerate(urls):
+            self.results_table.setItem(row, 0, QTableWidgetItem(url))
+            self.results_table.setItem(row, 1, QTableWidgetItem('Checking...'))
+            self.results_table.setItem(row, 2, QTableWidgetItem(''))
+            self.results_table.setItem(row, 3, QTableWidgetItem(''))
+        self.validator = BatchValidator(urls)
+        self.validator.result.connect(
+            lambda row, valid, data, v=self.validator: self.show_result(v, row, valid, data))
+        self.validator.start()
+        self.update_summary()
 
-class DownloadWorker(QThread):
-    progress = pyqtSignal(float)
-    status = pyqtSignal(str)
-    finished = pyqtSignal()
-    download_error = pyqtSignal(str)  # Renamed from error to download_error
-    detailed_progress = pyqtSignal(dict)  # New signal for detailed progress
+    def show_result(self, validator, row, valid, data):
+        if validator is not self.validator:
+            return  # From a list that has been replaced
+        self.checked += 1
+        if valid:
+            title, count = data[0], data[1]
+            self.summaries[row] = data
+            self.results_table.item(row, 1).setText('Valid')
+            self.results_table.item(row, 2).setText(title)
+            self.results_table.item(row, 3).setText(str(count))
+        else:
+            self.results_table.item(row, 1).setText('Invalid')
+            self.results_table.item(row, 1).setToolTip(data)
+            self.results_table.item(row, 2).setText(data)
+        self.update_summary()
 
-    def __init__(self, url, save_path, format_id, num_videos, start_index=1, end_index=None, is_playlist=False, start_time=None, end_time=None, playlist_items=None):
-        super().__init__()
-        self.url = url
-        self.save_path = save_path
-        self.format_id = format_id
-        self.num_videos = num_videos
-        self.is_playlist = is_playlist
-        self.start_index = start_index
-        self.end_index = end_index if end_index else num_videos
-        self.start_time = start_time  # Time in seconds
-        self.end_time = end_time  # Time in seconds
-        self.current_video = 0
-        self.last_progress = 0
-        self.smoothed_progress = 0
-        self.progress_history = []
-        self.total_progress = 0
-        self.current_video_progress = 0
-        self.overall_progress = 0
-        self.playlist_items = playlist_items
-        self.current_video_index = 0  # Add this to track the actual video index
-        self.total_selected = num_videos  # Store the total number of selected videos
+    def update_summary(self):
+        self.summary_label.setText(f'{self.checked} of {len(self.urls)} checked, {len(self.summaries)} valid')
+        self.queue_btn.setEnabled(bool(self.summaries))
 
-    def progress_hook(self, d):
-        if d['status'] == 'downloading':
-            # Calculate speed and progress
-            speed = d.get('speed', 0)
-            speed_str = f"{speed/1024/1024:.1f} MB/s" if speed else "N/A"
-
-            # Get downloaded and total size
-            total = d.get('total_bytes', 0) or d.get('total_bytes_estimate', 0)
-            downloaded = d.get('downloaded_bytes', 0)
-
-            if total > 0:
-                # Calculate progress for current video only
-                self.current_video_progress = (downloaded / total) * 100
-                
-                # Calculate overall progress including all videos
-                overall_progress = ((self.current_video_index * 100) + self.current_video_progress) / self.total_selected
-                
-                # Use smoothing for the progress bar
-                alpha = 0.1
-                self.smoothed_progress = (alpha * overall_progress + 
-                                        (1 - alpha) * self.last_progress)
-                self.last_progress = self.smoothed_progress
-                
-                self.progress.emit(self.smoothed_progress)
-                progress_str = f"{self.smoothed_progress:.1f}%"
-            else:
-                progress_str = "Calculating..."
+    def queue_valid(self):
+        items = [(self.urls[row], summary) for row, summary in sorted(self.summaries.items())]
+        queued = self.main_window.queue_batch(
+            items, FORMAT_CHOICES[self.format_combo.currentIndex()],
+            BATCH_POLICIES[self.policy_combo.currentIndex()][1], self.first_n.value())
+        if queued:
+            self.summary_label.setText(f'Queued {queued} download(s)')
+            self.accept()
 
-            # Format file size and time
-            total_size = f"{total/1024/1024:.1f} MB" if total else "Unknown"
-            downloaded_size = f"{downloaded/1024/1024:.1f}"
-            
-            # Calculate ETA
-            eta = d.get('eta', None)
-            if eta is not None:
-                m, s = divmod(eta, 60)
-                h, m = divmod(m, 60)
-                eta_str = f"{h:02d}:{m:02d}:{s:02d}" if h else f"{m:02d}:{s:02d}"
-            else:
-                eta_str = "Calculating..."
+    def done(self, result):
+        if self.validator:
+            self.validator.cancel()
+        super().done(result)
 
-            # Get clean filename without path
-            filename = os.path.basename(d.get('filename', ''))
-            
-            # Update progress info with correct video count
-            progress_info = {
-                'speed': speed_str,
-                'downloaded': downloaded_size,
-                'total': total_size,
-                'video_num': min(self.current_video_index + 1, self.total_selected),  # Ensure we don't exceed total
-                'filename': filename,
-                'percent': progress_str,
-                'eta': eta_str,
-                'total_videos': self.total_selected
-            }
-            
-            self.detailed_progress.emit(progress_info)
-            
-        elif d['status'] == 'finished':
-            self.current_video_index += 1  # Increment the video index when a video is finished
-            self.current_video_progress = 0
-            self.status.emit('Processing completed file...')
 
-    def run(self):
-        try:
-            ydl_opts = {
-                'format': self.format_id,
-                'outtmpl': os.path.join(self.save_path, f'%(playlist_index)03d_%(title)s.%(ext)s' if self.is_playlist else '%(title)s.%(ext)s'),
-                'progress_hooks': [self.progress_hook],
-                'noplaylist': not self.is_playlist,
-                'playlist_items': self.playlist_items if self.is_playlist else None,
-                'logger': self,
-            }
+class EntryListModel(QAbstractListModel):
+    """Checkable playlist entries for a QListView, read from an EntryStore as rows are shown.
 
-            # Add time range processing for single video
-            if not self.is_playlist and (self.start_time is not None or self.end_time is not None):
-                # Add postprocessor for ffmpeg
-                ydl_opts.update({
-                    'postprocessor_args': [
-                        '-ss', str(self.start_time) if self.start_time else '0',
-                        '-t', str(self.end_time - (self.start_time or 0)) if self.end_time else None
-                    ],
-                    'prefer_ffmpeg': True,
-                })
+    set_filter narrows the rows to a list of 0-based entry indices (e.g. TitleIndex matches),
+    so filtering is one model reset rather than hiding view rows one at a time.
+    """
+    selection_changed = pyqtSignal()
 
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                self.status.emit('Starting download...')
-                ydl.download([self.url])
-            
-            self.finished.emit()
-        except Exception as e:
-            self.download_error.emit(str(e))
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+        self.rows = None  # 0-based entry index of each shown row, None when all are shown
 
-    def post_process_hook(self, d):
-        """Handle post-processing progress"""
-        if d['status'] == 'started':
-            self.status.emit(f"Post-processing: {d.get('postprocessor', '')}")
-        elif d['status'] == 'finished':
-            self.status.emit('Post-processing finished')
+    def set_filter(self, rows=None):
+        """Show only the entries at these 0-based indices (None for all)"""
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
 
-    # Add these methods for logging
-    def debug(self, msg):
-        if msg.strip():
-            self.status.emit(msg)
+    def entry_index(self, row):
+        """0-based entry index shown at a model row"""
+        return row if self.rows is None else self.rows[row]
 
-    def warning(self, msg):
-        if msg.strip():
-            self.status.emit(f"Warning: {msg}")
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store) if self.rows is None else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        entry = self.entry_index(index.row())
+        if role == Qt.DisplayRole:
+            return f"{entry + 1}. {self.store.titles[entry]}"
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.store.is_selected(entry + 1) else Qt.Unchecked
+        return None
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.CheckStateRole:
+            return False
+        self.store.set_selected([self.entry_index(index.row()) + 1], value == Qt.Checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.selection_changed.emit()
+        return True
+
+    def set_checked(self, entries, checked):
+        """Check or uncheck many entries (0-based indices, None for all) with a single repaint"""
+        if entries is None:
+            self.store.set_all_selected(checked)
+        else:
+            self.store.set_selected((entry + 1 for entry in entries), checked)
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1), [Qt.CheckStateRole])
+        self.selection_changed.emit()
 
-    def error(self, msg):
-        if msg.strip():
-            self.status.emit(f"Error: {msg}")
-            self.download_error.emit(msg)  # Use download_error signal instead
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -196,10 +3482,26 @@ class MainWindow(QMainWindow):
         self.video_count = 0
         self.is_playlist = False
         self.selected_count = 1
-        self.selected_videos = []
-        self.video_checkboxes = []
+        self.entries = None  # EntryStore of the validated playlist
+        self.entry_model = None
+        self.clip_ranges = []
         self.validator = None
+        self.active_validators = set()
+        self.validation_generation = 0
+        self.speculative_result = None  # (url, validated args) found while typing, used on Validate
+        self.validation_timer = QTimer(self)
+        self.validation_timer.setSingleShot(True)
+        self.validation_timer.timeout.connect(self.speculative_validate)
         self.downloader = None
+        self.event_recorder = None  # Set by benchmarks/gui_replay.py to record job events
+        self.worker = None
+        self.current_title = ''
+        
+        # Shared scheduler for queued jobs
+        self.scheduler = JobScheduler(max_workers=2)
+        self.scheduler_bridge = SchedulerBridge(self.scheduler)
+        self.scheduler_bridge.job_event.connect(self.handle_job_event)
+        self.queue_row_ids = []  # Job id of each row in the queue table
         
         # Setup UI
         self.initUI()
@@ -388,13 +3690,30 @@ class MainWindow(QMainWindow):
         self.url_input.setPlaceholderText('Paste URL here')
         self.url_input.setMinimumHeight(45)
         
+        self.url_input.textChanged.connect(self.on_url_changed)
+        
+        self.url_status_label = QLabel()
+        self.url_status_label.setObjectName("statsLabel")
+        self.url_status_label.setWordWrap(True)
+        
         self.validate_btn = QPushButton('Validate URL')
         self.validate_btn.setMinimumHeight(45)
         self.validate_btn.clicked.connect(self.validate_url)
         
         url_container_layout.addWidget(url_label)
         url_container_layout.addWidget(self.url_input)
+        url_container_layout.addWidget(self.url_status_label)
         url_container_layout.addWidget(self.validate_btn)
+        
+        self.sync_btn = QPushButton('Sync Playlist (Skip Selection)')
+        self.sync_btn.setMinimumHeight(45)
+        self.sync_btn.clicked.connect(self.start_sync_setup)
+        url_container_layout.addWidget(self.sync_btn)
+        
+        self.batch_btn = QPushButton('Import URL List...')
+        self.batch_btn.setMinimumHeight(45)
+        self.batch_btn.clicked.connect(lambda: BatchImportDialog(self).exec_())
+        url_container_layout.addWidget(self.batch_btn)
         url_layout.addWidget(url_container)
         url_layout.addStretch()
         
@@ -449,8 +3768,7 @@ class MainWindow(QMainWindow):
         format_label = QLabel('Select Format:')
         format_label.setProperty("class", "StepTitle")
         self.format_combo = QComboBox()
-        self.format_combo.addItems(['Best Quality (Video + Audio)', 'HD 1080p', 'HD 720p', 
-                                  'SD 480p', 'SD 360p', 'Audio Only (MP3)'])
+        self.format_combo.addItems([choice[0] for choice in FORMAT_CHOICES])
         self.format_combo.setMinimumHeight(45)
         
         # Save location
@@ -465,16 +3783,123 @@ class MainWindow(QMainWindow):
         location_layout.addWidget(self.save_path)
         location_layout.addWidget(browse_btn)
         
+        # Optional staging location (fast local disk for partial/intermediate files)
+        staging_label = QLabel('Staging Folder (Optional):')
+        staging_label.setProperty("class", "StepTitle")
+        staging_layout = QHBoxLayout()
+        self.staging_path = QLineEdit()
+        self.staging_path.setPlaceholderText('Write partial files directly to save location')
+        self.staging_path.setMinimumHeight(45)
+        staging_browse_btn = QPushButton('Browse')
+        staging_browse_btn.setFixedSize(100, 45)
+        staging_browse_btn.clicked.connect(self.browse_staging_location)
+        staging_layout.addWidget(self.staging_path)
+        staging_layout.addWidget(staging_browse_btn)
+        
+        # Optional shared library (one stored copy per video, linked into each folder)
+        library_label = QLabel('Shared Library Folder (Optional):')
+        library_label.setProperty("class", "StepTitle")
+        library_layout = QHBoxLayout()
+        self.library_path = QLineEdit()
+        self.library_path.setPlaceholderText('Store each video once and link it into the save location')
+        self.library_path.setMinimumHeight(45)
+        library_browse_btn = QPushButton('Browse')
+        library_browse_btn.setFixedSize(100, 45)
+        library_browse_btn.clicked.connect(self.browse_library_location)
+        library_layout.addWidget(self.library_path)
+        library_layout.addWidget(library_browse_btn)
+        
+        # Output layout (subfolders keep huge save locations fast)
+        layout_label = QLabel('Folder Layout:')
+        layout_label.setProperty("class", "StepTitle")
+        self.layout_combo = QComboBox()
+        self.layout_combo.addItems([layout[0] for layout in OUTPUT_LAYOUTS])
+        self.layout_combo.setMinimumHeight(45)
+        self.skip_existing_check = QCheckBox('Skip videos whose file is already in the save location')
+        self.skip_existing_check.setChecked(True)
+        
+        # Merge mode for video+audio formats
+        merge_label = QLabel('Merge Mode:')
+        merge_label.setProperty("class", "StepTitle")
+        self.merge_combo = QComboBox()
+        self.merge_combo.addItems(['Download Tracks, Then Merge', 'Stream Into ffmpeg (No Intermediate Files)'])
+        self.merge_combo.setMinimumHeight(45)
+        
+        # Fragmented (DASH/HLS) downloads
+        fragments_label = QLabel('Fragmented Streams:')
+        fragments_label.setProperty("class", "StepTitle")
+        self.fragments_spin = QSpinBox()
+        self.fragments_spin.setRange(1, FRAGMENT_CONCURRENCY_MAX)
+        self.fragments_spin.setPrefix('Parallel fragments: ')
+        self.fragments_spin.setMinimumHeight(45)
+        self.chunk_combo = QComboBox()
+        self.chunk_combo.addItems([f'HTTP chunks: {label}' for label, _ in HTTP_CHUNK_SIZES])
+        self.chunk_combo.setMinimumHeight(45)
+        self.fragment_retries_spin = QSpinBox()
+        self.fragment_retries_spin.setRange(0, 100)
+        self.fragment_retries_spin.setValue(FRAGMENT_RETRIES_DEFAULT)
+        self.fragment_retries_spin.setPrefix('Retries: ')
+        self.fragment_retries_spin.setMinimumHeight(45)
+        fragments_layout = QHBoxLayout()
+        fragments_layout.addWidget(self.fragments_spin)
+        fragments_layout.addWidget(self.chunk_combo)
+        fragments_layout.addWidget(self.fragment_retries_spin)
+        
+        self.split_chapters_check = QCheckBox('Split into one file per chapter')
+        
+        # Playlist sync mode
+        sync_label = QLabel('Playlist Sync:')
+        sync_label.setProperty("class", "StepTitle")
+        self.sync_combo = QComboBox()
+        self.sync_combo.addItems(['Off (Download Selection)', 'Download New Videos Only',
+                                  'Download New Videos (Newest-First Playlist)'])
+        self.sync_combo.setMinimumHeight(45)
+        self.archive_removed_check = QCheckBox(f"Move videos removed from the playlist to '{REMOVED_DIR_NAME}'")
+        
+        # Checksum / integrity verification
+        verify_label = QLabel('Verify Downloads:')
+        verify_label.setProperty("class", "StepTitle")
+        self.verify_combo = QComboBox()
+        self.verify_combo.addItems(['No Verification', 'SHA-256 + ffprobe check', 'xxHash64 + ffprobe check'])
+        self.verify_combo.setMinimumHeight(45)
+        if xxhash is None:
+            self.verify_combo.model().item(2).setEnabled(False)
+        
         self.download_btn = QPushButton('Start Download')
         self.download_btn.setObjectName("downloadBtn")
         self.download_btn.setMinimumHeight(45)
         self.download_btn.clicked.connect(self.start_download)
         
+        self.queue_btn = QPushButton('Add to Queue')
+        self.queue_btn.setMinimumHeight(45)
+        self.queue_btn.clicked.connect(self.add_to_queue)
+        
+        download_buttons = QHBoxLayout()
+        download_buttons.addWidget(self.download_btn)
+        download_buttons.addWidget(self.queue_btn)
+        
         options_layout.addWidget(format_label)
         options_layout.addWidget(self.format_combo)
         options_layout.addWidget(location_label)
         options_layout.addLayout(location_layout)
-        options_layout.addWidget(self.download_btn)
+        options_layout.addWidget(staging_label)
+        options_layout.addLayout(staging_layout)
+        options_layout.addWidget(library_label)
+        options_layout.addLayout(library_layout)
+        options_layout.addWidget(layout_label)
+        options_layout.addWidget(self.layout_combo)
+        options_layout.addWidget(self.skip_existing_check)
+        options_layout.addWidget(merge_label)
+        options_layout.addWidget(self.merge_combo)
+        options_layout.addWidget(fragments_label)
+        options_layout.addLayout(fragments_layout)
+        options_layout.addWidget(self.split_chapters_check)
+        options_layout.addWidget(sync_label)
+        options_layout.addWidget(self.sync_combo)
+        options_layout.addWidget(self.archive_removed_check)
+        options_layout.addWidget(verify_label)
+        options_layout.addWidget(self.verify_combo)
+        options_layout.addLayout(download_buttons)
         
         download_layout.addWidget(self.options_container)
         
@@ -535,6 +3960,18 @@ class MainWindow(QMainWindow):
         stats_layout.addWidget(self.video_progress_label, 1, 1)
         
         progress_inner.addLayout(stats_layout)
+        
+        # Pause / cancel controls
+        control_layout = QHBoxLayout()
+        self.pause_btn = QPushButton('Pause')
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.cancel_btn = QPushButton('Cancel')
+        self.cancel_btn.setStyleSheet("background-color: #dc3545;")
+        self.cancel_btn.clicked.connect(self.cancel_download)
+        control_layout.addStretch()
+        control_layout.addWidget(self.pause_btn)
+        control_layout.addWidget(self.cancel_btn)
+        progress_inner.addLayout(control_layout)
         progress_layout.addWidget(progress_container)
         
         # Log view with styled scrollbar
@@ -633,6 +4070,55 @@ class MainWindow(QMainWindow):
         
         self.stack.addWidget(download_page)
 
+        # Download queue (shown once a job is queued)
+        self.queue_view = QGroupBox('Download Queue')
+        self.queue_view.hide()
+        queue_layout = QVBoxLayout(self.queue_view)
+        
+        self.queue_table = QTableWidget(0, 5)
+        self.queue_table.setHorizontalHeaderLabels(['Job', 'State', 'Progress', 'Speed', 'ETA'])
+        self.queue_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.queue_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.queue_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.queue_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.queue_table.verticalHeader().hide()
+        self.queue_table.setMinimumHeight(150)
+        self.queue_table.setStyleSheet("""
+            QTableWidget {
+                background-color: #1a1a1a;
+                border: none;
+                gridline-color: #404040;
+            }
+            QHeaderView::section {
+                background-color: #232323;
+                color: #adb5bd;
+                border: none;
+                padding: 5px;
+            }
+        """)
+        queue_layout.addWidget(self.queue_table)
+        
+        queue_buttons = QHBoxLayout()
+        for text, handler in [('Up', lambda: self.move_queued_job(-1)),
+                              ('Down', lambda: self.move_queued_job(1)),
+                              ('Pause', self.pause_queued_job),
+                              ('Resume', self.resume_queued_job),
+                              ('Cancel', self.cancel_queued_job)]:
+            btn = QPushButton(text)
+            btn.setMinimumWidth(80)
+            btn.clicked.connect(handler)
+            queue_buttons.addWidget(btn)
+        queue_buttons.addStretch()
+        queue_buttons.addWidget(QLabel('Parallel jobs:'))
+        self.parallel_jobs = QSpinBox()
+        self.parallel_jobs.setRange(1, 8)
+        self.parallel_jobs.setValue(self.scheduler.max_workers)
+        self.parallel_jobs.valueChanged.connect(self.scheduler.set_max_workers)
+        queue_buttons.addWidget(self.parallel_jobs)
+        queue_layout.addLayout(queue_buttons)
+        
+        main_layout.addWidget(self.queue_view)
+
         # Window setup
         self.setMinimumSize(600, 700)
         self.resize(800, 800)
@@ -649,6 +4135,20 @@ class MainWindow(QMainWindow):
         folder = QFileDialog.getExistingDirectory(self, "Select Download Location", default_dir)
         if folder:
             self.save_path.setText(folder)
+            # Index existing files in the background so the first job starts without a full scan
+            threading.Thread(target=get_output_index, args=(folder,), name='output-index', daemon=True).start()
+
+    def browse_staging_location(self):
+        default_dir = self.staging_path.text() or self.save_path.text()
+        folder = QFileDialog.getExistingDirectory(self, "Select Staging Location", default_dir)
+        if folder:
+            self.staging_path.setText(folder)
+
+    def browse_library_location(self):
+        default_dir = self.library_path.text() or self.save_path.text()
+        folder = QFileDialog.getExistingDirectory(self, "Select Library Location", default_dir)
+        if folder:
+            self.library_path.setText(folder)
 
     def check_ffmpeg_installed(self):
         from shutil import which
@@ -660,13 +4160,92 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, 'Error', 'Please enter a URL')
             return
             
+        if self.speculative_result and self.speculative_result[0] == url:
+            result = self.speculative_result[1]
+            self.speculative_result = None
+            self.handle_validation_result(*result)
+            return
         self.validate_btn.setEnabled(False)
         self.validate_btn.setText('Validating...')
-        self.validator = UrlValidator(url)
-        self.validator.finished.connect(self.handle_validation_result)
-        self.validator.start()
+        if self.validator in self.active_validators and self.validator.url == url:
+            self.validator.speculative = False  # Already checking this URL, just report errors loudly
+            return
+        self.start_validation(url, speculative=False)
+
+    def on_url_changed(self, text):
+        """Debounce typing/pasting before validating speculatively"""
+        self.validation_timer.stop()
+        self.url_status_label.clear()
+        if self.speculative_result and self.speculative_result[0] != text.strip():
+            self.discard_speculative_result()
+        if PLAUSIBLE_URL_RE.match(text.strip()):
+            self.validation_timer.start(VALIDATION_DEBOUNCE_MS)
+        elif self.validator:
+            self.validation_generation += 1  # Whatever is in flight is now stale
+            self.validator.cancel()
+
+    def speculative_validate(self):
+        url = self.url_input.text().strip()
+        if self.stack.currentIndex() != 0 or not self.url_input.isEnabled():
+            return
+        if self.validator and self.validator.url == url and not self.validator.cancelled:
+            return  # Already validating (or validated) this exact URL
+        self.url_status_label.setText('Checking URL...')
+        self.start_validation(url, speculative=True)
+
+    def start_validation(self, url, speculative):
+        """Start a validation and supersede any that are still running"""
+        self.validation_generation += 1
+        if self.validator:
+            self.validator.cancel()
+        validator = UrlValidator(url, self.validation_generation, speculative)
+        validator.validated.connect(
+            lambda *result, v=validator: self.handle_validation_finished(v, *result))
+        # validated is emitted from run(), so keep a reference until the thread itself has ended
+        validator.finished.connect(lambda v=validator: self.release_validator(v))
+        self.active_validators.add(validator)
+        self.validator = validator
+        validator.start()
+
+    def release_validator(self, validator):
+        self.active_validators.discard(validator)
+        validator.deleteLater()
+
+    def handle_validation_finished(self, validator, *result):
+        if validator.generation != self.validation_generation:
+            return  # Superseded by a newer validation
+        is_valid, title, count = result[:3]
+        if validator.speculative:
+            # Never leave the URL page while the user may still be typing; keep the result for Validate
+            if not is_valid:
+                self.url_status_label.setText(f'Invalid URL: {title}')
+                return
+            self.discard_speculative_result()
+            self.speculative_result = (validator.url, result)
+            found = f'Found: {title}' + (f' (playlist with {count} videos)' if count > 1 else '')
+            self.url_status_label.setText(f'{found} - press Validate URL to continue')
+            return
+        self.handle_validation_result(*result)
+
+    def discard_speculative_result(self):
+        if self.speculative_result:
+            entries = self.speculative_result[1][3]
+            if entries is not None:
+                entries.close()
+            self.speculative_result = None
+
+    def start_sync_setup(self):
+        """Go straight to the options page to sync a playlist without validating it"""
+        if not self.url_input.text().strip():
+            QMessageBox.warning(self, 'Error', 'Please enter a URL')
+            return
+        self.is_playlist = True
+        self.current_title = ''
+        if self.sync_combo.currentIndex() == 0:
+            self.sync_combo.setCurrentIndex(1)
+        self.stack.setCurrentIndex(2)
 
-    def handle_validation_result(self, is_valid, title, count, video_titles, duration):
+    def handle_validation_result(self, is_valid, title, count, entries, duration):
         if not self.video_info_label:
             self.video_info_label = QLabel()
             
@@ -676,8 +4255,9 @@ class MainWindow(QMainWindow):
         if is_valid:
             self.video_count = count
             self.is_playlist = count > 1
-            self.video_titles = video_titles
+            self.entries = entries
             self.duration = duration  # Store duration for later use
+            self.current_title = title
             
             # Format duration for display
             hours, remainder = divmod(int(duration), 3600)
@@ -697,7 +4277,7 @@ class MainWindow(QMainWindow):
                 self.video_info_label.setText(info_text)
             
             if self.is_playlist:
-                self.setup_playlist_options(count, video_titles)
+                self.setup_playlist_options(count, entries)
                 self.stack.setCurrentIndex(1)  # Show playlist options
             else:
                 self.setup_single_video_options(title, duration)
@@ -705,7 +4285,7 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, 'Error', f'Invalid URL: {title}')
 
-    def setup_playlist_options(self, count, video_titles):
+    def setup_playlist_options(self, count, entries):
         # Clear existing widgets in playlist container
         for i in reversed(range(self.stack.widget(1).layout().count())):
             item = self.stack.widget(1).layout().itemAt(i)
@@ -751,7 +4331,7 @@ class MainWindow(QMainWindow):
         range_layout.addLayout(range_inputs)
         playlist_layout.addWidget(range_container)
         
-        # Replace the video list QTextEdit with a scrollable checkbox list
+        # Replace the video list QTextEdit with a checkable list view
         videos_container = QFrame()
         videos_container.setProperty("class", "StepContainer")
         videos_layout = QVBoxLayout(videos_container)
@@ -770,79 +4350,104 @@ class MainWindow(QMainWindow):
         selection_buttons.addWidget(select_none_btn)
         videos_layout.addLayout(selection_buttons)
         
-        # Create scrollable area for checkboxes
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: #1a1a1a;
-            }
-            QScrollBar:vertical {
-                background-color: #2b2b2b;
-                width: 10px;
-                border-radius: 5px;
-            }
-            QScrollBar::handle:vertical {
-                background-color: #404040;
-                min-height: 30px;
-                border-radius: 5px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background-color: #505050;
-            }
-        """)
+        # Title filter backed by a precomputed index
+        self.title_index = TitleIndex(entries.titles, entries.durations)
+        filter_layout = QHBoxLayout()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText('Filter titles (words or regex)')
+        self.filter_input.textChanged.connect(self.apply_title_filter)
+        self.filter_regex = QCheckBox('Regex')
+        self.filter_regex.stateChanged.connect(self.apply_title_filter)
+        filter_layout.addWidget(self.filter_input, stretch=1)
+        filter_layout.addWidget(self.filter_regex)
+        videos_layout.addLayout(filter_layout)
         
-        checkbox_widget = QWidget()
-        checkbox_layout = QVBoxLayout(checkbox_widget)
-        checkbox_widget.setStyleSheet("""
-            QWidget {
+        duration_layout = QHBoxLayout()
+        self.filter_min_minutes = QSpinBox()
+        self.filter_max_minutes = QSpinBox()
+        for spin in [self.filter_min_minutes, self.filter_max_minutes]:
+            spin.setRange(0, 100000)
+            spin.setSuffix(' min')
+            spin.setSpecialValueText('Any')
+            spin.valueChanged.connect(self.apply_title_filter)
+        duration_layout.addWidget(QLabel('Length from:'))
+        duration_layout.addWidget(self.filter_min_minutes)
+        duration_layout.addWidget(QLabel('to:'))
+        duration_layout.addWidget(self.filter_max_minutes)
+        duration_layout.addStretch()
+        if any(entries.durations):
+            videos_layout.addLayout(duration_layout)
+        
+        match_buttons = QHBoxLayout()
+        select_matching_btn = QPushButton("Select Matching")
+        deselect_matching_btn = QPushButton("Deselect Matching")
+        select_matching_btn.clicked.connect(lambda: self.select_matching_videos(True))
+        deselect_matching_btn.clicked.connect(lambda: self.select_matching_videos(False))
+        self.filter_count_label = QLabel()
+        match_buttons.addWidget(select_matching_btn)
+        match_buttons.addWidget(deselect_matching_btn)
+        match_buttons.addWidget(self.filter_count_label)
+        videos_layout.addLayout(match_buttons)
+        
+        # Entries are drawn straight from the store, only for the rows on screen
+        entries.set_all_selected(True)  # Default checked
+        self.entry_model = EntryListModel(entries)
+        self.entry_model.selection_changed.connect(self.update_selected_videos)
+        self.video_list = QListView()
+        self.video_list.setUniformItemSizes(True)
+        self.video_list.setModel(self.entry_model)
+        self.video_list.setStyleSheet("""
+            QListView {
+                border: none;
                 background-color: #1a1a1a;
-            }
-            QCheckBox {
                 color: white;
-                padding: 5px;
-                spacing: 8px;
                 font-size: 14px;
             }
-            QCheckBox:hover {
+            QListView::item {
+                padding: 5px;
+            }
+            QListView::item:hover {
                 background-color: #2b2b2b;
                 border-radius: 4px;
             }
-            QCheckBox::indicator {
+            QListView::indicator {
                 width: 20px;
                 height: 20px;
                 border-radius: 4px;
             }
-            QCheckBox::indicator:unchecked {
+            QListView::indicator:unchecked {
                 border: 2px solid #505050;
                 background-color: #2b2b2b;
             }
-            QCheckBox::indicator:unchecked:hover {
+            QListView::indicator:unchecked:hover {
                 border-color: #007BFF;
             }
-            QCheckBox::indicator:checked {
+            QListView::indicator:checked {
                 border: 2px solid #007BFF;
                 background-color: #2b2b2b;
                 background-image: url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='14' height='14' viewBox='0 0 24 24'%3E%3Cpath d='M9 16.17L4.83 12l-1.42 1.41L9 19 21 7l-1.41-1.41L9 16.17z' fill='%23007BFF'/%3E%3C/svg%3E");
                 background-repeat: no-repeat;
                 background-position: center;
             }
+            QScrollBar:vertical {
+                background-color: #2b2b2b;
+                width: 10px;
+                border-radius: 5px;
+            }
+            QScrollBar::handle:vertical {
+                background-color: #404040;
+                min-height: 30px;
+                border-radius: 5px;
+            }
+            QScrollBar::handle:vertical:hover {
+                background-color: #505050;
+            }
         """)
         
-        self.video_checkboxes = []  # Clear existing checkboxes
-        
-        # Create checkboxes for videos
-        for i, title in enumerate(video_titles, 1):
-            checkbox = QCheckBox(f"{i}. {title}")
-            checkbox.setChecked(True)  # Default checked
-            checkbox.setObjectName(f"video_{i}")
-            checkbox.stateChanged.connect(self.update_selected_videos)
-            self.video_checkboxes.append(checkbox)
-            checkbox_layout.addWidget(checkbox)
+        self.filter_matches = list(range(len(entries)))
+        self.filter_count_label.setText(f"{len(self.filter_matches)} of {len(entries)} shown")
         
-        scroll_area.setWidget(checkbox_widget)
-        videos_layout.addWidget(scroll_area)
+        videos_layout.addWidget(self.video_list)
         playlist_layout.addWidget(videos_container)
         
         # Next button
@@ -860,16 +4465,35 @@ class MainWindow(QMainWindow):
 
     def select_all_videos(self, select=True):
         """Select or deselect all videos"""
-        for checkbox in self.video_checkboxes:
-            checkbox.setChecked(select)
+        self.set_videos_checked(None, select)
+
+    def set_videos_checked(self, indices, checked):
+        """Check or uncheck many videos (0-based indices, None for all) in one store update"""
+        self.entry_model.set_checked(indices, checked)
+
+    def select_matching_videos(self, select=True):
+        """Select or deselect every video matching the current filter"""
+        self.set_videos_checked(self.filter_matches, select)
+
+    def apply_title_filter(self):
+        """Show only the videos matching the filter box and length range"""
+        try:
+            matches = self.title_index.search(
+                self.filter_input.text().strip(),
+                regex=self.filter_regex.isChecked(),
+                min_duration=self.filter_min_minutes.value() * 60,
+                max_duration=self.filter_max_minutes.value() * 60
+            )
+        except re.error:
+            self.filter_count_label.setText('Invalid regex')
+            return
+        self.entry_model.set_filter(matches if len(matches) < len(self.entries) else None)
+        self.filter_matches = matches
+        self.filter_count_label.setText(f"{len(matches)} of {len(self.entries)} shown")
     
     def update_selected_videos(self):
-        """Update the list of selected video indices"""
-        self.selected_videos = []
-        for i, checkbox in enumerate(self.video_checkboxes, 1):
-            if checkbox.isChecked():
-                self.selected_videos.append(i)
-        self.selected_count = len(self.selected_videos)
+        """Update the selected video count from the store"""
+        self.selected_count = self.entries.selected_count()
     
     def update_selected_count(self):
         """Update the selected video count based on range selection"""
@@ -953,6 +4577,35 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(time_container)
         
+        # Multiple clips from the same fetch
+        clips_container = QFrame()
+        clips_container.setProperty("class", "StepContainer")
+        clips_layout = QVBoxLayout(clips_container)
+        
+        clips_label = QLabel("Clips (Optional, cut from a single download):")
+        clips_label.setProperty("class", "StepTitle")
+        clips_layout.addWidget(clips_label)
+        
+        self.clip_ranges = []
+        self.clip_list = QListWidget()
+        self.clip_list.setMinimumHeight(120)
+        clips_layout.addWidget(self.clip_list)
+        
+        clip_buttons = QHBoxLayout()
+        add_clip_btn = QPushButton("Add Range")
+        import_clips_btn = QPushButton("Import...")
+        remove_clip_btn = QPushButton("Remove")
+        clear_clips_btn = QPushButton("Clear")
+        add_clip_btn.clicked.connect(self.add_clip_range)
+        import_clips_btn.clicked.connect(self.import_clip_ranges)
+        remove_clip_btn.clicked.connect(self.remove_clip_range)
+        clear_clips_btn.clicked.connect(lambda: self.set_clip_ranges([]))
+        for btn in [add_clip_btn, import_clips_btn, remove_clip_btn, clear_clips_btn]:
+            clip_buttons.addWidget(btn)
+        clips_layout.addLayout(clip_buttons)
+        
+        layout.addWidget(clips_container)
+        
         # Next button
         next_btn = QPushButton('Next')
         next_btn.clicked.connect(lambda: self.stack.setCurrentIndex(2))
@@ -965,40 +4618,157 @@ class MainWindow(QMainWindow):
         page.layout().addWidget(container)
         page.layout().addStretch()
 
-    def start_download(self):
+    def get_time_range(self):
+        """Start/end seconds from the time range spin boxes"""
+        start_time = (self.start_hours.value() * 3600 + 
+                     self.start_minutes.value() * 60 + 
+                     self.start_seconds.value())
+        end_time = (self.end_hours.value() * 3600 + 
+                   self.end_minutes.value() * 60 + 
+                   self.end_seconds.value())
+        return start_time, end_time
+
+    def set_clip_ranges(self, ranges):
+        self.clip_ranges = sorted(ranges)
+        self.clip_list.clear()
+        for start, end, name in self.clip_ranges:
+            label = f"{format_timestamp(start)} - {format_timestamp(end)}"
+            self.clip_list.addItem(f"{label}  {name}" if name else label)
+
+    def add_clip_range(self):
+        """Add the range currently set in the time spin boxes as a clip"""
+        start_time, end_time = self.get_time_range()
+        if start_time >= end_time:
+            QMessageBox.warning(self, 'Error', 'End time must be greater than start time')
+            return
+        self.set_clip_ranges(self.clip_ranges + [(start_time, end_time, '')])
+
+    def remove_clip_range(self):
+        row = self.clip_list.currentRow()
+        if row >= 0:
+            self.set_clip_ranges(self.clip_ranges[:row] + self.clip_ranges[row + 1:])
+
+    def import_clip_ranges(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Clip Ranges", "",
+                                              "Clip lists (*.csv *.json);;All files (*)")
+        if not path:
+            return
+        try:
+            ranges = load_clip_ranges(path)
+        except (OSError, ValueError, IndexError, KeyError) as e:
+            QMessageBox.warning(self, 'Error', f'Could not import clip ranges: {e}')
+            return
+        too_long = [r for r in ranges if self.duration and r[1] > self.duration]
+        if too_long:
+            QMessageBox.warning(self, 'Error', f'{len(too_long)} clip(s) end after the video does')
+            return
+        self.set_clip_ranges(self.clip_ranges + ranges)
+
+    def common_download_options(self):
+        """Options-page settings that apply to any job, or None without a save location"""
+        save_path = self.save_path.text().strip()
+        staging_path = self.staging_path.text().strip() or None
+        if not save_path:
+            return None
+        if staging_path and os.path.abspath(staging_path) == os.path.abspath(save_path):
+            staging_path = None  # Staging into the destination itself is a no-op
+        return dict(
+            save_path=save_path,
+            staging_path=staging_path,
+            hash_algorithm={1: 'sha256', 2: 'xxh64'}.get(self.verify_combo.currentIndex()),
+            merge_mode='pipe' if self.merge_combo.currentIndex() == 1 else 'file',
+            library_path=self.library_path.text().strip() or None,
+            output_layout=OUTPUT_LAYOUTS[max(self.layout_combo.currentIndex(), 0)][1],
+            fragment_concurrency=self.fragments_spin.value(),
+            http_chunk_size=HTTP_CHUNK_SIZES[max(self.chunk_combo.currentIndex(), 0)][1],
+            fragment_retries=self.fragment_retries_spin.value(),
+            skip_existing=self.skip_existing_check.isChecked()
+        )
+
+    def queue_batch(self, items, format_choice, policy, first_n):
+        """Queue validated (url, summary) pairs; policy is 'all', 'first' or 'skip' for playlists"""
         if not self.check_ffmpeg_installed():
             QMessageBox.critical(self, 'Error', 'ffmpeg is not installed. Please install ffmpeg to proceed.')
-            return
+            return 0
+        common = self.common_download_options()
+        if common is None:
+            QMessageBox.warning(self, 'Error', 'Please select a save location first')
+            return 0
+        queued = 0
+        for url, (title, count, _, _) in items:
+            is_playlist = count > 1
+            if is_playlist and policy == 'skip':
+                continue
+            num_videos = min(first_n, count) if is_playlist and policy == 'first' else count
+            job = DownloadJob(
+                url=url,
+                format_id=format_choice[2],
+                audio_codec=format_choice[3],
+                num_videos=num_videos,
+                is_playlist=is_playlist,
+                playlist_items=f'1-{num_videos}' if is_playlist and policy == 'first' else None,
+                **common
+            )
+            self.scheduler.submit(job, {'title': title or url})
+            queued += 1
+        return queued
+
+    def collect_download_options(self):
+        """Validate the options page and return DownloadJob keyword arguments, or None"""
+        if not self.check_ffmpeg_installed():
+            QMessageBox.critical(self, 'Error', 'ffmpeg is not installed. Please install ffmpeg to proceed.')
+            return None
 
         url = self.url_input.text().strip()
-        save_path = self.save_path.text().strip()
+        common = self.common_download_options()
         
-        if not url or not save_path:
+        if not url or common is None:
             QMessageBox.warning(self, 'Error', 'Please enter URL and select save location')
-            return
+            return None
 
-        # Store selected count before clearing UI
-        num_videos = self.selected_count if self.is_playlist else 1
+        sync_mode = {1: 'all', 2: 'newest_first'}.get(self.sync_combo.currentIndex())
+        if sync_mode and not self.is_playlist:
+            QMessageBox.warning(self, 'Error', 'Sync mode is only available for playlists')
+            return None
         
         # Get time range for single videos
         start_time = end_time = None
         if not self.is_playlist:
-            start_time = (self.start_hours.value() * 3600 + 
-                         self.start_minutes.value() * 60 + 
-                         self.start_seconds.value())
-            end_time = (self.end_hours.value() * 3600 + 
-                       self.end_minutes.value() * 60 + 
-                       self.end_seconds.value())
+            start_time, end_time = self.get_time_range()
             
-            # Validate time range
-            if start_time >= end_time:
+            # Validate time range (not used when clips are listed)
+            if start_time >= end_time and not self.clip_ranges:
                 QMessageBox.warning(self, 'Error', 'End time must be greater than start time')
-                return
+                return None
         
         # Get playlist indices
         start_idx = self.start_index.value() if hasattr(self, 'start_index') else 1
         end_idx = self.end_index.value() if hasattr(self, 'end_index') else 1
         
+        selected_indices = self.entries.selection_spec() if self.is_playlist and self.entries else None
+        return dict(
+            url=url,
+            format_id=self.get_format_id(),
+            num_videos=self.entries.selected_count() if self.is_playlist and self.entries else 1,
+            start_index=start_idx,
+            end_index=end_idx,
+            is_playlist=self.is_playlist,
+            start_time=start_time,
+            end_time=end_time,
+            playlist_items=selected_indices if self.is_playlist else None,
+            audio_codec=self.get_audio_codec(),
+            clip_ranges=list(self.clip_ranges) if not self.is_playlist else None,
+            split_chapters=self.split_chapters_check.isChecked(),
+            sync_mode=sync_mode,
+            archive_removed=self.archive_removed_check.isChecked(),
+            **common
+        )
+
+    def start_download(self):
+        options = self.collect_download_options()
+        if options is None:
+            return
+        
         # Clear and update UI
         self.clear_ui_for_download()
         
@@ -1006,31 +4776,93 @@ class MainWindow(QMainWindow):
         self.progress_view.show()
         self.options_container.hide()
         
-        format_id = self.get_format_id()
-        
         try:
-            selected_indices = ','.join(map(str, self.selected_videos)) if self.is_playlist else None
-            self.worker = DownloadWorker(
-                url, 
-                save_path, 
-                format_id, 
-                len(self.selected_videos) if self.is_playlist else 1,
-                start_index=start_idx,
-                end_index=end_idx,
-                is_playlist=self.is_playlist,
-                start_time=start_time,
-                end_time=end_time,
-                playlist_items=selected_indices if self.is_playlist else None
-            )
+            self.worker = DownloadWorker(**options)
+            if self.event_recorder:
+                self.event_recorder.attach(self.worker.job)
             self.worker.progress.connect(self.update_progress)
             self.worker.status.connect(self.update_status)
             self.worker.detailed_progress.connect(self.update_detailed_progress)
             self.worker.finished.connect(self.download_finished)
             self.worker.download_error.connect(self.download_error)
+            self.worker.cancelled.connect(self.download_cancelled)
+            self.pause_btn.setText('Pause')
+            self.pause_btn.setEnabled(True)
+            self.cancel_btn.setEnabled(True)
             self.worker.start()
         except Exception as e:
             self.download_error(str(e))
 
+    def add_to_queue(self):
+        """Queue the configured download and go back to the URL step for the next one"""
+        options = self.collect_download_options()
+        if options is None:
+            return
+        name = self.current_title or options['url']
+        try:
+            self.scheduler.submit(DownloadJob(**options), {'title': name})
+        except Exception as e:
+            QMessageBox.warning(self, 'Error', f'Could not queue download: {e}')
+            return
+        self.url_input.clear()
+        self.stack.setCurrentIndex(0)
+
+    def handle_job_event(self, job_id, kind, data):
+        """Reflect scheduler events in the queue table"""
+        if job_id not in self.queue_row_ids:
+            record = self.scheduler.get(job_id)
+            row = self.queue_table.rowCount()
+            self.queue_table.insertRow(row)
+            self.queue_row_ids.append(job_id)
+            self.queue_table.setItem(row, 0, QTableWidgetItem(record.request.get('title') or record.job.url))
+            for column in range(1, 5):
+                self.queue_table.setItem(row, column, QTableWidgetItem('--'))
+            self.queue_view.show()
+        row = self.queue_row_ids.index(job_id)
+
+        if kind == 'progress':
+            self.queue_table.item(row, 2).setText(f"{data:.1f}%")
+        elif kind == 'detail':
+            self.queue_table.item(row, 3).setText(data.speed_str)
+            self.queue_table.item(row, 4).setText(data.job_eta_str)
+        elif kind == 'error':
+            self.queue_table.item(row, 1).setToolTip(str(data))
+        elif kind == 'state':
+            self.refresh_queue_states()
+
+    def refresh_queue_states(self):
+        for row, job_id in enumerate(self.queue_row_ids):
+            record = self.scheduler.get(job_id)
+            state = record.state.capitalize()
+            position = self.scheduler.queue_position(record)
+            if record.state == 'queued' and position:
+                state = f"Queued #{position}"
+            self.queue_table.item(row, 1).setText(state)
+
+    def selected_job_id(self):
+        row = self.queue_table.currentRow()
+        return self.queue_row_ids[row] if 0 <= row < len(self.queue_row_ids) else None
+
+    def move_queued_job(self, offset):
+        job_id = self.selected_job_id()
+        if job_id is not None and self.scheduler.move(job_id, offset):
+            self.refresh_queue_states()
+
+    def pause_queued_job(self):
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.scheduler.pause(job_id)
+
+    def resume_queued_job(self):
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.scheduler.resume(job_id)
+
+    def cancel_queued_job(self):
+        job_id = self.selected_job_id()
+        if job_id is not None:
+            self.scheduler.cancel(job_id)
+
     def clear_ui_for_download(self):
         """Clear UI and prepare for download"""
         # Clear progress information
@@ -1043,57 +4875,30 @@ class MainWindow(QMainWindow):
         self.current_file_label.setText('Current File: N/A')
         
         # Disable inputs
-        self.url_input.setEnabled(False)
-        self.validate_btn.setEnabled(False)
-        self.format_combo.setEnabled(False)
-        self.save_path.setEnabled(False)
-        self.download_btn.setEnabled(False)
+        self.set_download_inputs_enabled(False)
+
+    def set_download_inputs_enabled(self, enabled):
+        """Enable or disable the inputs that must not change during a download"""
+        for widget in [self.url_input, self.validate_btn, self.format_combo, self.save_path,
+                       self.staging_path, self.library_path, self.layout_combo, self.skip_existing_check, self.queue_btn, self.verify_combo, self.merge_combo,
+                       self.fragments_spin, self.chunk_combo, self.fragment_retries_spin,
+                       self.split_chapters_check, self.sync_combo, self.archive_removed_check,
+                       self.sync_btn, self.download_btn]:
+            widget.setEnabled(enabled)
 
     def get_format_id(self):
-        format_map = {
-            0: 'bestvideo+bestaudio/best',
-            1: 'bestvideo[height<=1080]+bestaudio/best',
-            2: 'bestvideo[height<=720]+bestaudio/best',
-            3: 'bestvideo[height<=480]+bestaudio/best',
-            4: 'bestvideo[height<=360]+bestaudio/best',
-            5: 'bestaudio/best'
-        }
-        return format_map.get(self.format_combo.currentIndex(), 'bestvideo+bestaudio/best')
+        return find_format_choice(max(self.format_combo.currentIndex(), 0))[2]
+
+    def get_audio_codec(self):
+        """Target codec for the audio-only formats, None for video"""
+        return find_format_choice(max(self.format_combo.currentIndex(), 0))[3]
 
     def update_progress(self, value):
-        """Enhanced smooth progress bar animation"""
-        current = self.progress_bar.value()
-        if value > current:
-            # Use a more sophisticated smoothing algorithm
-            alpha = 0.12  # Reduced smoothing factor for smoother animation
-            beta = 0.02   # Secondary smoothing for very small changes
-            
-            # Calculate primary smoothing
-            primary_smooth = current + (value - current) * alpha
-            
-            # Apply secondary smoothing for small changes
-            if value - current < 5:
-                smoothed_value = current + (value - current) * beta
-            else:
-                smoothed_value = primary_smooth
-            
-            # Ensure we don't overshoot
-            smoothed_value = min(smoothed_value, value)
-            
-            # Update progress bar
-            self.progress_bar.setValue(int(smoothed_value))
-            
-            # Format percentage with one decimal place
-            percentage = f"{smoothed_value:.1f}%"
-            self.progress_bar.setFormat(percentage)
-            self.progress_percent.setText(percentage)
-            
-            # If we're very close to the target, snap to it
-            if value - smoothed_value < 0.2:
-                self.progress_bar.setValue(int(value))
-                percentage = f"{value:.1f}%"
-                self.progress_bar.setFormat(percentage)
-                self.progress_percent.setText(percentage)
+        """Show overall progress; the job already weights it by bytes and never moves it backwards"""
+        self.progress_bar.setValue(int(value))
+        percentage = f"{value:.1f}%"
+        self.progress_bar.setFormat(percentage)
+        self.progress_percent.setText(percentage)
 
     def update_status(self, status):
         self.status_label.setText(status)
@@ -1103,15 +4908,16 @@ class MainWindow(QMainWindow):
             self.detailed_status.verticalScrollBar().maximum()
         )
 
-    def update_detailed_progress(self, progress_info):
+    def update_detailed_progress(self, event):
         """Enhanced progress information display"""
-        speed = progress_info.get('speed', 'N/A')
-        downloaded = progress_info.get('downloaded', '0')
-        total = progress_info.get('total', 'Unknown')
-        video_num = progress_info.get('video_num', 1)
-        total_videos = progress_info.get('total_videos', 1)
-        filename = progress_info.get('filename', '')
-        eta = progress_info.get('eta', 'Calculating...')
+        speed = event.speed_str
+        downloaded = event.downloaded_str
+        total = event.total_str
+        video_num = event.video_num
+        total_videos = event.total_videos
+        filename = event.filename
+        eta = event.eta_str
+        job_eta = event.job_eta_str
 
         # Create a modern, card-style progress status with enhanced styling
         status_text = f"""
@@ -1161,7 +4967,7 @@ class MainWindow(QMainWindow):
                     margin: 5px 0;
                     color: #00b0ff;
                     font-size: 14px;
-                '>⏱️ {eta}</p>
+                '>⏱️ {eta} (all: {job_eta})</p>
             </div>
         </div>
         """
@@ -1177,11 +4983,7 @@ class MainWindow(QMainWindow):
     def download_finished(self):
         """Handle download completion"""
         # Re-enable inputs and restore view
-        self.url_input.setEnabled(True)
-        self.validate_btn.setEnabled(True)
-        self.format_combo.setEnabled(True)
-        self.save_path.setEnabled(True)
-        self.download_btn.setEnabled(True)
+        self.set_download_inputs_enabled(True)
         
         # Show options and hide progress
         self.options_container.show()
@@ -1191,14 +4993,48 @@ class MainWindow(QMainWindow):
         self.detailed_status.append('Download completed successfully!')
         self.show_completion_dialog(True)
 
+    def toggle_pause(self):
+        """Pause or resume the running download"""
+        if not self.worker or not self.worker.isRunning():
+            return
+        if self.worker.job.is_paused():
+            self.worker.job.resume()
+            self.pause_btn.setText('Pause')
+        else:
+            self.worker.job.pause()
+            self.pause_btn.setText('Resume')
+
+    def cancel_download(self):
+        if self.worker and self.worker.isRunning():
+            self.pause_btn.setEnabled(False)
+            self.cancel_btn.setEnabled(False)
+            self.status_label.setText('Cancelling...')
+            self.worker.job.cancel()
+
+    def download_cancelled(self):
+        """Handle a cancelled download"""
+        # Re-enable inputs and restore view
+        self.set_download_inputs_enabled(True)
+        
+        # Show options and hide progress
+        self.options_container.show()
+        self.progress_view.hide()
+        
+        self.status_label.setText('Download cancelled')
+        self.detailed_status.append('Download cancelled, partial files kept for resuming')
+
+    def stop_all_downloads(self):
+        """Cancel the running download and every queued job, waiting briefly for them to stop"""
+        self.scheduler.shutdown(timeout=0)
+        if self.worker and self.worker.isRunning():
+            self.worker.job.cancel()
+            self.worker.wait(2000)
+        self.scheduler.shutdown(timeout=2)
+
     def download_error(self, error):
         """Handle download errors"""
         # Re-enable inputs and restore view
-        self.url_input.setEnabled(True)
-        self.validate_btn.setEnabled(True)
-        self.format_combo.setEnabled(True)
-        self.save_path.setEnabled(True)
-        self.download_btn.setEnabled(True)
+        self.set_download_inputs_enabled(True)
         
         # Show options and hide progress
         self.options_container.show()
@@ -1287,7 +5123,8 @@ class MainWindow(QMainWindow):
 
     # Add new method to handle window close
     def closeEvent(self, event):
-        if self.download_btn.isEnabled():  # Only show confirmation if not downloading
+        busy = not self.download_btn.isEnabled() or self.scheduler.running or self.scheduler.queue
+        if not busy:  # Only show confirmation if not downloading
             reply = QMessageBox.question(
                 self, 'Exit',
                 'Are you sure you want to quit?',
@@ -1306,10 +5143,17 @@ class MainWindow(QMainWindow):
                 QMessageBox.No
             )
             if reply == QMessageBox.Yes:
-                # Could add cleanup code here if needed
+                self.stop_all_downloads()
                 event.accept()
             else:
                 event.ignore()
+        if event.isAccepted():
+            # Let in-flight validations stop at their next page instead of being torn down mid-run
+            for validator in list(self.active_validators):
+                validator.cancel()
+                validator.wait()
+            if self.event_recorder:
+                self.event_recorder.close()
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
@@ -1320,8 +5164,68 @@ class MainWindow(QMainWindow):
         else:
             self.url_input.setMinimumWidth(400)
 
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='YouTube Downloader')
+    parser.add_argument('--daemon', action='store_true',
+                        help='run the headless download daemon instead of the GUI')
+    parser.add_argument('--listen', default='127.0.0.1:8765', metavar='HOST:PORT',
+                        help='address for the daemon HTTP API (default: %(default)s)')
+    parser.add_argument('--socket', metavar='PATH',
+                        help='serve the daemon API on a Unix socket instead of TCP')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='number of jobs the daemon runs at once (default: %(default)s)')
+    parser.add_argument('--stream', metavar='URL',
+                        help='stream the media to --output instead of saving files, then exit')
+    parser.add_argument('--output', default='-', metavar='TARGET',
+                        help="stream target: '-' for stdout, a file or FIFO path, or unix:PATH (default: stdout)")
+    parser.add_argument('--format', default='best', choices=[choice[1] for choice in FORMAT_CHOICES],
+                        help='quality for --stream (default: %(default)s)')
+    parser.add_argument('--playlist', action='store_true', help='stream every item of a playlist URL')
+    parser.add_argument('--items', metavar='SPEC', help="playlist items to stream, e.g. '1-3,7'")
+    parser.add_argument('--container', default='mkv', choices=sorted(STREAM_CONTAINERS),
+                        help='streamable container for video (default: %(default)s)')
+    parser.add_argument('--framing', default='raw', choices=['raw', 'chunked'],
+                        help='raw: items back to back; chunked: JSON header + chunks per item')
+    parser.add_argument('--shard', metavar='URL',
+                        help='download a playlist with --processes worker processes, then exit')
+    parser.add_argument('--processes', type=int, default=2,
+                        help='worker processes started for --shard (default: %(default)s)')
+    parser.add_argument('--shard-listen', default='127.0.0.1:0', metavar='HOST:PORT',
+                        help='coordinator address; use 0.0.0.0:PORT to accept workers from other hosts')
+    parser.add_argument('--shard-worker', metavar='HOST:PORT',
+                        help='fetch items from a --shard coordinator until it runs out')
+    parser.add_argument('--save-path', default='~/Downloads', metavar='PATH',
+                        help='download folder for --shard (default: %(default)s)')
+    parser.add_argument('--layout', default='flat', choices=[layout[1] for layout in OUTPUT_LAYOUTS],
+                        help='subfolders for --shard output: by date or video ID prefix (default: %(default)s)')
+    parser.add_argument('--fragments', type=int, default=1, metavar='N',
+                        help=f'parallel fragment requests per DASH/HLS video for --shard, up to {FRAGMENT_CONCURRENCY_MAX} (default: %(default)s)')
+    parser.add_argument('--http-chunk-size', metavar='SIZE',
+                        help="download --shard files in HTTP range requests of SIZE, e.g. '10M'")
+    parser.add_argument('--no-skip-existing', action='store_true',
+                        help='download --shard items again even if their file is already in the save path')
+    parser.add_argument('--fragment-retries', type=int, default=FRAGMENT_RETRIES_DEFAULT, metavar='N',
+                        help='retries per failed fragment, with exponential backoff (default: %(default)s)')
+    parser.add_argument('--plan-formats', metavar='URL',
+                        help='resolve --format for every video of URL (or --items), print the plan and size estimate, then exit')
+    args, qt_args = parser.parse_known_args(argv)
+
+    if args.stream:
+        return run_stream(args)
+    if args.shard:
+        return run_shard(args)
+    if args.shard_worker:
+        return run_shard_worker(args.shard_worker)
+    if args.plan_formats:
+        return plan_formats(args)
+    if args.daemon:
+        return run_daemon(args)
+
+    app = QApplication([sys.argv[0]] + qt_args)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    return app.exec_()
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file